@@ -0,0 +1,360 @@
+"""Load-test the content API (api/endpoints/main.py) and chat server (api/endpoints/chat.py).
+
+In-process runs serve the apps on localhost from this process with a stubbed LLM that streams the
+recorded responses in tests/fixtures/llm_responses.json and a stubbed chat agent, so
+the numbers cover our own code: routing, prompt rendering, rate limiting, parsing
+and streaming. With --url the scenarios run against a live server instead, e.g. one
+started with REPLAY_MODE=replay.
+
+Usage: python -m raggaeton.backend.benchmarks.bench_load [--scenarios headlines draft]
+    [--concurrency 16] [--requests 200] [--compare cache/benchmarks/load-<sha>.json]
+"""
+
+import sys
+import json
+import time
+import asyncio
+import logging
+import socket
+import argparse
+from types import SimpleNamespace
+from unittest.mock import patch
+import httpx
+import openai
+import uvicorn
+from raggaeton.backend.src.utils.replay import Cassette, ReplayStream
+from raggaeton.backend.src.api.services import llm_handler
+from raggaeton.backend.src.api.services.rate_limiter import ProviderLimiter
+from raggaeton.backend.benchmarks.results import (
+    LLM_RESPONSES_PATH,
+    summarize,
+    write_results,
+    load_results,
+    relative_change,
+)
+
+TOPICS = ["Hiking", "Climbing Fu Gai Mountain in Zhejiang"]
+CONTEXT = {"context": "Fu Gai mountain has steep stone steps and caves. " * 50}
+DRAFT_FIELDS = {
+    "topics": TOPICS,
+    "context": CONTEXT,
+    "headline": "Climbing Fu Gai",
+    "hook": "Why walk uphill?",
+    "thesis": "The climb is the point.",
+    "article_type": "travel",
+}
+OUTLINES = [
+    {
+        "content_block": f"Block {i}",
+        "details": "What happens here",
+        "topic_sentences": ["A sentence."],
+    }
+    for i in range(6)
+]
+
+# name -> (app, path, payload, recorded request type the stubbed LLM replies with)
+SCENARIOS = {
+    "headlines": (
+        "main",
+        "/api/generate-headlines",
+        {"article_types": "travel", "topics": TOPICS, "context": CONTEXT},
+        "generate_headlines",
+    ),
+    "draft": ("main", "/api/generate-draft", DRAFT_FIELDS, "generate_draft_travel"),
+    "full_content_stream": (
+        "main",
+        "/api/generate-full-content/stream",
+        {**DRAFT_FIELDS, "draft_outlines": OUTLINES},
+        "generate_full_content",
+    ),
+    "chat": ("chat", "/chat", {"query": "What's happening today?"}, None),
+}
+
+
+def openai_stream_body(content, chars_per_token=4):
+    """A chat completion stream returning `content` about one token per event."""
+    events = []
+    for start in range(0, len(content), chars_per_token):
+        chunk = {
+            "id": "chatcmpl-bench",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "gpt-4o",
+            "choices": [
+                {
+                    "index": 0,
+                    "delta": {"content": content[start : start + chars_per_token]},
+                    "finish_reason": None,
+                }
+            ],
+        }
+        events.append(chunk)
+    completion_tokens = len(events)
+    events.append(
+        {
+            "id": "chatcmpl-bench",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "gpt-4o",
+            "choices": [],
+            "usage": {
+                "prompt_tokens": 1000,
+                "completion_tokens": completion_tokens,
+                "total_tokens": 1000 + completion_tokens,
+            },
+        }
+    )
+    return "".join(f"data: {json.dumps(event)}\n\n" for event in events) + (
+        "data: [DONE]\n\n"
+    )
+
+
+class StubLLM:
+    """OpenAI-compatible transport replying with one recorded response at a set pace."""
+
+    def __init__(self, first_byte_ms, tokens_per_second):
+        # Only the cassette's pacing is used, nothing is read from disk
+        self.pacing = Cassette(
+            "", first_byte_ms=first_byte_ms, events_per_second=tokens_per_second
+        )
+        with open(LLM_RESPONSES_PATH, "r") as file:
+            self.recorded = {
+                record["request_type"]: record["content"] for record in json.load(file)
+            }
+        self.body = ""
+
+    def use(self, request_type):
+        self.body = openai_stream_body(self.recorded[request_type])
+
+    def handle(self, request):
+        return httpx.Response(
+            200,
+            headers={"content-type": "text/event-stream"},
+            stream=ReplayStream(self.pacing, self.body),
+        )
+
+
+class StubAgent:
+    """Stands in for the chat agent and its retriever, streaming a canned answer."""
+
+    def __init__(self, first_byte_ms, tokens_per_second, tokens=120):
+        self.first_byte_delay = first_byte_ms / 1000
+        self.token_delay = 1 / tokens_per_second if tokens_per_second else 0
+        self.tokens = tokens
+
+    def stream_chat(self, query):
+        def response_gen():
+            # Sync like the llama-index agent, so it runs in Starlette's threadpool
+            time.sleep(self.first_byte_delay)
+            for index in range(self.tokens):
+                if index:
+                    time.sleep(self.token_delay)
+                yield f"token{index} "
+
+        return SimpleNamespace(response_gen=response_gen())
+
+
+async def monitor_loop_lag(samples, stop_event, interval=0.01):
+    # Time asleep beyond the interval is time the loop was busy elsewhere
+    while not stop_event.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(time.perf_counter() - started - interval)
+
+
+async def timed_request(client, path, payload):
+    started = time.perf_counter()
+    first_byte = None
+    async with client.stream("POST", path, json=payload) as response:
+        async for chunk in response.aiter_raw():
+            if first_byte is None and chunk:
+                first_byte = time.perf_counter() - started
+        status_code = response.status_code
+    return status_code, time.perf_counter() - started, first_byte
+
+
+async def run_scenario(client, path, payload, concurrency, total_requests):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, ttfts, errors = [], [], 0
+    lag_samples, stop_event = [], asyncio.Event()
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            try:
+                status_code, latency, ttft = await timed_request(client, path, payload)
+            except Exception as e:
+                logging.getLogger(__name__).debug(f"Request failed: {e}")
+                errors += 1
+                return
+        if status_code >= 400:
+            errors += 1
+            return
+        latencies.append(latency)
+        if ttft is not None:
+            ttfts.append(ttft)
+
+    monitor = asyncio.create_task(monitor_loop_lag(lag_samples, stop_event))
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total_requests)))
+    wall_seconds = time.perf_counter() - started
+    stop_event.set()
+    await monitor
+
+    return {
+        "requests": total_requests,
+        "errors": errors,
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_rps": round(len(latencies) / wall_seconds, 2),
+        "latency_ms": summarize(latencies),
+        "ttft_ms": summarize(ttfts),
+        "loop_lag_ms": summarize(lag_samples),
+    }
+
+
+def load_app(name, stub_agent):
+    if name == "main":
+        from raggaeton.backend.src.api.endpoints.main import app
+    else:
+        # The chat server loads a ColBERT index in its lifespan, which is skipped here
+        # by setting the agent directly
+        from raggaeton.backend.src.api.endpoints.chat import app
+
+        app.state.agent = stub_agent
+    return app
+
+
+async def start_server(app):
+    """Serve `app` on a free localhost port in this event loop.
+
+    Sharing the loop with the client means loop lag reflects the app's own blocking
+    work, and real sockets keep streamed responses streaming, which ASGITransport
+    would buffer. Lifespans are skipped; the stubs stand in for what they set up.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    server = uvicorn.Server(
+        uvicorn.Config(app, lifespan="off", log_level="warning", access_log=False)
+    )
+    server.task = asyncio.create_task(server.serve(sockets=[sock]))
+    while not server.started:
+        await asyncio.sleep(0.01)
+    return server, f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+async def run(args):
+    stub_llm = StubLLM(args.first_byte_ms, args.tokens_per_second)
+    stub_agent = StubAgent(args.first_byte_ms, args.tokens_per_second)
+    llm_client = openai.AsyncOpenAI(
+        api_key="bench",
+        max_retries=0,
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(stub_llm.handle)),
+    )
+    # Measure the app, not the response cache or provider rate limits
+    unlimited = ProviderLimiter(
+        "openai", 10**9, 10**12, max_concurrency=10**6, retries=0
+    )
+    results = {}
+    with (
+        patch.dict(llm_handler._shared_clients, {("openai", None): llm_client}),
+        patch.dict(llm_handler._rate_limiters, {"openai": unlimited}),
+        patch.object(llm_handler, "get_response_cache", return_value=None),
+        patch.dict(llm_handler.config["llm"], {"default_provider": "openai"}),
+    ):
+        for name in args.scenarios:
+            app_name, path, payload, request_type = SCENARIOS[name]
+            if request_type:
+                stub_llm.use(request_type)
+            server = None
+            base_url = args.url
+            if not base_url:
+                server, base_url = await start_server(load_app(app_name, stub_agent))
+            limits = httpx.Limits(max_connections=args.concurrency)
+            try:
+                async with httpx.AsyncClient(
+                    base_url=base_url, limits=limits, timeout=None
+                ) as client:
+                    # One untimed request warms imports, prompts and the client pool
+                    await timed_request(client, path, payload)
+                    results[name] = await run_scenario(
+                        client, path, payload, args.concurrency, args.requests
+                    )
+            finally:
+                if server:
+                    server.should_exit = True
+                    await server.task
+            print_scenario(name, results[name])
+    return results
+
+
+def print_scenario(name, result):
+    latency, ttft, lag = result["latency_ms"], result["ttft_ms"], result["loop_lag_ms"]
+    print(
+        f"{name:<22} {result['throughput_rps']:>8.1f} req/s  "
+        f"p50 {latency['p50']}ms  p95 {latency['p95']}ms  p99 {latency['p99']}ms  "
+        f"ttft p50 {ttft['p50']}ms  loop lag p99 {lag['p99']}ms  "
+        f"errors {result['errors']}"
+    )
+
+
+def compare(results, baseline_path):
+    baseline = load_results(baseline_path)
+    print(f"\nCompared with {baseline['commit']} ({baseline_path})")
+    for name, result in results.items():
+        previous = baseline["scenarios"].get(name)
+        if not previous:
+            continue
+        changes = []
+        for key in ("p50", "p95"):
+            change = relative_change(
+                previous["latency_ms"][key], result["latency_ms"][key]
+            )
+            if change is not None:
+                changes.append(f"{key} {change:+.1%}")
+        change = relative_change(previous["throughput_rps"], result["throughput_rps"])
+        if change is not None:
+            changes.append(f"throughput {change:+.1%}")
+        print(f"{name:<22} " + "  ".join(changes))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        choices=sorted(SCENARIOS),
+        default=["headlines", "draft", "full_content_stream"],
+    )
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--first-byte-ms", type=float, default=300)
+    parser.add_argument("--tokens-per-second", type=float, default=80)
+    parser.add_argument("--url", help="Run against a live server instead")
+    parser.add_argument("--output", help="Where to write the JSON results")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    parser.add_argument("--log", action="store_true", help="Keep app logging on")
+    args = parser.parse_args(argv)
+
+    if not args.log:
+        # Per-request INFO logging would dominate the in-process numbers
+        logging.disable(logging.CRITICAL)
+    results = asyncio.run(run(args))
+
+    output = write_results(
+        "load",
+        {
+            "mode": args.url or "in-process",
+            "concurrency": args.concurrency,
+            "first_byte_ms": args.first_byte_ms,
+            "tokens_per_second": args.tokens_per_second,
+            "scenarios": results,
+        },
+        args.output,
+    )
+    print(f"\nResults written to {output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,75 @@
+"""Measure LLM response parsing on recorded responses.
+
+Usage: python -m raggaeton.backend.benchmarks.bench_parsing [iterations]
+"""
+
+import sys
+import json
+import timeit
+import logging
+from unittest.mock import patch
+from raggaeton.backend.src.utils import llm_processing
+from raggaeton.backend.src.utils.llm_processing import (
+    RESPONSE_PARSERS,
+    match_request_type,
+    parse_llm_response,
+    repair_json,
+)
+from raggaeton.backend.benchmarks.results import LLM_RESPONSES_PATH
+
+
+def parse_legacy(content, request_type, request_data):
+    # What parse_llm_response used to do: json.loads, then dump again to validate
+    response_model, normalize = match_request_type(
+        RESPONSE_PARSERS, request_type, "Unsupported request type"
+    )
+    json_data = json.loads(content)
+    if normalize is not None:
+        json_data = normalize(json_data, request_data)
+    return response_model.model_validate_json(json.dumps(json_data))
+
+
+def bench(label, func, iterations):
+    seconds = min(timeit.repeat(func, number=iterations, repeat=5)) / iterations
+    print(f"{label:<45} {seconds * 1e6:>10.2f} us/call")
+
+
+def main(iterations=2000):
+    # Keep logging out of the measurement
+    logging.disable(logging.CRITICAL)
+    with open(LLM_RESPONSES_PATH, "r") as file:
+        records = json.load(file)
+
+    for record in records:
+        content = record["content"]
+        request_type = record["request_type"]
+        request_data = record["request_data"]
+        # The legacy parser cannot repair, so give it the already repaired response
+        legacy_content = content
+        try:
+            json.loads(content)
+        except json.JSONDecodeError:
+            legacy_content = repair_json(content)
+
+        print(f"{request_type} ({len(content)} chars)")
+        bench(
+            "  legacy loads + dumps + validate_json",
+            lambda: parse_legacy(legacy_content, request_type, dict(request_data)),
+            iterations,
+        )
+        with patch.object(llm_processing, "orjson", None):
+            bench(
+                "  parse_llm_response (json)",
+                lambda: parse_llm_response(content, request_type, dict(request_data)),
+                iterations,
+            )
+        if llm_processing.orjson is not None:
+            bench(
+                "  parse_llm_response (orjson)",
+                lambda: parse_llm_response(content, request_type, dict(request_data)),
+                iterations,
+            )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,118 @@
+"""Measure prompt assembly cost per call.
+
+Usage: python -m raggaeton.backend.benchmarks.bench_prompts [iterations]
+"""
+
+import sys
+import timeit
+import logging
+from raggaeton.backend.src.api.services.prompts import (
+    prompt_registry,
+    get_compiled_prompts,
+    get_prompts,
+    get_content_block_suggestions,
+    format_content_block_suggestions,
+)
+from raggaeton.backend.src.schemas.content import (
+    GenerateDraftRequest,
+    GenerateFullContentRequest,
+)
+
+CONTEXT = {"context": "Fu Gai mountain has steep stone steps and caves. " * 200}
+OPTIONAL_PARAMS = {
+    "desired_length": 800,
+    "personas": ["hikers"],
+    "scratchpad": "I saw an ant move a flower on the hike.",
+}
+OPTIONAL_KEYS = (
+    "data",
+    "publication",
+    "country",
+    "personas",
+    "desired_length",
+    "scratchpad",
+)
+DRAFT_FIELDS = {
+    "topics": ["Hiking", "Climbing Fu Gai Mountain in Zhejiang"],
+    "context": CONTEXT,
+    "headline": "Climbing Fu Gai",
+    "hook": "Why walk uphill?",
+    "thesis": "The climb is the point.",
+    "article_type": "travel",
+    "optional_params": OPTIONAL_PARAMS,
+}
+OUTLINES = [
+    {
+        "content_block": f"Block {i}",
+        "details": "What happens here",
+        "topic_sentences": ["A sentence."],
+        "paragraphs": ["A paragraph. " * 20],
+    }
+    for i in range(6)
+]
+CASES = {
+    "generate_draft_travel": GenerateDraftRequest(**DRAFT_FIELDS),
+    "generate_full_content": GenerateFullContentRequest(
+        **DRAFT_FIELDS, draft_outlines=OUTLINES
+    ),
+}
+
+
+def render_uncompiled(function_name, params):
+    # What get_prompts used to do per call: str.format plus rebuilding suggestions
+    prompt_config = prompt_registry.snapshot.prompts[function_name]
+    message_prompt = prompt_config["message_prompt"].format(**params)
+    structures = prompt_config.get("structures", [])
+    suggestions = format_content_block_suggestions(
+        get_content_block_suggestions(structures) if structures else []
+    )
+    return f"{message_prompt}\n\n{suggestions}" if suggestions else message_prompt
+
+
+def render_params(request):
+    params = request.model_dump(exclude_unset=True, exclude_none=True)
+    optional_params = params.get("optional_params", {})
+    params["optional_params"] = {key: optional_params.get(key) for key in OPTIONAL_KEYS}
+    params.setdefault("draft_outlines", "None")
+    params.update(
+        {
+            "textfx_instructions": "",
+            "full_content_response": "None",
+            "edit_type": "None",
+        }
+    )
+    return params
+
+
+def bench(label, func, iterations):
+    seconds = min(timeit.repeat(func, number=iterations, repeat=5)) / iterations
+    print(f"{label:<45} {seconds * 1e6:>10.2f} us/call")
+
+
+def main(iterations=2000):
+    # Keep logging out of the measurement
+    logging.disable(logging.CRITICAL)
+    for function_name, request in CASES.items():
+        params = render_params(request)
+        template = get_compiled_prompts()[function_name]
+        # Suggestions now sit in the static prefix rather than the message
+        assert template.render(params) + "\n\n" * bool(
+            template.suggestions
+        ) + template.suggestions == render_uncompiled(function_name, params)
+
+        print(function_name)
+        bench(
+            "  uncompiled render",
+            lambda: render_uncompiled(function_name, params),
+            iterations,
+        )
+        bench("  compiled render", lambda: template.render(params), iterations)
+        bench(
+            "  get_prompts (request -> prompts)",
+            lambda: get_prompts(function_name, request),
+            iterations,
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
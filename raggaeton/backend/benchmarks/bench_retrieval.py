@@ -0,0 +1,278 @@
+"""Measure retrieval speed and quality on the queries in tests/fixtures/goldens.json.
+
+Quality is judged against a stored reference ranking: save one from a trusted setup
+with --save-reference, then later runs report recall@k and overlap against it.
+
+Usage: python -m raggaeton.backend.benchmarks.bench_retrieval --retriever colbert
+    [--top-k 10] [--batch-sizes 1 4 16] [--save-reference | --reference PATH]
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from raggaeton.backend.src.utils.common import load_config, base_dir
+from raggaeton.backend.src.utils.error_handler import DataError
+from raggaeton.backend.benchmarks.results import (
+    RESULTS_DIR,
+    summarize,
+    write_results,
+)
+
+GOLDENS_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "tests", "fixtures", "goldens.json"
+)
+
+try:
+    import psutil
+except ImportError:  # falls back to peak RSS from the resource module
+    psutil = None
+
+
+def load_goldens(path=GOLDENS_PATH):
+    with open(path, "r") as file:
+        return [golden["query"] for golden in json.load(file)]
+
+
+def memory_bytes():
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    import resource
+
+    # Peak rather than current RSS, in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def directory_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for file_name in files:
+            total += os.path.getsize(os.path.join(root, file_name))
+    return total
+
+
+def node_key(node_with_score):
+    # Source document ids survive re-chunking and re-indexing, node ids do not
+    node = getattr(node_with_score, "node", node_with_score)
+    metadata = getattr(node, "metadata", None) or {}
+    for key in ("id", "link", "url"):
+        if metadata.get(key):
+            return str(metadata[key])
+    text = node.get_content() if hasattr(node, "get_content") else str(node)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def ranking(nodes, top_k):
+    # Several chunks of one document count once, at their best rank
+    keys = []
+    for node in nodes:
+        key = node_key(node)
+        if key not in keys:
+            keys.append(key)
+    return keys[:top_k]
+
+
+def score_against_reference(rankings, reference):
+    """Mean recall@k and overlap (Jaccard) of `rankings` against `reference`."""
+    recalls, overlaps = [], []
+    for query, keys in rankings.items():
+        expected = reference.get(query)
+        if not expected:
+            continue
+        hits = set(keys) & set(expected)
+        recalls.append(len(hits) / len(expected))
+        overlaps.append(len(hits) / len(set(keys) | set(expected)))
+    if not recalls:
+        return {"queries": 0, "recall": None, "overlap": None}
+    return {
+        "queries": len(recalls),
+        "recall": round(sum(recalls) / len(recalls), 4),
+        "overlap": round(sum(overlaps) / len(overlaps), 4),
+    }
+
+
+def measure_throughput(retrieve, queries, batch_size):
+    # Queries are issued batch_size at a time, as concurrent requests would be
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=batch_size) as executor:
+        list(executor.map(retrieve, queries))
+    return round(len(queries) / (time.perf_counter() - started), 2)
+
+
+def run_retrieval_benchmark(
+    retrieve, queries, top_k=10, batch_sizes=(1, 4, 16), reference=None
+):
+    """Time `retrieve(query) -> nodes` over `queries` and score it.
+
+    Returns latency percentiles, throughput per batch size, the ranking per query
+    and, when a reference is given, recall and overlap against it.
+    """
+    # One untimed query loads models and warms caches
+    retrieve(queries[0])
+    latencies, rankings = [], {}
+    for query in queries:
+        started = time.perf_counter()
+        nodes = retrieve(query)
+        latencies.append(time.perf_counter() - started)
+        rankings[query] = ranking(nodes, top_k)
+
+    return {
+        "queries": len(queries),
+        "latency_ms": summarize(latencies),
+        "throughput_qps": {
+            str(batch_size): measure_throughput(retrieve, queries, batch_size)
+            for batch_size in batch_sizes
+        },
+        "quality": score_against_reference(rankings, reference or {}),
+        "rankings": rankings,
+    }
+
+
+def build_colbert(config, top_k, limit):
+    from llama_index.core.schema import NodeWithScore, TextNode
+    from raggaeton.backend.src.api.services.index import create_ragatouille_index
+    from raggaeton.backend.src.utils.index_versions import resolve_index_path
+    from raggaeton.backend.src.utils.utils import create_mock_document
+
+    # Benchmarks the published index read-only, never building into it
+    index_name = config["index_name"]
+    index_path = resolve_index_path(index_name)
+    if index_path is None:
+        raise DataError(f"No published version of index {index_name} to benchmark")
+    # The documents are only used when building, the index already holds them
+    pack = create_ragatouille_index([create_mock_document()], index_name, index_path)
+    rag = pack.get_modules()["RAG"]
+
+    def retrieve(query):
+        return [
+            NodeWithScore(node=TextNode(text=result["content"]), score=result["score"])
+            for result in rag.search(query, index_name=index_name, k=top_k)
+        ]
+
+    return retrieve, {"index_bytes": directory_size(index_path)}
+
+
+def build_supabase(config, top_k, limit):
+    from llama_index.core import VectorStoreIndex
+    from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+    from llama_index.vector_stores.supabase import SupabaseVectorStore
+
+    vector_store = SupabaseVectorStore(
+        postgres_connection_string=(
+            f"postgresql://{config['supabase_user']}:{os.getenv('SUPABASE_PW')}"
+            f"@{config['supabase_host']}:5432/postgres"
+        ),
+        collection_name=config["index_name"],
+        dimension=config["embedding"]["dimension"][0],
+    )
+    embed_model = HuggingFaceEmbedding(
+        model_name=config["embedding"]["models"][0], trust_remote_code=True
+    )
+    index = VectorStoreIndex.from_vector_store(vector_store, embed_model=embed_model)
+    retriever = index.as_retriever(similarity_top_k=top_k)
+    # The vectors live in Postgres, so there is no local index to measure
+    return retriever.retrieve, {"index_bytes": None}
+
+
+def build_summary(config, top_k, limit):
+    from llama_index.core import SummaryIndex
+    from raggaeton.backend.src.api.endpoints.index import load_documents
+
+    index = SummaryIndex.from_documents(load_documents(limit=limit))
+    retriever = index.as_retriever()
+    return retriever.retrieve, {
+        "index_bytes": sum(
+            len(node.get_content().encode("utf-8"))
+            for node in index.docstore.docs.values()
+        ),
+        "index_nodes": len(index.docstore.docs),
+    }
+
+
+RETRIEVERS = {
+    "colbert": build_colbert,
+    "supabase": build_supabase,
+    "summary": build_summary,
+}
+
+
+def build_retriever(name, config, top_k, limit=None):
+    """Build a retriever by name, recording build time, memory and index size."""
+    memory_before = memory_bytes()
+    started = time.perf_counter()
+    retrieve, index_stats = RETRIEVERS[name](config, top_k, limit)
+    return retrieve, {
+        "build_seconds": round(time.perf_counter() - started, 3),
+        "memory_delta_mb": round((memory_bytes() - memory_before) / 2**20, 1),
+        **index_stats,
+    }
+
+
+def reference_path(retriever_name):
+    return os.path.join(RESULTS_DIR, f"retrieval-reference-{retriever_name}.json")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--retriever", choices=sorted(RETRIEVERS), default="colbert")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument(
+        "--limit", type=int, help="Documents to index, if building (summary only)"
+    )
+    parser.add_argument("--goldens", default=GOLDENS_PATH)
+    parser.add_argument("--reference", help="Reference ranking to score against")
+    parser.add_argument(
+        "--save-reference",
+        action="store_true",
+        help="Store this run's rankings as the reference",
+    )
+    parser.add_argument("--output", help="Where to write the JSON results")
+    args = parser.parse_args(argv)
+    logging.disable(logging.INFO)
+
+    config = load_config()
+    queries = load_goldens(args.goldens)
+    reference_file = args.reference or reference_path(args.retriever)
+    reference = {}
+    if not args.save_reference and os.path.exists(reference_file):
+        with open(reference_file, "r") as file:
+            reference = json.load(file)["rankings"]
+
+    retrieve, index_stats = build_retriever(
+        args.retriever, config, args.top_k, args.limit
+    )
+    result = run_retrieval_benchmark(
+        retrieve, queries, args.top_k, args.batch_sizes, reference
+    )
+    latency, quality = result["latency_ms"], result["quality"]
+    print(
+        f"{args.retriever}: p50 {latency['p50']}ms  p95 {latency['p95']}ms  "
+        f"p99 {latency['p99']}ms  throughput {result['throughput_qps']} q/s"
+    )
+    print(f"index {index_stats}")
+    if quality["queries"]:
+        print(
+            f"recall@{args.top_k} {quality['recall']}  overlap {quality['overlap']} "
+            f"over {quality['queries']} queries"
+        )
+
+    report = {
+        "retriever": args.retriever,
+        "top_k": args.top_k,
+        "index": index_stats,
+        **result,
+    }
+    if args.save_reference:
+        output = write_results("retrieval-reference", report, reference_file)
+        print(f"Reference ranking written to {output}")
+    output = write_results(f"retrieval-{args.retriever}", report, args.output)
+    print(f"Results written to {os.path.relpath(output, base_dir)}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
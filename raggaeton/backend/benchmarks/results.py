@@ -0,0 +1,66 @@
+"""Shared helpers for benchmark statistics and JSON result files."""
+
+import os
+import json
+import time
+import subprocess
+from raggaeton.backend.src.utils.common import base_dir
+
+RESULTS_DIR = os.path.join(base_dir, "cache", "benchmarks")
+# Recorded LLM responses, shared with tests/test_llm_processing.py
+LLM_RESPONSES_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "tests", "fixtures", "llm_responses.json"
+)
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(values):
+    # Seconds in, milliseconds out
+    return {
+        f"p{pct}": round(percentile(values, pct) * 1000, 2) if values else None
+        for pct in (50, 95, 99)
+    } | {"max": round(max(values) * 1000, 2) if values else None}
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=base_dir,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def write_results(name, report, output=None):
+    """Write `report` with the commit and time added; returns the file path."""
+    commit = git_commit()
+    report = {"commit": commit, "created_at": time.time(), **report}
+    output = output or os.path.join(
+        RESULTS_DIR, f"{name}-{commit}-{int(time.time())}.json"
+    )
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as file:
+        json.dump(report, file, indent=2)
+    return output
+
+
+def load_results(path):
+    with open(path, "r") as file:
+        return json.load(file)
+
+
+def relative_change(before, after):
+    if not before or after is None:
+        return None
+    return (after - before) / before
@@ -0,0 +1,369 @@
+"""Sweep chunking and embedding settings and compare the resulting indexes.
+
+Every combination of document.chunk_size, document.overlap, embedding.models and
+embedding.dimension in config.yaml is built and scored on the goldens queries. Work
+is shared between configurations: documents are loaded and parsed as Markdown once,
+each chunk split is embedded once per model, and every dimension reuses the full
+embeddings truncated and renormalised. Embeddings are also cached on disk, so an
+interrupted or repeated sweep only embeds what is new.
+
+Each configuration reports the split and embed time of the shared stages it uses,
+whichever configuration ran them, and its own build time on top. None of the swept
+models (gte-v1.5, UAE-Large, GritLM) is trained for Matryoshka-style truncation, so
+recall at a reduced dimension only approximates what a natively smaller embedding
+would reach.
+
+Recall is measured against --reference, or by default against the first
+configuration (index [0] of each list, what create_index builds today).
+
+Usage: python -m raggaeton.backend.benchmarks.sweep_chunking [--limit 200]
+    [--chunk-sizes 512 256] [--models ...] [--dimensions ...] [--top-k 10]
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from llama_index.core.node_parser import MarkdownNodeParser, SentenceSplitter
+from raggaeton.backend.src.api.services.dag import make_input_key
+from raggaeton.backend.src.utils.common import load_config, base_dir
+from raggaeton.backend.benchmarks.bench_retrieval import (
+    load_goldens,
+    run_retrieval_benchmark,
+    score_against_reference,
+)
+from raggaeton.backend.benchmarks.results import write_results
+
+logger = logging.getLogger(__name__)
+
+
+class SweepConfig:
+    def __init__(self, chunk_size, overlap, model, dimension):
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+        self.model = model
+        self.dimension = dimension
+
+    @property
+    def split(self):
+        return (self.chunk_size, self.overlap)
+
+    @property
+    def name(self):
+        model = self.model.split("/")[-1]
+        return f"{self.chunk_size}/{self.overlap} {model} d{self.dimension}"
+
+
+def truncate_embeddings(embeddings, dimension):
+    # Keep the leading dimensions and renormalise so dot products stay cosines
+    truncated = embeddings[:, :dimension]
+    norms = np.linalg.norm(truncated, axis=1, keepdims=True)
+    return truncated / np.where(norms == 0, 1, norms)
+
+
+class ChunkingSweep:
+    """Builds and scores one in-memory index per configuration, sharing the stages
+    configurations have in common."""
+
+    def __init__(self, documents, load_embed_model, cache_dir, max_workers=4):
+        self.documents = documents
+        self.load_embed_model = load_embed_model
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.corpus_key = make_input_key(
+            "corpus", 1, [(doc.doc_id, doc.hash) for doc in documents]
+        )
+        self._sections = None
+        self._splits = {}
+        self._embeddings = {}
+        # Seconds each shared stage result took, charged to every configuration using it
+        self._split_seconds = {}
+        self._embed_seconds = {}
+        self._models = {}
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        self.stage_seconds = {"parse": 0.0, "split": 0.0, "embed": 0.0}
+
+    def _lock(self, key):
+        # One lock per shared stage result, so parallel configurations wait for it
+        # instead of computing it twice
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def sections(self):
+        with self._lock("sections"):
+            if self._sections is None:
+                started = time.perf_counter()
+                self._sections = MarkdownNodeParser().get_nodes_from_documents(
+                    self.documents
+                )
+                self.stage_seconds["parse"] += time.perf_counter() - started
+        return self._sections
+
+    def split(self, chunk_size, overlap):
+        key = (chunk_size, overlap)
+        with self._lock(("split", key)):
+            if key not in self._splits:
+                # Parsed first so its time is not charged to this split
+                sections = self.sections()
+                started = time.perf_counter()
+                splitter = SentenceSplitter(
+                    chunk_size=chunk_size, chunk_overlap=overlap
+                )
+                self._splits[key] = splitter(sections)
+                self._split_seconds[key] = time.perf_counter() - started
+                self.stage_seconds["split"] += self._split_seconds[key]
+        return self._splits[key]
+
+    def embed_model(self, model_name):
+        with self._lock(("model", model_name)):
+            if model_name not in self._models:
+                self._models[model_name] = self.load_embed_model(model_name)
+        return self._models[model_name]
+
+    def embeddings(self, chunk_size, overlap, model_name):
+        key = (chunk_size, overlap, model_name)
+        with self._lock(("embed", key)):
+            if key not in self._embeddings:
+                self._embeddings[key] = self._load_or_embed(*key)
+        return self._embeddings[key]
+
+    def _load_or_embed(self, chunk_size, overlap, model_name):
+        cache_key = make_input_key(
+            "embed",
+            1,
+            {
+                "corpus": self.corpus_key,
+                "chunk_size": chunk_size,
+                "overlap": overlap,
+                "model": model_name,
+            },
+        )
+        cache_path = os.path.join(self.cache_dir, f"{cache_key}.npy")
+        if os.path.exists(cache_path):
+            self._embed_seconds[(chunk_size, overlap, model_name)] = 0.0
+            return np.load(cache_path)
+
+        nodes = self.split(chunk_size, overlap)
+        started = time.perf_counter()
+        embeddings = np.asarray(
+            self.embed_model(model_name).get_text_embedding_batch(
+                [node.get_content() for node in nodes]
+            ),
+            dtype=np.float32,
+        )
+        self._embed_seconds[(chunk_size, overlap, model_name)] = (
+            time.perf_counter() - started
+        )
+        self.stage_seconds["embed"] += time.perf_counter() - started
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Write then rename so an interrupted sweep never leaves a partial file
+        tmp_path = f"{cache_path}.{threading.get_ident()}.tmp.npy"
+        np.save(tmp_path, embeddings)
+        os.replace(tmp_path, cache_path)
+        return embeddings
+
+    def build(self, sweep_config):
+        """Return `retrieve(query, top_k)` over the configuration's index, plus its
+        size and the seconds spent on it: the split and embed stages it uses (0 for
+        embeddings read from the disk cache) and its own build on top of them."""
+        nodes = self.split(*sweep_config.split)
+        full = self.embeddings(*sweep_config.split, sweep_config.model)
+        if sweep_config.dimension > full.shape[1]:
+            raise ValueError(
+                f"{sweep_config.model} has {full.shape[1]} dimensions, "
+                f"not {sweep_config.dimension}"
+            )
+        started = time.perf_counter()
+        vectors = truncate_embeddings(full, sweep_config.dimension)
+        embed_model = self.embed_model(sweep_config.model)
+
+        def retrieve(query, top_k=10):
+            query_vector = truncate_embeddings(
+                np.asarray([embed_model.get_query_embedding(query)], dtype=np.float32),
+                sweep_config.dimension,
+            )[0]
+            scores = vectors @ query_vector
+            top = np.argsort(-scores)[:top_k]
+            return [nodes[index] for index in top]
+
+        index_stats = {
+            "split_seconds": round(self._split_seconds[sweep_config.split], 3),
+            "embed_seconds": round(
+                self._embed_seconds[(*sweep_config.split, sweep_config.model)], 3
+            ),
+            "build_seconds": round(time.perf_counter() - started, 3),
+            # Leading dimensions of a model not trained for it, recall is approximate
+            "truncated": sweep_config.dimension < full.shape[1],
+            "chunks": len(nodes),
+            "index_bytes": int(vectors.nbytes)
+            + sum(len(node.get_content().encode("utf-8")) for node in nodes),
+        }
+        return retrieve, index_stats
+
+    def evaluate(self, sweep_config, queries, top_k, reference=None):
+        retrieve, index_stats = self.build(sweep_config)
+        result = run_retrieval_benchmark(
+            # Extra chunks so top_k distinct documents remain after deduplication
+            lambda query: retrieve(query, top_k * 3),
+            queries,
+            top_k=top_k,
+            batch_sizes=(),
+            reference=reference,
+        )
+        return {"config": sweep_config.__dict__, "index": index_stats, **result}
+
+    def run(self, sweep_configs, queries, top_k=10, reference=None):
+        """Score every configuration, the first one being the default reference."""
+        results = {}
+        if reference is None:
+            baseline = self.evaluate(sweep_configs[0], queries, top_k)
+            reference = baseline["rankings"]
+            baseline["quality"] = score_against_reference(reference, reference)
+            results[sweep_configs[0].name] = baseline
+            sweep_configs = sweep_configs[1:]
+
+        def evaluate(sweep_config):
+            try:
+                return self.evaluate(sweep_config, queries, top_k, reference)
+            except ValueError as e:
+                logger.warning(f"Skipping {sweep_config.name}: {e}")
+                return {"config": sweep_config.__dict__, "error": str(e)}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for sweep_config, result in zip(
+                sweep_configs, executor.map(evaluate, sweep_configs)
+            ):
+                results[sweep_config.name] = result
+        return results
+
+
+def expand_configs(chunk_sizes, overlaps, models, dimensions):
+    return [
+        SweepConfig(chunk_size, overlap, model, dimension)
+        for chunk_size, overlap, model, dimension in itertools.product(
+            chunk_sizes, overlaps, models, dimensions
+        )
+        if overlap < chunk_size
+    ]
+
+
+def format_table(results):
+    header = (
+        f"{'configuration':<40} {'chunks':>7} {'split s':>8} {'embed s':>8} "
+        f"{'build s':>8} {'size MB':>8} {'p50 ms':>7} {'p95 ms':>7} "
+        f"{'recall':>8} {'overlap':>8}"
+    )
+    lines = [header, "-" * len(header)]
+    for name, result in results.items():
+        if "error" in result:
+            lines.append(f"{name:<40} skipped: {result['error']}")
+            continue
+        index, latency, quality = (
+            result["index"],
+            result["latency_ms"],
+            result["quality"],
+        )
+        recall = f"{quality['recall'] or 0:.3f}" + ("*" if index["truncated"] else "")
+        lines.append(
+            f"{name:<40} {index['chunks']:>7} {index['split_seconds']:>8.2f} "
+            f"{index['embed_seconds']:>8.2f} {index['build_seconds']:>8.2f} "
+            f"{index['index_bytes'] / 2**20:>8.1f} {latency['p50']:>7.2f} "
+            f"{latency['p95']:>7.2f} {recall:>8} {quality['overlap'] or 0:>8.3f}"
+        )
+    if any(result.get("index", {}).get("truncated") for result in results.values()):
+        lines.append(
+            "\n* Truncated embeddings of a model not trained for Matryoshka-style "
+            "truncation (gte-v1.5, UAE-Large, GritLM): recall approximates a "
+            "natively smaller embedding."
+        )
+    return "\n".join(lines)
+
+
+def load_huggingface_model(model_name, batch_size=100):
+    from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+
+    return HuggingFaceEmbedding(
+        model_name=model_name, trust_remote_code=True, embed_batch_size=batch_size
+    )
+
+
+def main(argv=None):
+    config = load_config()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--chunk-sizes", type=int, nargs="+", default=config["document"]["chunk_size"]
+    )
+    parser.add_argument(
+        "--overlaps", type=int, nargs="+", default=config["document"]["overlap"]
+    )
+    parser.add_argument("--models", nargs="+", default=config["embedding"]["models"])
+    parser.add_argument(
+        "--dimensions", type=int, nargs="+", default=config["embedding"]["dimension"]
+    )
+    parser.add_argument("--limit", type=int, help="Documents to load")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--reference", help="Reference ranking to score against")
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=config.get("pipeline", {}).get("max_workers", 4),
+    )
+    parser.add_argument(
+        "--cache-dir", default=os.path.join(base_dir, "cache", "sweep", "embeddings")
+    )
+    parser.add_argument("--output", help="Where to write the JSON results")
+    args = parser.parse_args(argv)
+    logging.disable(logging.INFO)
+
+    from raggaeton.backend.src.api.endpoints.index import load_documents
+
+    reference = None
+    if args.reference:
+        with open(args.reference, "r") as file:
+            reference = json.load(file)["rankings"]
+
+    batch_size = config["embedding"].get("batch_size", 100)
+    sweep = ChunkingSweep(
+        load_documents(limit=args.limit),
+        lambda model_name: load_huggingface_model(model_name, batch_size),
+        args.cache_dir,
+        args.max_workers,
+    )
+    sweep_configs = expand_configs(
+        args.chunk_sizes, args.overlaps, args.models, args.dimensions
+    )
+    started = time.perf_counter()
+    results = sweep.run(sweep_configs, load_goldens(), args.top_k, reference)
+
+    print(format_table(results))
+    print(
+        f"\n{len(sweep_configs)} configurations in "
+        f"{time.perf_counter() - started:.1f}s, shared stages: "
+        + ", ".join(
+            f"{stage} {seconds:.1f}s" for stage, seconds in sweep.stage_seconds.items()
+        )
+    )
+    output = write_results(
+        "sweep",
+        {
+            "limit": args.limit,
+            "top_k": args.top_k,
+            "stage_seconds": sweep.stage_seconds,
+            # Configurations with index.truncated set
+            "truncated_recall": "approximate, the models are not trained for truncation",
+            "configurations": results,
+        },
+        args.output,
+    )
+    print(f"Results written to {os.path.relpath(output, base_dir)}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
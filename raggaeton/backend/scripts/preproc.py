@@ -3,6 +3,7 @@ import requests
 from supabase import create_client
 import logging
 from raggaeton.backend.src.utils.common import load_config
+from raggaeton.backend.src.api.services.jobs import report_progress
 
 config = load_config()
 logger = logging.getLogger(__name__)
@@ -62,7 +63,7 @@ def main(limit=None):
         logger.info("No records found to process")
         return
 
-    for record in records:
+    for processed, record in enumerate(records, 1):
         record_id = record["id"]
         html_content = record["content"]
 
@@ -77,6 +78,7 @@ def main(limit=None):
             logger.info(f"Successfully processed record ID: {record_id}")
         except Exception as e:
             logger.error(f"Error processing record ID {record_id}: {e}")
+        report_progress(processed, len(records))
 
 
 if __name__ == "__main__":
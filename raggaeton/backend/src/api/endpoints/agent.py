@@ -7,11 +7,12 @@ from llama_index.core import Settings
 from raggaeton.backend.src.utils.common import load_config, base_dir, config_loader
 from raggaeton.backend.src.api.endpoints.tools import (
     create_google_search_tool,
-    create_rag_query_tool,
+    create_rag_tools,
 )
 from raggaeton.backend.src.api.endpoints.index import load_documents
-from raggaeton.backend.src.api.endpoints.tools import load_rag_query_tool
+from raggaeton.backend.src.api.endpoints.tools import load_rag_tools
 from raggaeton.backend.src.utils.error_handler import ConfigurationError
+from raggaeton.backend.src.utils.index_versions import resolve_index_path
 from typing import Optional, Dict, Any
 
 logger = logging.getLogger(__name__)
@@ -111,21 +112,23 @@ def init_agent(index_path=None, **kwargs):
     logger.debug("Created Google search tool")
 
     if index_path is None:
-        index_path = os.path.join(base_dir, ".ragatouille/colbert/indexes/my_index")
+        index_path = resolve_index_path(
+            "my_index",
+            default=os.path.join(base_dir, ".ragatouille/colbert/indexes/my_index"),
+        )
 
     logger.debug(f"Using index path: {index_path}")
 
     if os.path.exists(index_path):
-        logger.debug(f"Index path {index_path} exists. Loading RAG query tool.")
-        rag_query_tool = load_rag_query_tool(index_path=index_path)
-        tools = [google_search_tool, rag_query_tool]
+        logger.debug(f"Index path {index_path} exists. Loading RAG tools.")
+        tools = [google_search_tool, *load_rag_tools(index_path=index_path)]
     else:
         logger.warning(
             f"Index path {index_path} does not exist. Initializing agent with default configuration."
         )
         documents = load_documents()
         logger.debug(f"Loaded documents: {documents}")
-        tools = [google_search_tool, create_rag_query_tool(docs=documents)]
+        tools = [google_search_tool, *create_rag_tools(docs=documents)]
 
     agent = create_agent(agent_type="openai", tools=tools, config=config)
     logger.info(f"Agent initialized successfully with type: {type(agent)}")
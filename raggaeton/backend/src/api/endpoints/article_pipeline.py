@@ -0,0 +1,229 @@
+import os
+import asyncio
+import argparse
+import logging
+from llama_index.core import Document, Settings
+from raggaeton.backend.src.schemas.research import (
+    GenerateResearchQuestionsRequest,
+    DoResearchRequest,
+)
+from raggaeton.backend.src.schemas.content import (
+    GenerateHeadlinesRequest,
+    GenerateDraftRequest,
+    GenerateTopicSentencesRequest,
+    GenerateFullContentRequest,
+    EditContentRequest,
+)
+from raggaeton.backend.src.api.endpoints.generate_research import (
+    generate_research_questions,
+    do_research,
+)
+from raggaeton.backend.src.api.endpoints.generate_headlines import generate_headlines
+from raggaeton.backend.src.api.endpoints.generate_draft import generate_draft
+from raggaeton.backend.src.api.endpoints.generate_topic_sentences import (
+    generate_topic_sentences,
+)
+from raggaeton.backend.src.api.endpoints.generate_full_content import (
+    generate_full_content,
+)
+from raggaeton.backend.src.api.endpoints.edit_content import edit_content
+from raggaeton.backend.src.api.services.dag import Stage, DAGRunner, CheckpointStore
+from raggaeton.backend.src.api.services.llm_cache import bypass_response_cache
+from raggaeton.backend.src.api.services.index import (
+    create_ragatouille_index,
+    retrieve_nodes,
+    construct_query,
+)
+from raggaeton.backend.src.utils.common import config_loader, base_dir
+
+logger = logging.getLogger(__name__)
+
+
+def draft_request_fields(inputs, draft):
+    params = inputs["params"]
+    return {
+        "topics": params["topics"],
+        "context": {"context": inputs["context"]["context"]},
+        "headline": draft["headline"],
+        "hook": draft["hook"],
+        "thesis": draft["thesis"],
+        "article_type": draft["article_type"],
+        "optional_params": params.get("optional_params"),
+    }
+
+
+async def research_questions_stage(inputs):
+    params = inputs["params"]
+    request = GenerateResearchQuestionsRequest(
+        topics=params["topics"],
+        article_types=params["article_types"],
+        platforms=params["platforms"],
+        optional_params=params.get("optional_params"),
+    )
+    return await generate_research_questions(request)
+
+
+async def research_stage(inputs):
+    request = DoResearchRequest(
+        research_questions=inputs["research_questions"]["research_questions"],
+        optional_params=inputs["params"].get("optional_params"),
+    )
+    return await do_research(request)
+
+
+def context_stage(inputs):
+    config = config_loader.config
+    Settings.chunk_size = config["document"]["chunk_size"][0]
+    Settings.chunk_overlap = config["document"]["overlap"][0]
+
+    documents = [
+        Document(
+            text=item["raw_content"],
+            metadata={k: v for k, v in item.items() if k != "raw_content"},
+        )
+        for platform_results in inputs["research"]["fetched_research"].values()
+        for item in platform_results.get("results", [])
+        if item.get("raw_content")
+    ]
+    ragatouille_pack = create_ragatouille_index(documents, config["index_name"])
+    nodes = retrieve_nodes(
+        ragatouille_pack, construct_query(inputs["params"]["topics"])
+    )
+    return {"context": "\n".join([node.text for node in nodes])}
+
+
+async def headlines_stage(inputs):
+    params = inputs["params"]
+    request = GenerateHeadlinesRequest(
+        article_types=", ".join(params["article_types"]),
+        topics=params["topics"],
+        context={"context": inputs["context"]["context"]},
+        optional_params=params.get("optional_params"),
+    )
+    return await generate_headlines(request)
+
+
+async def drafts_stage(inputs):
+    responses = await asyncio.gather(
+        *(
+            generate_draft(
+                GenerateDraftRequest(**draft_request_fields(inputs, headline))
+            )
+            for headline in inputs["headlines"]["headlines"]
+        )
+    )
+    return {"drafts": [draft for response in responses for draft in response.drafts]}
+
+
+async def topic_sentences_stage(inputs):
+    return await asyncio.gather(
+        *(
+            generate_topic_sentences(
+                GenerateTopicSentencesRequest(
+                    **draft_request_fields(inputs, draft),
+                    draft_outlines=draft["draft_outlines"],
+                )
+            )
+            for draft in inputs["drafts"]["drafts"]
+        )
+    )
+
+
+async def full_content_stage(inputs):
+    return await asyncio.gather(
+        *(
+            generate_full_content(
+                GenerateFullContentRequest(
+                    **draft_request_fields(inputs, draft),
+                    draft_outlines=topic_sentences["draft_outlines"],
+                )
+            )
+            for draft, topic_sentences in zip(
+                inputs["drafts"]["drafts"], inputs["topic_sentences"]
+            )
+        )
+    )
+
+
+async def edit_content_stage(inputs):
+    return await asyncio.gather(
+        *(
+            edit_content(
+                EditContentRequest(
+                    **draft_request_fields(inputs, draft),
+                    full_content_response=full_content,
+                    edit_type=inputs["params"].get("edit_type", "structure"),
+                )
+            )
+            for draft, full_content in zip(
+                inputs["drafts"]["drafts"], inputs["full_content"]
+            )
+        )
+    )
+
+
+ARTICLE_STAGES = [
+    Stage("research_questions", research_questions_stage),
+    Stage("research", research_stage, depends_on=["research_questions"]),
+    Stage("context", context_stage, depends_on=["research"]),
+    Stage("headlines", headlines_stage, depends_on=["context"]),
+    Stage("drafts", drafts_stage, depends_on=["context", "headlines"]),
+    Stage("topic_sentences", topic_sentences_stage, depends_on=["context", "drafts"]),
+    Stage(
+        "full_content",
+        full_content_stage,
+        depends_on=["context", "drafts", "topic_sentences"],
+    ),
+    Stage(
+        "edit_content",
+        edit_content_stage,
+        depends_on=["context", "drafts", "full_content"],
+    ),
+]
+
+
+def build_article_pipeline(checkpoint_dir=None):
+    checkpoint_dir = checkpoint_dir or config_loader.config.get("pipeline", {}).get(
+        "checkpoint_dir", "cache/pipeline"
+    )
+    store = CheckpointStore(os.path.join(base_dir, checkpoint_dir))
+    # A forced stage must call the LLM again, not replay its cached responses
+    return DAGRunner(ARTICLE_STAGES, store, force_context=bypass_response_cache)
+
+
+async def run_article_pipeline(params, targets=None, force=()):
+    run = await build_article_pipeline().run(params, targets=targets, force=force)
+    for name, stage in run["stages"].items():
+        logger.info(f"Stage {name}: {stage['status']} in {stage['seconds']:.2f}s")
+    return run
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run the article pipeline, resuming from stage checkpoints."
+    )
+    parser.add_argument(
+        "--rerun",
+        action="append",
+        default=[],
+        help="Re-run this stage even if it has a checkpoint (repeatable)",
+    )
+    parser.add_argument(
+        "--until", help="Stop after this stage instead of running the whole pipeline"
+    )
+    args = parser.parse_args()
+
+    params = {
+        "topics": ["Hiking", "Climbing Fu Gai Mountain in Zhejiang"],
+        "article_types": ["travel"],
+        "platforms": ["you.com", "obsidian"],
+        "optional_params": {"desired_length": 600},
+        "edit_type": "structure",
+    }
+    asyncio.run(
+        run_article_pipeline(
+            params,
+            targets=[args.until] if args.until else None,
+            force=set(args.rerun),
+        )
+    )
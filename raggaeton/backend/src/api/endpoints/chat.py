@@ -1,13 +1,19 @@
+import asyncio
 import logging
 from fastapi import FastAPI, Request
 from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from raggaeton.backend.src.api.endpoints.agent import get_agent
+from raggaeton.backend.src.api.endpoints.agent import get_agent, cached_agents
 from raggaeton.backend.src.utils.common import config_loader, base_dir
 from raggaeton.backend.src.utils.error_handler import (
     error_handling_context,
     InitializationError,
 )
+from raggaeton.backend.src.utils.index_versions import (
+    IndexHotSwap,
+    get_versions_config,
+    list_versions,
+)
 from contextlib import asynccontextmanager
 import os
 
@@ -33,31 +39,52 @@ async def catch_exceptions_middleware(request: Request, call_next):
         return response
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    logger.info("Lifespan: Initializing components...")
+INDEX_NAME = "my_index"
+# Where indexes were built before versions were published, used until the first one
+LEGACY_INDEX_PATH = os.path.join(base_dir, ".ragatouille/colbert/indexes", INDEX_NAME)
+
 
-    # Use base_dir to construct the index path
-    index_path = os.path.join(base_dir, ".ragatouille/colbert/indexes/my_index")
+def load_agent(index_path):
     if os.path.exists(index_path):
         logger.debug(f"Index path exists: {index_path}")
     else:
         logger.error(f"Index path does not exist: {index_path}")
 
-    # Load the agent with the default index path
     logger.debug("Calling get_agent...")
-
     agent = get_agent(index_path=index_path)
     if agent is None:
         raise InitializationError("Agent loading failed. Agent is None.")
-    else:
-        logger.debug(f"Agent loaded successfully: {type(agent)}")
+    logger.debug(f"Agent loaded successfully: {type(agent)}")
+    return agent
+
+
+def swap_agent(version, agent):
+    previous = getattr(app.state, "agent", None)
+    # Requests already streaming keep the agent they started with, and the previous
+    # version's index is freed once they finish
+    app.state.agent = agent
+    for key, cached_agent in list(cached_agents.items()):
+        if previous is not None and cached_agent is previous:
+            del cached_agents[key]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    logger.info("Lifespan: Initializing components...")
 
-    app.state.agent = agent  # Store the agent in the app state
+    app.state.index = IndexHotSwap(INDEX_NAME, load_agent, on_swap=swap_agent)
+    await app.state.index.reload(default_path=LEGACY_INDEX_PATH)
+    watch_interval = get_versions_config()["watch_interval"]
+    watcher = None
+    if watch_interval > 0:
+        watcher = asyncio.create_task(app.state.index.watch(watch_interval))
     logger.info("Lifespan: Components initialized successfully")
 
     yield
 
+    if watcher:
+        watcher.cancel()
+
 
 app = FastAPI(lifespan=lifespan)
 
@@ -76,15 +103,43 @@ async def chat(request: Request):
     if not query:
         logger.error("Query parameter is required")
         return {"error": "Query parameter is required"}
-    if app.state.agent is None:
+    agent = app.state.agent  # Held for the whole response, even across an index swap
+    if agent is None:
         logger.error("Agent is not initialized.")
         return {"error": "Agent is not initialized"}
 
     def response_stream():
-        response = app.state.agent.stream_chat(
-            query
-        )  # Access the agent from the app state
+        response = agent.stream_chat(query)
         for token in response.response_gen:
             yield token.encode()
 
     return StreamingResponse(response_stream(), media_type="text/event-stream")
+
+
+@app.get("/index")
+async def index_status():
+    return app.state.index.status()
+
+
+@app.post("/index/reload")
+async def reload_index(request: Request):
+    """Load the current index version, or the requested one, in the background and
+    swap it in once ready."""
+    try:
+        data = await request.json()
+    except Exception:
+        data = {}
+    version = data.get("version")
+    if version and version not in list_versions(INDEX_NAME):
+        logger.error(f"Unknown index version: {version}")
+        return {"error": f"Unknown index version: {version}"}
+
+    async def reload():
+        try:
+            await app.state.index.reload(version)
+        except Exception as e:
+            logger.error(f"Index reload failed: {e}")
+
+    # Keep a reference so the task is not garbage collected mid-load
+    app.state.reload_task = asyncio.create_task(reload())
+    return {"status": "reloading", **app.state.index.status()}
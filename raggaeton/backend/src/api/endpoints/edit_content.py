@@ -1,10 +1,12 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from raggaeton.backend.src.api.services.llm_handler import LLMHandler
 from raggaeton.backend.src.schemas.content import (
     EditContentRequest,
     EditContentResponse,
 )
 from raggaeton.backend.src.utils.common import logger
+from raggaeton.backend.src.utils.llm_processing import stream_ndjson
 
 router = APIRouter()
 
@@ -16,10 +18,21 @@ async def edit_content(request: EditContentRequest):
         logger.info(f"Received edit content request: {request.json()}")
 
         llm_handler = LLMHandler()
-        response, token_count = llm_handler.call_llm("edit_content", request)
+        response, token_count = await llm_handler.acall_llm("edit_content", request)
         logger.info(f"LLM response: {response}")
 
         return response
     except Exception as e:
         logger.error(f"Error in edit_content endpoint: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/edit-content/stream")
+async def edit_content_stream(request: EditContentRequest):
+    logger.info(f"Received streaming edit content request: {request.json()}")
+
+    llm_handler = LLMHandler()
+    blocks = llm_handler.astream_llm("edit_content", request)
+
+    # Each completed EditedContentBlock is sent as one NDJSON line
+    return StreamingResponse(stream_ndjson(blocks), media_type="application/x-ndjson")
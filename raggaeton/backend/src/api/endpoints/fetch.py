@@ -1,7 +1,7 @@
-import requests
 import serpapi
 import logging
 from raggaeton.backend.src.utils.common import config_loader
+from raggaeton.backend.src.utils.replay import get_session
 from datetime import datetime
 import uuid
 import os
@@ -27,7 +27,7 @@ def fetch_data_from_you(
         params = {"query": keywords, "count": limit, "country": target_audience}
 
     logger.info(f"Fetching data from {source} with URL: {url}")
-    response = requests.get(url, headers=headers, params=params)
+    response = get_session().get(url, headers=headers, params=params)
     logger.info(f"Response status code: {response.status_code}")
     response.raise_for_status()
     results = (
@@ -72,7 +72,9 @@ def fetch_data_from_wikipedia(keywords, limit=10):
             "format": "json",
             "srlimit": limit,
         }
-        response = requests.get("https://en.wikipedia.org/w/api.php", params=params)
+        response = get_session().get(
+            "https://en.wikipedia.org/w/api.php", params=params
+        )
         search_results = response.json().get("query", {}).get("search", [])
 
         for result in search_results:
@@ -84,7 +86,7 @@ def fetch_data_from_wikipedia(keywords, limit=10):
                 "format": "json",
                 "prop": "text",
             }
-            parse_response = requests.get(
+            parse_response = get_session().get(
                 "https://en.wikipedia.org/w/api.php", params=parse_params
             )
             parse_data = parse_response.json()
@@ -1,9 +1,13 @@
+import json
+import asyncio
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from raggaeton.backend.src.schemas.content import (
     GenerateDraftRequest,
     GenerateDraftResponse,
+    GenerateDraftsBatchRequest,
 )
-from raggaeton.backend.src.utils.common import logger  # Import logger
+from raggaeton.backend.src.utils.common import logger, config_loader  # Import logger
 from raggaeton.backend.src.api.services.llm_handler import LLMHandler
 
 router = APIRouter()
@@ -22,7 +26,7 @@ async def generate_draft(request: GenerateDraftRequest):
 
     # Call the LLM to get the response and token count
     try:
-        response, token_count = llm_handler.call_llm(function_name, request)
+        response, token_count = await llm_handler.acall_llm(function_name, request)
     except Exception as e:
         logger.error(f"Error calling LLM handler: {e}")
         raise HTTPException(status_code=500, detail="Error generating draft")
@@ -32,3 +36,72 @@ async def generate_draft(request: GenerateDraftRequest):
     logger.info(f"Token Count: {token_count}")
 
     return response
+
+
+async def stream_batch_drafts(llm_handler, requests, max_concurrency):
+    """Yield one NDJSON line per batch item as soon as its draft (or error) is ready."""
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    # Identical items are generated once and reported under each of their indexes
+    unique_requests = {}
+    for index, item in enumerate(requests):
+        unique_requests.setdefault(item.model_dump_json(), []).append(index)
+
+    async def generate(indexes):
+        item = requests[indexes[0]]
+        async with semaphore:
+            try:
+                response, token_count = await llm_handler.acall_llm(
+                    f"generate_draft_{item.article_type}", item
+                )
+                return indexes, response, token_count, None
+            except Exception as e:
+                logger.error(f"Error generating draft for batch items {indexes}: {e}")
+                return indexes, None, None, str(e)
+
+    tasks = [
+        asyncio.create_task(generate(indexes)) for indexes in unique_requests.values()
+    ]
+    completed = failed = 0
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            indexes, response, token_count, error = await next_result
+            for index in indexes:
+                if error is None:
+                    completed += 1
+                    line = {
+                        "type": "draft",
+                        "index": index,
+                        "data": response.model_dump(),
+                        "token_count": token_count,
+                    }
+                else:
+                    failed += 1
+                    line = {"type": "error", "index": index, "detail": error}
+                yield json.dumps(line) + "\n"
+        yield (
+            json.dumps({"type": "done", "completed": completed, "failed": failed})
+            + "\n"
+        )
+    finally:
+        # Stop outstanding LLM calls if the client goes away mid-batch
+        for task in tasks:
+            task.cancel()
+
+
+@router.post("/generate-drafts:batch")
+async def generate_drafts_batch(request: GenerateDraftsBatchRequest):
+    logger.info(f"Received batch of {len(request.requests)} draft requests")
+
+    # One handler, and so one pooled client, serves the whole batch
+    llm_handler = LLMHandler()
+    max_concurrency = (
+        config_loader.config["llm"].get("batch", {}).get("max_concurrency", 8)
+    )
+    if request.max_concurrency:
+        max_concurrency = min(max_concurrency, request.max_concurrency)
+
+    return StreamingResponse(
+        stream_batch_drafts(llm_handler, request.requests, max_concurrency),
+        media_type="application/x-ndjson",
+    )
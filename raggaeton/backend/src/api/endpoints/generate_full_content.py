@@ -1,10 +1,12 @@
 from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
 from raggaeton.backend.src.schemas.content import (
     GenerateFullContentRequest,
     GenerateFullContentResponse,
 )
 from raggaeton.backend.src.utils.common import logger
 from raggaeton.backend.src.api.services.llm_handler import LLMHandler
+from raggaeton.backend.src.utils.llm_processing import stream_ndjson
 
 router = APIRouter()
 
@@ -18,10 +20,23 @@ async def generate_full_content(request: GenerateFullContentRequest):
     llm_handler = LLMHandler()
 
     # Call the LLM to get the response and token count
-    response, token_count = llm_handler.call_llm("generate_full_content", request)
+    response, token_count = await llm_handler.acall_llm(
+        "generate_full_content", request
+    )
 
     # Log the LLM response
     logger.info(f"LLM Response: {response}")
     logger.info(f"Token Count: {token_count}")
 
     return response
+
+
+@router.post("/generate-full-content/stream")
+async def generate_full_content_stream(request: GenerateFullContentRequest):
+    logger.info(f"Received streaming request: {request}")
+
+    llm_handler = LLMHandler()
+    blocks = llm_handler.astream_llm("generate_full_content", request)
+
+    # Each completed Paragraph block is sent as one NDJSON line
+    return StreamingResponse(stream_ndjson(blocks), media_type="application/x-ndjson")
@@ -5,7 +5,6 @@ from raggaeton.backend.src.schemas.content import (
     Headline,
 )
 from raggaeton.backend.src.api.services.llm_handler import LLMHandler
-from raggaeton.backend.src.api.services.prompts import get_prompts
 from raggaeton.backend.src.utils.common import logger, error_handling_context
 
 router = APIRouter()
@@ -15,15 +14,10 @@ router = APIRouter()
 async def generate_headlines(request: GenerateHeadlinesRequest):
     logger.debug("Received request to generate headlines")  # Add this line
 
-    system_prompt, message_prompt = get_prompts("generate_headlines", request)
-
     llm_handler = LLMHandler()
     with error_handling_context():
-        response_text, token_count = llm_handler.call_llm(
-            "generate_headlines",
-            request,
-            system_prompt=system_prompt,
-            message_prompt=message_prompt,
+        response_text, token_count = await llm_handler.acall_llm(
+            "generate_headlines", request
         )
 
         # Use the centralized logger from common.py
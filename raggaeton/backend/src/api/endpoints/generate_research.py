@@ -11,7 +11,6 @@ from raggaeton.backend.src.api.services.fetch import (
     fetch_data_from_wikipedia,
     fetch_data_from_obsidian,
 )
-from raggaeton.backend.src.api.services.prompts import get_prompts
 from raggaeton.backend.src.utils.common import (
     logger,
     error_handling_context,
@@ -30,10 +29,7 @@ async def generate_research_questions(request: GenerateResearchQuestionsRequest)
     )
     llm_handler = LLMHandler()
     with error_handling_context():
-        system_prompt, message_prompt = get_prompts(
-            "generate_research_questions", request
-        )
-        response_text, token_count = llm_handler.call_llm(
+        response_text, token_count = await llm_handler.acall_llm(
             "generate_research_questions", request
         )
         logger.info(f"Type of response_text: {type(response_text)}")
@@ -18,7 +18,9 @@ async def generate_topic_sentences(request: GenerateTopicSentencesRequest):
     llm_handler = LLMHandler()
 
     # Call the LLM to get the response and token count
-    response, token_count = llm_handler.call_llm("generate_topic_sentences", request)
+    response, token_count = await llm_handler.acall_llm(
+        "generate_topic_sentences", request
+    )
 
     # Log the LLM response
     logger.info(f"LLM Response: {response}")
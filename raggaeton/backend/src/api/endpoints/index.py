@@ -12,6 +12,7 @@ from typing import List
 from raggaeton.backend.src.utils.utils import convert_to_documents
 from raggaeton.backend.src.db.supabase import fetch_data
 from raggaeton.backend.src.utils.common import config_loader
+from raggaeton.backend.src.api.services.jobs import report_progress
 
 config_loader._setup_logging()
 logger = logging.getLogger(__name__)
@@ -73,7 +74,7 @@ def create_index(
     )
 
     # Process documents
-    for doc in documents:
+    for processed, doc in enumerate(documents, 1):
         metadata = {
             "id": doc["id"],
             "title": doc["title"],
@@ -90,6 +91,7 @@ def create_index(
         }
         document = Document(text=doc["md_content"], metadata=metadata)
         pipeline.process_document(document)
+        report_progress(processed, len(documents))
 
     # Save the index
     index = pipeline.save_index(index_name)
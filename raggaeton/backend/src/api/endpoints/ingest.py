@@ -1,6 +1,7 @@
 import requests
 from raggaeton.backend.src.db.supabase import upsert_data
 from raggaeton.backend.src.utils.common import config_loader
+from raggaeton.backend.src.api.services.jobs import report_progress
 from raggaeton.backend.src.api.endpoints.fetch import (
     fetch_data_from_you,
     fetch_data_from_wikipedia,
@@ -83,13 +84,14 @@ def generate_research_questions(
     return research_questions
 
 
-def ingest_research_data(
+def iter_research_data(
     topic, article_types, platforms, personas, target_audience, limit=None
 ):
+    """Yield `(source, records)` one keyword's results at a time, so callers can
+    process early results while later ones are still being fetched."""
     research_questions = generate_research_questions(
         topic, article_types, platforms, personas, target_audience
     )
-    results = {}
 
     for platform_data in research_questions:
         platform = platform_data["platform"]
@@ -99,48 +101,57 @@ def ingest_research_data(
             # Handle both sources for you.com
             sources = ["you_snippets"]
             for source in sources:
-                you_data = fetch_data_from_you(
-                    keywords, limit, target_audience, source=source
+                yield (
+                    source,
+                    fetch_data_from_you(
+                        keywords, limit, target_audience, source=source
+                    ),
                 )
-                logger.info(f"Fetched data from {source}: {len(you_data)} items")
-                save_fetched_data(you_data, source)
-                if source not in results:
-                    results[source] = []
-                results[source].extend(you_data)
         elif platform == "wikipedia":
-            wikipedia_data = fetch_data_from_wikipedia(keywords, limit)
-            logger.info(f"Fetched data from Wikipedia: {len(wikipedia_data)} items")
-            save_fetched_data(wikipedia_data, "wikipedia")
-            results["wikipedia"] = wikipedia_data
+            for keyword in keywords:
+                yield "wikipedia", fetch_data_from_wikipedia([keyword], limit)
         elif platform == "serp_google_news":
-            google_news_data = fetch_data_from_google_news(keywords, limit)
-            logger.info(f"Fetched data from Google News: {len(google_news_data)} items")
-            save_fetched_data(google_news_data, "serp_google_news")
-            results["serp_google_news"] = google_news_data
+            for keyword in keywords:
+                yield "serp_google_news", fetch_data_from_google_news([keyword], limit)
         else:
             logger.warning(f"Unsupported platform: {platform}")
 
+
+def ingest_research_data(
+    topic, article_types, platforms, personas, target_audience, limit=None
+):
+    results = {}
+    for source, data in iter_research_data(
+        topic, article_types, platforms, personas, target_audience, limit
+    ):
+        logger.info(f"Fetched data from {source}: {len(data)} items")
+        save_fetched_data(data, source)
+        results.setdefault(source, []).extend(data)
+        report_progress(sum(len(data) for data in results.values()))
+
     logger.info(f"Total items fetched: {sum(len(data) for data in results.values())}")
     return results
 
 
+def format_fetched_record(item, platform):
+    record = {
+        "id": item["id"],  # Use the ID generated in the fetch functions
+        "title": item.get("title") or "N/A",
+        "date_fetched": item.get("date_fetched") or datetime.utcnow().isoformat(),
+        "created_at": item.get("created_at") or datetime.utcnow().isoformat(),
+        "author": item.get("author", "N/A"),
+        "raw_content": item.get("raw_content") or "N/A",
+        "url": item.get("url") or "N/A",
+        "source": platform,  # Add the source of the data
+    }
+    if item.get("clean_content"):
+        record["clean_content"] = item["clean_content"]
+    return record
+
+
 def save_fetched_data(data, platform):
     logger.info(f"Incoming data for {platform}: {data}")
-    formatted_data = []
-    for item in data:
-        formatted_data.append(
-            {
-                "id": item["id"],  # Use the ID generated in the fetch functions
-                "title": item.get("title") or "N/A",
-                "date_fetched": item.get("date_fetched")
-                or datetime.utcnow().isoformat(),
-                "created_at": item.get("created_at") or datetime.utcnow().isoformat(),
-                "author": item.get("author", "N/A"),
-                "raw_content": item.get("raw_content") or "N/A",
-                "url": item.get("url") or "N/A",
-                "source": platform,  # Add the source of the data
-            }
-        )
+    formatted_data = [format_fetched_record(item, platform) for item in data]
     logger.info(f"Formatted data to be saved for {platform}: {formatted_data}")
 
     upsert_data(config["table_fetched_data"], formatted_data)
@@ -0,0 +1,40 @@
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException
+from raggaeton.backend.src.schemas.jobs import JobRequest, Job
+from raggaeton.backend.src.api.services.jobs import get_job_queue
+from raggaeton.backend.src.utils.common import logger
+from raggaeton.backend.src.utils.error_handler import ConfigurationError, DataError
+
+router = APIRouter()
+
+
+@router.post("/jobs", response_model=Job, status_code=202)
+async def create_job(request: JobRequest):
+    logger.info(f"Received request to queue a {request.type} job")
+    try:
+        return get_job_queue().submit(request.type, request.params)
+    except ConfigurationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/jobs", response_model=List[Job])
+async def list_jobs(status: Optional[str] = None, limit: int = 50):
+    return get_job_queue().store.list(status=status, limit=limit)
+
+
+@router.get("/jobs/{job_id}", response_model=Job)
+async def get_job(job_id: str):
+    job = get_job_queue().store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+
+@router.delete("/jobs/{job_id}", response_model=Job)
+async def cancel_job(job_id: str):
+    if get_job_queue().store.get(job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    try:
+        return get_job_queue().cancel(job_id)
+    except DataError as e:
+        raise HTTPException(status_code=409, detail=str(e))
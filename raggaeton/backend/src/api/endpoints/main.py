@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from raggaeton.backend.src.api.endpoints.generate_research import (
     router as generate_research_router,
@@ -17,8 +18,30 @@ from raggaeton.backend.src.api.endpoints.generate_full_content import (
 from raggaeton.backend.src.api.endpoints.edit_content import (
     router as edit_content_router,
 )
+from raggaeton.backend.src.api.endpoints.jobs import router as jobs_router
+from raggaeton.backend.src.api.services.jobs import get_job_queue, close_job_queue
+from raggaeton.backend.src.api.services.llm_handler import (
+    init_shared_clients,
+    close_shared_clients,
+)
+from raggaeton.backend.src.utils.prompt_registry import get_prompt_registry
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Share pooled async LLM clients across all requests instead of one per request
+    init_shared_clients()
+    prompt_registry = get_prompt_registry()
+    if prompt_registry.watch:
+        prompt_registry.start_watching()
+    get_job_queue().start()
+    yield
+    await close_job_queue()
+    prompt_registry.stop_watching()
+    await close_shared_clients()
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan)
 
 # Include the router for the generate_research endpoints
 app.include_router(generate_research_router, prefix="/api", tags=["research"])
@@ -40,6 +63,9 @@ app.include_router(generate_full_content_router, prefix="/api", tags=["full_cont
 # Include the router for the edit_content endpoints
 app.include_router(edit_content_router, prefix="/api", tags=["edit_content"])
 
+# Include the router for the background ingest, preprocessing and index jobs
+app.include_router(jobs_router, prefix="/api", tags=["jobs"])
+
 
 @app.get("/")
 async def root():
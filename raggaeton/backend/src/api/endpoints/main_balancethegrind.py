@@ -3,30 +3,51 @@ import json
 import os
 import requests
 from typing import List, Optional
-from datetime import datetime
 from raggaeton.backend.src.api.endpoints.ingest import (
-    ingest_research_data,
+    iter_research_data,
+    format_fetched_record,
     generate_research_questions,
 )
-from raggaeton.backend.src.utils.common import base_dir
-from raggaeton.backend.src.db.supabase import fetch_data, upsert_data
+from raggaeton.backend.src.utils.common import base_dir, config_loader
+from raggaeton.backend.src.api.services.pipeline import PipelineOrchestrator
+from raggaeton.backend.src.api.services.streaming import Stage, StreamingPipeline
+from raggaeton.backend.src.utils.facets import FacetIndex
+from raggaeton.backend.src.api.services.index import (
+    create_ragatouille_index as open_ragatouille_index,
+)
+from raggaeton.backend.src.utils.utils import exponential_retry, load_textfx_examples
+from raggaeton.backend.src.utils.retry import RETRYABLE_STATUS_CODES
+from raggaeton.backend.src.db.supabase import upsert_data
 from raggaeton.backend.scripts.preproc import (
     convert_html_to_markdown,
 )  # Import the function
 from llama_index.packs.ragatouille_retriever.base import RAGatouilleRetrieverPack
-from llama_index.llms.openai import OpenAI
 from llama_index.core import Document
-from raggaeton.backend.src.api.endpoints.tools import load_rag_query_tool
 from raggaeton.backend.src.utils.error_handler import DataError
 from raggaeton.backend.src.api.endpoints.agent import get_agent
 from raggaeton.backend.src.utils.error_handler import InitializationError
 import ast
+import hashlib
 import random
+import threading
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 INDEX_PATH = "/Users/erniesg/code/erniesg/raggaeton-tia-backend/.ragatouille/colbert/indexes/balancethegrind"
+GENERATE_SVC_URL = "https://erniesg--generate-svc-generate.modal.run"
+FETCHED_TABLE = "balancethegrind_fetched_data"
+
+
+def post_to_generate_svc(payload: dict) -> requests.Response:
+    # Only rate limits and server errors are retried, the caller handles the rest
+    def post():
+        response = requests.post(GENERATE_SVC_URL, json=payload)
+        if response.status_code in RETRYABLE_STATUS_CODES:
+            response.raise_for_status()
+        return response
+
+    return exponential_retry(post)
 
 
 def clean_content(content: str) -> str:
@@ -34,18 +55,9 @@ def clean_content(content: str) -> str:
     return convert_html_to_markdown(content)
 
 
-# Load the JSON data from file using base_dir
-textfx_file_path = os.path.join(
-    base_dir, "raggaeton", "backend", "src", "config", "textfx_examples.json"
-)
-with open(textfx_file_path, "r") as file:
-    data = json.load(file)
-    logger.info("Loaded textfx_examples successfully.")
-
-
 # Function to get three random examples from each category
 def get_three_random_examples(category):
-    examples = data[category]["examples"]
+    examples = load_textfx_examples()[category]["examples"]
     selected_examples = random.sample(examples, 3)  # Randomly select 3 examples
     return selected_examples
 
@@ -63,139 +75,173 @@ textfx_categories = [
     "SCENE",
     "UNFOLD",
 ]
-all_examples = {
-    category: get_three_random_examples(category) for category in textfx_categories
-}
 
 
-def ingest_and_clean_data(research_params: dict) -> List[dict]:
-    topic = research_params.get("topic", "Health & Wellbeing")
-    article_types = research_params.get(
-        "article_types", ["benefits", "how-to", "listicles"]
-    )
-    platforms = research_params.get("platforms", ["you_snippets"])
-    personas = research_params.get("personas", ["general audience"])
-    target_audience = research_params.get("target_audience", "global")
-    limit = research_params.get("limit", 10)
-
-    logger.info("Starting research data ingestion...")
-    response = ingest_research_data(
-        topic, article_types, platforms, personas, target_audience, limit
-    )
-    logger.info(
-        f"Research data ingestion completed. Response: {str(response)[:100]}... Type: {type(response)}"
-    )
-    # Flatten the response to get a list of all fetched data
-    fetched_data = [item for sublist in response.values() for item in sublist]
-    logger.info(f"Fetched data count: {len(fetched_data)}")
-
-    # Clean Wikipedia content and update Supabase
-    for record in fetched_data:
-        if record["source"] == "wikipedia":
-            logger.info(
-                f"Original raw content for record ID {record['id'][:8]}: {record['raw_content'][:100]}..."
-            )  # Log a sample of the raw content
-            logger.info(f"Type of raw content: {type(record['raw_content'])}")
-
-            clean_content_text = clean_content(record["raw_content"])
+def get_all_examples():
+    return {
+        category: get_three_random_examples(category) for category in textfx_categories
+    }
 
-            logger.info(
-                f"Cleaned content for record ID {record['id'][:8]}: {clean_content_text[:100]}..."
-            )  # Log a sample of the cleaned content
-            logger.info(f"Type of cleaned content: {type(clean_content_text)}")
 
-            record["clean_content"] = clean_content_text
-            upsert_data("balancethegrind_fetched_data", [record])
-            logger.info(
-                f"Cleaned content for record ID {record['id'][:8]} and updated Supabase."
-            )
+def research_args(research_params: dict) -> tuple:
+    return (
+        research_params.get("topic", "Health & Wellbeing"),
+        research_params.get("article_types", ["benefits", "how-to", "listicles"]),
+        research_params.get("platforms", ["you_snippets"]),
+        research_params.get("personas", ["general audience"]),
+        research_params.get("target_audience", "global"),
+        research_params.get("limit", 10),
+    )
 
-    # Fetch updated data from Supabase
-    updated_data = fetch_data("balancethegrind_fetched_data")
-    logger.info(f"Fetched updated data count from Supabase: {len(updated_data)}")
 
-    return updated_data
+def prepare_document(item: dict) -> Optional[Document]:
+    text_content = item.get("clean_content") or item.get("raw_content")
+    if not text_content:
+        logger.warning(f"Skipping item with ID {item['id']} due to missing content.")
+        return None
+    metadata = {
+        "id": item["id"],
+        "title": item["title"],
+        "date_fetched": item["date_fetched"],
+        "created_at": item["created_at"],
+        "url": item["url"],
+        "author": item["author"],
+        "source": item["source"],
+    }
+    return Document(text=text_content, metadata=metadata)
 
 
 def prepare_documents(data: List[dict]) -> List[Document]:
     documents = []
     for item in data:
-        text_content = item.get("clean_content") or item.get("raw_content")
-        if text_content:
-            metadata = {
-                "id": item["id"],
-                "title": item["title"],
-                "date_fetched": item["date_fetched"],
-                "created_at": item["created_at"],
-                "url": item["url"],
-                "author": item["author"],
-                "source": item["source"],
-            }
-            doc = Document(text=text_content, metadata=metadata)
+        doc = prepare_document(item)
+        if doc is not None:
             documents.append(doc)
-        else:
-            logger.warning(
-                f"Skipping item with ID {item['id']} due to missing content."
-            )
     return documents
 
 
-def create_ragatouille_index(
-    docs: List[Document], index_name: str
-) -> RAGatouilleRetrieverPack:
-    logger.info(f"Checking if index path exists: {INDEX_PATH}")
-    if os.path.exists(INDEX_PATH):
-        logger.info(f"Using existing index at: {INDEX_PATH}")
-        collection_file = os.path.join(INDEX_PATH, "collection.json")
-        logger.info(f"Checking if collection file exists at: {collection_file}")
-        if not os.path.exists(collection_file):
-            logger.error(f"Collection file does not exist at: {collection_file}")
-            raise FileNotFoundError(
-                f"Collection file does not exist at: {collection_file}"
-            )
-        try:
-            logger.info(f"Loading RAG query tool from index path: {INDEX_PATH}")
-            ragatouille_pack = load_rag_query_tool(index_path=INDEX_PATH, docs=docs)
-        except DataError as e:
-            logger.error(f"Failed to load existing index: {e}")
-            raise
-    else:
-        logger.info(f"Creating new index at: {INDEX_PATH}")
-        index_path = os.path.join(base_dir, ".ragatouille/colbert/indexes", index_name)
-        logger.info(f"New index path: {index_path}")
-        if not os.path.exists(index_path):
-            os.makedirs(index_path)
-            logger.info(f"Created new directory at: {index_path}")
-
-        # Create metadata files if they do not exist
-        metadata_path = os.path.join(index_path, "metadata.json")
-        plan_path = os.path.join(index_path, "plan.json")
-
-        logger.info(f"Checking if metadata file exists at: {metadata_path}")
-        if not os.path.exists(metadata_path):
-            with open(metadata_path, "w") as f:
-                json.dump(
-                    {"index_name": index_name, "created_at": str(datetime.utcnow())}, f
-                )
-            logger.info(f"Created metadata file at: {metadata_path}")
+def stream_research_records(research_params: dict):
+    """Yield fetched records one at a time, as each keyword's results arrive."""
+    for source, data in iter_research_data(*research_args(research_params)):
+        logger.info(f"Fetched data from {source}: {len(data)} items")
+        yield from data
+
+
+class Deduplicator:
+    """Passes on records whose URL and content have not been seen in this run."""
+
+    def __init__(self):
+        self.seen = set()
+        self._lock = threading.Lock()
+
+    def __call__(self, record: dict):
+        content = record.get("raw_content") or ""
+        keys = {
+            ("url", record.get("url")),
+            ("content", hashlib.sha256(content.encode("utf-8")).hexdigest()),
+        }
+        keys.discard(("url", None))
+        with self._lock:
+            if keys & self.seen:
+                logger.debug(f"Skipping duplicate record {record['id'][:8]}")
+                return
+            self.seen |= keys
+        yield record
+
+
+def clean_record(record: dict):
+    if record["source"] == "wikipedia":
+        record["clean_content"] = clean_content(record["raw_content"])
+        logger.info(f"Cleaned content for record ID {record['id'][:8]}")
+    yield record
 
-        logger.info(f"Checking if plan file exists at: {plan_path}")
-        if not os.path.exists(plan_path):
-            with open(plan_path, "w") as f:
-                json.dump(
-                    {"index_name": index_name, "created_at": str(datetime.utcnow())}, f
+
+def save_records(records: List[dict]):
+    # Raw and cleaned content are written together, one upsert per batch
+    upsert_data(
+        FETCHED_TABLE,
+        [format_fetched_record(record, record["source"]) for record in records],
+    )
+    yield from records
+
+
+def document_stage(record: dict):
+    doc = prepare_document(record)
+    if doc is not None:
+        yield doc
+
+
+class IncrementalIndex:
+    """Index stage: batches are added to the existing ColBERT index at
+    `index_path`, or the first batch creates a new one, so early documents are
+    searchable before the fetch finishes."""
+
+    def __init__(self, index_name: str, index_path: str = INDEX_PATH):
+        self.index_name = index_name
+        self.index_path = index_path
+        self.pack = None
+        self.facets = FacetIndex()
+
+    def _open(self, documents: List[Document]):
+        if not os.path.exists(self.index_path):
+            # A new index is built from the first batch, nothing left to add
+            self.pack = open_ragatouille_index(documents, self.index_name)
+            return False
+        self.pack = open_ragatouille_index(documents, self.index_name, self.index_path)
+        # Added documents follow the indexed ones, so their facets must too
+        self.facets = FacetIndex.load(self.index_path) or FacetIndex()
+        return True
+
+    def __call__(self, documents: List[Document]):
+        if self.pack is not None or self._open(documents):
+            if not hasattr(self.pack, "add_data"):
+                raise DataError(
+                    f"Index {self.index_name} at {self.index_path} cannot be extended"
                 )
-            logger.info(f"Created plan file at: {plan_path}")
-
-        # Initialize RAGatouille retriever without specifying index_path
-        ragatouille_pack = RAGatouilleRetrieverPack(
-            documents=docs,
-            llm=OpenAI(model="gpt-4o"),
-            index_name=index_name,
-            top_k=10,
+            self.pack.add_data(documents)
+        self.facets.add(documents)
+        if getattr(self.pack, "index_path", None):
+            self.facets.save(self.pack.index_path)
+        logger.info(f"Indexed {len(documents)} documents into {self.index_name}")
+        yield len(documents)
+
+
+def stream_index(research_params: dict, index_name: str):
+    """Fetch, deduplicate, clean, save and index research data as one stream.
+
+    Chunking and embedding happen inside RAGatouille's indexer, per index batch.
+    Returns the index pack and the pipeline run with per-stage throughput.
+    """
+    pipeline_config = config_loader.config.get("pipeline", {})
+    index = IncrementalIndex(index_name)
+    run = StreamingPipeline(
+        [
+            Stage("dedup", Deduplicator()),
+            # Cleaning calls the Modal service, so several run at once
+            Stage(
+                "clean", clean_record, workers=pipeline_config.get("clean_workers", 4)
+            ),
+            Stage(
+                "save",
+                save_records,
+                batch_size=pipeline_config.get("save_batch_size", 50),
+            ),
+            Stage("document", document_stage),
+            Stage(
+                "index", index, batch_size=pipeline_config.get("index_batch_size", 64)
+            ),
+        ],
+        queue_size=pipeline_config.get("queue_size"),
+    ).run(stream_research_records(research_params))
+    logger.info(f"Streaming ingest stats: {json.dumps(run['stats'], indent=2)}")
+    if index.pack is None:
+        raise DataError("No documents were indexed")
+    # Stage errors are only counted, but a failed index batch means missing documents
+    if run["stats"]["index"]["errors"]:
+        raise DataError(
+            f"{run['stats']['index']['errors']} index batches failed for {index_name}"
         )
-        logger.info(f"Ragatouille index created at: {index_path}")
-    return ragatouille_pack
+    return index.pack, run
 
 
 def retrieve_and_display_nodes(
@@ -226,6 +272,42 @@ def construct_query(
     return query
 
 
+def request_draft(payload: dict):
+    article_type = payload["article_type"]
+    try:
+        response = post_to_generate_svc(payload)
+        response.raise_for_status()
+
+        full_content = response.text
+        token_count = response.headers.get("x-total-tokens", 0)
+        draft_data = json.loads(full_content)
+        logger.info(
+            f"Generated draft for {article_type}: {json.dumps(draft_data, indent=2)}"
+        )
+        logger.info(f"Draft data type: {type(draft_data)}")
+        logger.info(f"Full content type: {type(full_content)}")
+        logger.info(f"Token count: {token_count}")
+        return {
+            "full_content": full_content,
+            "token_count": token_count,
+            "draft_data": draft_data,
+        }
+
+    except requests.exceptions.RequestException as e:
+        logger.error(
+            f"Error occurred while generating draft for {article_type}: {str(e)}"
+        )
+    except json.JSONDecodeError:
+        logger.error(
+            f"Failed to parse JSON response for generate_draft: {response.text}"
+        )
+    except Exception as e:
+        logger.error(
+            f"Unexpected error occurred while generating draft for {article_type}: {str(e)}"
+        )
+    return None
+
+
 def generate_draft(
     topic: str,
     article_types: List[str],
@@ -235,10 +317,9 @@ def generate_draft(
     scratchpad: str,
     desired_length: int,
 ):
-    url = "https://erniesg--generate-svc-generate.modal.run"
-    response_data = {}
-    for article_type in article_types:
-        payload = {
+    # Article types are independent, so their drafts are requested concurrently
+    payloads = {
+        article_type: {
             "keyword": f"generate_{article_type}_draft",
             "topic": topic,
             "article_type": article_type,
@@ -248,40 +329,14 @@ def generate_draft(
             "scratchpad": scratchpad,
             "desired_length": desired_length,
         }
-
-        try:
-            response = requests.post(url, json=payload)
-            response.raise_for_status()
-
-            full_content = response.text
-            token_count = response.headers.get("x-total-tokens", 0)
-            draft_data = json.loads(full_content)
-            response_data[article_type] = {
-                "full_content": full_content,
-                "token_count": token_count,
-                "draft_data": draft_data,
-            }
-            logger.info(
-                f"Generated draft for {article_type}: {json.dumps(draft_data, indent=2)}"
-            )
-            logger.info(f"Draft data type: {type(draft_data)}")
-            logger.info(f"Full content type: {type(full_content)}")
-            logger.info(f"Token count: {token_count}")
-
-        except requests.exceptions.RequestException as e:
-            logger.error(
-                f"Error occurred while generating draft for {article_type}: {str(e)}"
-            )
-        except json.JSONDecodeError:
-            logger.error(
-                f"Failed to parse JSON response for generate_draft: {response.text}"
-            )
-        except Exception as e:
-            logger.error(
-                f"Unexpected error occurred while generating draft for {article_type}: {str(e)}"
-            )
-
-    return response_data
+        for article_type in article_types
+    }
+    run = PipelineOrchestrator([("generate_draft", request_draft)]).run(payloads)
+    return {
+        article_type: draft
+        for article_type, draft in run["results"].items()
+        if draft is not None
+    }
 
 
 def generate_topic_sentences(
@@ -306,7 +361,6 @@ def generate_topic_sentences(
     thesis = draft.get("thesis", "")
     structure = draft.get("structure", [])
 
-    url = "https://erniesg--generate-svc-generate.modal.run"
     payload = {
         "keyword": "generate_topic_sentences_from_template",
         "headline": headline,
@@ -320,7 +374,7 @@ def generate_topic_sentences(
         "target_audience": target_audience,
         "desired_length": desired_length,
     }
-    response = requests.post(url, json=payload)
+    response = post_to_generate_svc(payload)
     if response.status_code == 200:
         return response.json()
     else:
@@ -364,7 +418,6 @@ def edit_content(
     thesis = draft.get("thesis", "")
     subheadings = topic_sentences.get("content_blocks", [])
 
-    url = "https://erniesg--generate-svc-generate.modal.run"
     payload = {
         "keyword": "edit_content",
         "headline": headline,
@@ -379,7 +432,7 @@ def edit_content(
         "desired_length": desired_length,
         "initial_draft_outline": initial_draft_outline,  # Add the initial_draft_outline to the payload
     }
-    response = requests.post(url, json=payload)
+    response = post_to_generate_svc(payload)
     if response.status_code == 200:
         edited_content = response.json()
         # Convert edited content to a string
@@ -426,14 +479,8 @@ def main(research_params: dict, demo_mode: bool = False):
     # Log the keywords used for the query
     logger.info(f"Keywords for query: {keywords}")
 
-    # Ingest and clean data
-    updated_data = ingest_and_clean_data(research_params)
-
-    # Prepare documents for indexing
-    documents = prepare_documents(updated_data)
-
-    # Create or load RAGatouille index
-    ragatouille_pack = create_ragatouille_index(documents, "balancethegrind")
+    # Fetch, clean, save and index the research data as it arrives
+    ragatouille_pack, _ = stream_index(research_params, "balancethegrind")
 
     # Construct the query using the topic and keywords
     query = construct_query(topic, keywords, article_types, personas, target_audience)
@@ -459,6 +506,7 @@ def main(research_params: dict, demo_mode: bool = False):
     logger.info(f"Type of drafts: {type(drafts)}")
     logger.info(f"Length of drafts: {len(drafts)}")
     logger.info(f"Drafts key-value pairs: {drafts.keys()}")
+    headline_states = {}
     for article_type, draft_info in drafts.items():
         logger.info(f"Processing draft for article type: {article_type}")
         full_content = draft_info["full_content"]
@@ -482,9 +530,9 @@ def main(research_params: dict, demo_mode: bool = False):
                 continue
             # Extract and log the headlines
             headlines = draft_data.get("headlines", [])
-            for headline_data in headlines:
+            for index, headline_data in enumerate(headlines):
                 logger.info(f"Processing headline: {headline_data.get('headline')}")
-                process_headline(
+                headline_states[f"{article_type}/{index}"] = make_headline_state(
                     headline_data,
                     context,
                     scratchpad,
@@ -496,9 +544,12 @@ def main(research_params: dict, demo_mode: bool = False):
         else:
             logger.error(f"Unexpected format for full_content: {full_content}")
 
+    # Headlines are independent, so the run takes as long as the slowest one
+    run = process_headlines(headline_states)
+    logger.info(f"Headline pipeline timings: {json.dumps(run['timings'], indent=2)}")
+
 
 def generate_full_article_from_template(request: dict):
-    url = "https://erniesg--generate-svc-generate.modal.run"
     payload = {
         "keyword": "generate_full_article_from_template",
         "topic": request["topic"],
@@ -512,7 +563,7 @@ def generate_full_article_from_template(request: dict):
     }
 
     try:
-        response = requests.post(url, json=payload)
+        response = post_to_generate_svc(payload)
         response.raise_for_status()
         return response.text
     except requests.exceptions.RequestException as e:
@@ -526,7 +577,6 @@ def generate_full_article_from_template(request: dict):
 
 
 def polish_content(request: dict):
-    url = "https://erniesg--generate-svc-generate.modal.run"
     payload = {
         "keyword": "polish_content",
         "topic": request["topic"],
@@ -537,11 +587,11 @@ def polish_content(request: dict):
         "scratchpad": request["scratchpad"],
         "desired_length": request["desired_length"],
         "edited_draft_outline": request["edited_draft_outline"],
-        "textfx": all_examples,
+        "textfx": get_all_examples(),
     }
 
     try:
-        response = requests.post(url, json=payload)
+        response = post_to_generate_svc(payload)
         response.raise_for_status()
         return response.text
     except requests.exceptions.RequestException as e:
@@ -552,9 +602,8 @@ def polish_content(request: dict):
         return ""
 
 
-def process_headline(
-    headline_data, context, scratchpad, topic, article_type, personas, target_audience
-):
+def headline_topic_sentences(state: dict):
+    headline_data = state["headline_data"]
     # Convert the structure list to a single string
     structure_list = headline_data.get("structure", [])
     structure_str = "\n".join(
@@ -565,83 +614,136 @@ def process_headline(
     headline_data["structure"] = structure_str
 
     logger.info(
-        f"Processing headline for {article_type}: {json.dumps(headline_data, indent=2)}"
+        f"Processing headline for {state['article_type']}: {json.dumps(headline_data, indent=2)}"
     )
     topic_sentences = generate_topic_sentences(
         draft=headline_data,
-        context=context,
-        scratchpad=scratchpad,
-        topic=topic,
-        article_type=article_type,
-        personas=personas,
-        target_audience=target_audience,
+        context=state["context"],
+        scratchpad=state["scratchpad"],
+        topic=state["topic"],
+        article_type=state["article_type"],
+        personas=state["personas"],
+        target_audience=state["target_audience"],
         desired_length=800,
     )
 
     if topic_sentences is None:
-        return
+        return None
+    return {**state, "topic_sentences": topic_sentences}
+
 
+def headline_edit_content(state: dict):
+    headline_data = state["headline_data"]
     # Edit content for the current headline
     edited_content = edit_content(
         draft=headline_data,
-        topic_sentences=topic_sentences,
-        context=context,
-        scratchpad=scratchpad,
-        topic=topic,
-        article_type=article_type,
-        personas=personas,
-        target_audience=target_audience,
+        topic_sentences=state["topic_sentences"],
+        context=state["context"],
+        scratchpad=state["scratchpad"],
+        topic=state["topic"],
+        article_type=state["article_type"],
+        personas=state["personas"],
+        target_audience=state["target_audience"],
         desired_length=800,
         initial_draft_outline=headline_data.get(
             "structure"
         ),  # Assuming 'structure' is the initial draft outline
     )
-    # pdb.set_trace()
-    if edited_content:
-        # Deserialize the JSON string
-        if isinstance(edited_content, list) and len(edited_content) == 2:
-            json_string, token_count = edited_content
-            try:
-                edited_content = json.loads(json_string)
-            except json.JSONDecodeError:
-                logger.error(f"Failed to parse JSON response: {json_string}")
-                return
-        logger.info(f"Edited content (JSON): {json.dumps(edited_content, indent=2)}")
-        generate_request = {
-            "topic": topic,
-            "article_type": article_type,
-            "personas": personas,
-            "target_audience": target_audience,
-            "context": context,
-            "scratchpad": scratchpad,
-            "desired_length": 800,
-            "edited_draft_outline": edited_content,  # Pass the deserialized edited content as a JSON object
-        }
-        logger.info(
-            f"Generate request payload: {json.dumps(generate_request, indent=2)}"
-        )  # Log the generate request payload
-        full_article = generate_full_article_from_template(generate_request)
-        logger.info(f"Generated full article: {full_article}")
+    if not edited_content:
+        logger.error(f"Failed to edit content for {state['article_type']}")
+        return None
 
-        # Polish content
-        polish_request = {
-            "topic": topic,
-            "article_type": article_type,
-            "personas": personas,
-            "target_audience": target_audience,
-            "context": context,
-            "scratchpad": scratchpad,
-            "desired_length": 800,
-            "edited_draft_outline": edited_content,  # Pass the deserialized edited content as a JSON object
-        }
-        logger.info(
-            f"Polish request payload: {json.dumps(polish_request, indent=2)}"
-        )  # Log the polish request payload
-        polished_content = polish_content(polish_request)
-        logger.info(f"Polished content: {polished_content}")
+    # Deserialize the JSON string
+    if isinstance(edited_content, list) and len(edited_content) == 2:
+        json_string, token_count = edited_content
+        try:
+            edited_content = json.loads(json_string)
+        except json.JSONDecodeError:
+            logger.error(f"Failed to parse JSON response: {json_string}")
+            return None
+    logger.info(f"Edited content (JSON): {json.dumps(edited_content, indent=2)}")
+    return {**state, "edited_content": edited_content}
+
+
+def build_template_request(state: dict) -> dict:
+    return {
+        "topic": state["topic"],
+        "article_type": state["article_type"],
+        "personas": state["personas"],
+        "target_audience": state["target_audience"],
+        "context": state["context"],
+        "scratchpad": state["scratchpad"],
+        "desired_length": 800,
+        "edited_draft_outline": state[
+            "edited_content"
+        ],  # Pass the deserialized edited content as a JSON object
+    }
 
-    else:
-        logger.error(f"Failed to edit content for {article_type}")
+
+def headline_full_article(state: dict):
+    generate_request = build_template_request(state)
+    logger.info(
+        f"Generate request payload: {json.dumps(generate_request, indent=2)}"
+    )  # Log the generate request payload
+    full_article = generate_full_article_from_template(generate_request)
+    logger.info(f"Generated full article: {full_article}")
+    return {**state, "full_article": full_article}
+
+
+def headline_polish(state: dict):
+    polish_request = build_template_request(state)
+    logger.info(
+        f"Polish request payload: {json.dumps(polish_request, indent=2)}"
+    )  # Log the polish request payload
+    polished_content = polish_content(polish_request)
+    logger.info(f"Polished content: {polished_content}")
+    return {**state, "polished_content": polished_content}
+
+
+# Stages each headline goes through, in order
+HEADLINE_STAGES = [
+    ("topic_sentences", headline_topic_sentences),
+    ("edit_content", headline_edit_content),
+    ("full_article", headline_full_article),
+    ("polish", headline_polish),
+]
+
+
+def make_headline_state(
+    headline_data, context, scratchpad, topic, article_type, personas, target_audience
+) -> dict:
+    return {
+        "headline_data": headline_data,
+        "context": context,
+        "scratchpad": scratchpad,
+        "topic": topic,
+        "article_type": article_type,
+        "personas": personas,
+        "target_audience": target_audience,
+    }
+
+
+def process_headlines(headline_states: dict, max_workers: Optional[int] = None):
+    """Run every headline through HEADLINE_STAGES, headlines in parallel."""
+    return PipelineOrchestrator(HEADLINE_STAGES, max_workers=max_workers).run(
+        headline_states
+    )
+
+
+def process_headline(
+    headline_data, context, scratchpad, topic, article_type, personas, target_audience
+):
+    state = make_headline_state(
+        headline_data,
+        context,
+        scratchpad,
+        topic,
+        article_type,
+        personas,
+        target_audience,
+    )
+    run = process_headlines({headline_data.get("headline"): state}, max_workers=1)
+    return run["results"][headline_data.get("headline")]
 
 
 if __name__ == "__main__":
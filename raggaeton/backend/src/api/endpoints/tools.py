@@ -1,16 +1,23 @@
 import logging
+from llama_index.core.tools import FunctionTool
 from llama_index.core.tools.query_engine import QueryEngineTool
+from llama_index.core.query_engine import RetrieverQueryEngine
 from llama_index.core.query_engine.router_query_engine import RouterQueryEngine
 from llama_index.core.selectors.llm_selectors import LLMSingleSelector
 from llama_index.packs.ragatouille_retriever.base import RAGatouilleRetrieverPack
 from llama_index.tools.google import GoogleSearchToolSpec
 from llama_index.llms.openai import OpenAI
+from raggaeton.backend.src.api.services.routing import create_cached_selector
 from raggaeton.backend.src.utils.gcs import save_data, create_bucket
+from raggaeton.backend.src.utils.index_versions import publish_index
+from raggaeton.backend.src.utils.facets import filtered_search, FacetIndex
+from raggaeton.backend.src.utils.recency import RecencyRetriever, get_recency_config
 from raggaeton.backend.src.utils.common import config_loader, base_dir
 from raggaeton.backend.src.utils.utils import create_mock_document, create_indices
 from raggaeton.backend.src.utils.error_handler import DataError, ConfigurationError
 
 import os
+from typing import Optional
 
 config_loader._setup_logging()
 logger = logging.getLogger(__name__)
@@ -43,9 +50,10 @@ def create_google_search_tool():
     return google_search_tools[0]  # Extract the first tool
 
 
-def create_rag_query_tool(
+def create_rag_tools(
     docs, index_name="my_index", model_name="gpt-4o", top_k=10, index_path=None
 ):
+    """The ColBERT query tool and its facet-filtered search tool over one index."""
     pack_path = os.path.join(base_dir, "raggaeton/backend/src/config/ragatouille_pack")
     logger.debug(f"Ragatouille pack at: {pack_path}")
 
@@ -66,6 +74,13 @@ def create_rag_query_tool(
         ragatouille_pack = RAGatouilleRetrieverPack(
             docs, llm=OpenAI(model=model_name), index_name=index_name, top_k=top_k
         )
+        build_path = ragatouille_pack.index_path or os.path.join(
+            base_dir, ".ragatouille/colbert/indexes", index_name
+        )
+        # Facets are published with the index so they always match its documents
+        FacetIndex.from_documents(docs).save(build_path)
+        # Readers load the published version, never the directory being built into
+        publish_index(build_path, index_name)
         logger.debug("Saving index data to GCS...")
         bucket_name = config_loader.get_config().get("gcs", {}).get("bucket_name")
         create_bucket(bucket_name)
@@ -73,12 +88,72 @@ def create_rag_query_tool(
         logger.debug("Index data saved to GCS successfully.")
 
     rag_query = ragatouille_pack.get_modules()["query_engine"]
+    recency_config = get_recency_config()
+    if recency_config["enabled"]:
+        # Same index, but news-style questions get recent posts first
+        rag_query = RetrieverQueryEngine.from_args(
+            RecencyRetriever(
+                ragatouille_pack.get_modules()["RAG"],
+                index_name,
+                ragatouille_pack.index_path,
+                top_k=top_k,
+                config=recency_config,
+            ),
+            llm=OpenAI(model=model_name),
+        )
     logger.info(f"Ragatouille indexed at: {ragatouille_pack.index_path}")
 
-    return QueryEngineTool.from_defaults(
-        query_engine=rag_query,
-        name="colbert_query_tool",
-        description="COLBert tool for retrieval from selected sample of 900 Tech in Asia posts",
+    return [
+        QueryEngineTool.from_defaults(
+            query_engine=rag_query,
+            name="colbert_query_tool",
+            description="COLBert tool for retrieval from selected sample of 900 Tech in Asia posts",
+        ),
+        create_filtered_search_tool(ragatouille_pack, index_name, top_k),
+    ]
+
+
+def create_rag_query_tool(
+    docs, index_name="my_index", model_name="gpt-4o", top_k=10, index_path=None
+):
+    return create_rag_tools(docs, index_name, model_name, top_k, index_path)[0]
+
+
+def create_filtered_search_tool(ragatouille_pack, index_name="my_index", top_k=10):
+    rag = ragatouille_pack.get_modules()["RAG"]
+
+    def search_posts(
+        query: str,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        author: Optional[str] = None,
+        source: Optional[str] = None,
+    ) -> str:
+        """Search indexed posts published between `since` and `until` (inclusive
+        YYYY-MM-DD dates), optionally by author id or source. Leave out filters
+        that do not apply."""
+        nodes = filtered_search(
+            rag,
+            index_name,
+            ragatouille_pack.index_path,
+            query,
+            k=top_k,
+            since=since,
+            until=until,
+            author=author,
+            source=source,
+        )
+        if not nodes:
+            return "No indexed posts match these filters."
+        return "\n\n".join(node.node.get_content() for node in nodes)
+
+    return FunctionTool.from_defaults(
+        fn=search_posts,
+        name="colbert_filtered_search",
+        description=(
+            "COLBert search over Tech in Asia posts restricted by publish date, "
+            "author or source, for time-scoped questions like today's news"
+        ),
     )
 
 
@@ -127,7 +202,8 @@ def create_router_query_engine(vector_store, documents):
     )
 
     router_query_engine = RouterQueryEngine(
-        selector=LLMSingleSelector.from_defaults(),
+        # Routable queries skip the selector's LLM call
+        selector=create_cached_selector(LLMSingleSelector.from_defaults()),
         query_engine_tools=[summary_tool, vector_tool, google_search_tool],
         verbose=True,
     )
@@ -136,7 +212,7 @@ def create_router_query_engine(vector_store, documents):
     return router_query_engine, vector_index, summary_index
 
 
-def load_rag_query_tool(index_path=None, docs=None):
+def load_rag_tools(index_path=None, docs=None):
     if docs is None:
         logger.debug("No documents are passed in, using a mock document")
         docs = [create_mock_document()]
@@ -146,6 +222,10 @@ def load_rag_query_tool(index_path=None, docs=None):
             base_dir, "raggaeton/raggaeton/.ragatouille/colbert/indexes/my_index"
         )
 
-    logger.info(f"Loading RAG query tool from index path: {index_path}")
+    logger.info(f"Loading RAG tools from index path: {index_path}")
 
-    return create_rag_query_tool(docs, index_path=index_path)
+    return create_rag_tools(docs, index_path=index_path)
+
+
+def load_rag_query_tool(index_path=None, docs=None):
+    return load_rag_tools(index_path=index_path, docs=docs)[0]
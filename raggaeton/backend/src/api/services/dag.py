@@ -0,0 +1,151 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import inspect
+import logging
+from contextlib import nullcontext
+from fastapi.encoders import jsonable_encoder
+
+logger = logging.getLogger(__name__)
+
+
+class Stage:
+    """A named step whose `func(inputs)` receives the run params and upstream outputs.
+
+    Bump `version` when the stage's logic changes so old checkpoints are not reused.
+    """
+
+    def __init__(self, name, func, depends_on=None, version=1):
+        self.name = name
+        self.func = func
+        self.depends_on = list(depends_on or [])
+        self.version = version
+
+
+def make_input_key(stage_name, version, inputs):
+    payload = json.dumps(
+        {"stage": stage_name, "version": version, "inputs": inputs},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CheckpointStore:
+    """Stage outputs as JSON files under `<path>/<stage>/<input hash>.json`."""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(self.path, exist_ok=True)
+
+    def _file(self, stage_name, key):
+        return os.path.join(self.path, stage_name, f"{key}.json")
+
+    def get(self, stage_name, key):
+        try:
+            with open(self._file(stage_name, key), "r") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+        except json.JSONDecodeError:
+            logger.warning(f"Ignoring corrupt checkpoint for {stage_name}: {key}")
+            return None
+
+    def save(self, stage_name, key, output):
+        file_path = self._file(stage_name, key)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        record = {"stage": stage_name, "created_at": time.time(), "output": output}
+        # Write then rename so an interrupted run never leaves a half-written checkpoint
+        tmp_path = f"{file_path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(record, file)
+        os.replace(tmp_path, file_path)
+
+
+class DAGRunner:
+    """Runs stages in dependency order. `force_context`, if given, is entered
+    around every forced stage, e.g. to keep it from reading cached responses."""
+
+    def __init__(self, stages, store, force_context=None):
+        self.stages = {stage.name: stage for stage in stages}
+        self.store = store
+        self.force_context = force_context
+        self.order = self._topological_order()
+
+    def _topological_order(self):
+        order, visiting, visited = [], set(), set()
+
+        def visit(name):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Pipeline has a cycle through stage: {name}")
+            if name not in self.stages:
+                raise ValueError(f"Unknown pipeline stage: {name}")
+            visiting.add(name)
+            for dependency in self.stages[name].depends_on:
+                visit(dependency)
+            visiting.discard(name)
+            visited.add(name)
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    def _required(self, targets):
+        required, pending = set(), list(targets)
+        while pending:
+            name = pending.pop()
+            if name not in self.stages:
+                raise ValueError(f"Unknown pipeline stage: {name}")
+            if name not in required:
+                required.add(name)
+                pending.extend(self.stages[name].depends_on)
+        return required
+
+    async def run(self, params, targets=None, force=()):
+        """Run the stages needed for `targets` (all by default), reusing checkpoints.
+
+        Stages in `force` are re-run even when a checkpoint exists; stages downstream
+        of them re-run too whenever the new output differs from the checkpointed one.
+        """
+        required = self._required(targets or self.order)
+        params = jsonable_encoder(params)
+        outputs, report = {}, {}
+        for name in self.order:
+            if name not in required:
+                continue
+            stage = self.stages[name]
+            inputs = {"params": params}
+            inputs.update({dep: outputs[dep] for dep in stage.depends_on})
+            key = make_input_key(name, stage.version, inputs)
+
+            checkpoint = None
+            if name not in force:
+                checkpoint = await asyncio.to_thread(self.store.get, name, key)
+            if checkpoint is not None:
+                logger.info(f"Stage {name} reused checkpoint {key[:12]}")
+                outputs[name] = checkpoint["output"]
+                report[name] = {"status": "cached", "key": key, "seconds": 0.0}
+                continue
+
+            logger.info(f"Running stage {name}")
+            start = time.perf_counter()
+            forced = name in force and self.force_context is not None
+            with self.force_context() if forced else nullcontext():
+                if inspect.iscoroutinefunction(stage.func):
+                    output = await stage.func(inputs)
+                else:
+                    output = await asyncio.to_thread(stage.func, inputs)
+            # Round-trip through JSON types so fresh and resumed runs see the same data
+            outputs[name] = jsonable_encoder(output)
+            await asyncio.to_thread(self.store.save, name, key, outputs[name])
+            report[name] = {
+                "status": "ran",
+                "key": key,
+                "seconds": time.perf_counter() - start,
+            }
+        return {"outputs": outputs, "stages": report}
@@ -1,10 +1,10 @@
-import requests
 from datetime import datetime
 import uuid
 import os
 from raggaeton.backend.src.utils.utils import truncate_log_message
 from raggaeton.backend.src.utils.common import logger, error_handling_context
-from llama_index.readers.obsidian import ObsidianReader
+from raggaeton.backend.src.utils.replay import get_session
+from raggaeton.backend.src.api.services.obsidian import get_vault_index
 
 
 def fetch_data_from_you(keywords, limit=10, country="us", source="you_snippets"):
@@ -20,7 +20,7 @@ def fetch_data_from_you(keywords, limit=10, country="us", source="you_snippets")
             params = {"query": keywords, "count": limit, "country": country}
 
         logger.info(f"Fetching data from {source} with URL: {url}")
-        response = requests.get(url, headers=headers, params=params)
+        response = get_session().get(url, headers=headers, params=params)
         logger.info(f"Response status code: {response.status_code}")
         response.raise_for_status()
         results = (
@@ -65,7 +65,9 @@ def fetch_data_from_wikipedia(keywords, limit=10):
                 "format": "json",
                 "srlimit": limit,
             }
-            response = requests.get("https://en.wikipedia.org/w/api.php", params=params)
+            response = get_session().get(
+                "https://en.wikipedia.org/w/api.php", params=params
+            )
             search_results = response.json().get("query", {}).get("search", [])
 
             for result in search_results:
@@ -79,7 +81,7 @@ def fetch_data_from_wikipedia(keywords, limit=10):
                     "format": "json",
                     "prop": "text",
                 }
-                parse_response = requests.get(
+                parse_response = get_session().get(
                     "https://en.wikipedia.org/w/api.php", params=parse_params
                 )
                 parse_data = parse_response.json()
@@ -111,29 +113,26 @@ def fetch_data_from_wikipedia(keywords, limit=10):
 
 def fetch_data_from_obsidian(vault_path, **kwargs):
     with error_handling_context():
-        obsidian_reader = ObsidianReader(input_dir=vault_path)
-        documents = obsidian_reader.load_data()
-
         obsidian_data = []
-        for doc in documents:
+        for doc_id, text, metadata in get_vault_index(vault_path).documents():
             # Extract the first heading as the title if available
             title = "Untitled"
-            for line in doc.text.splitlines():
+            for line in text.splitlines():
                 if line.startswith("#"):
                     title = line.lstrip("#").strip()
                     break
 
             obsidian_data.append(
                 {
-                    "id": str(uuid.uuid4()),
+                    "id": doc_id,
                     "title": title,
                     "date_fetched": datetime.utcnow().isoformat(),
                     "created_at": kwargs.get(
                         "created_at", datetime.utcnow().isoformat()
                     ),
                     "author": kwargs.get("author", "N/A"),
-                    "raw_content": doc.text,
-                    "url": doc.metadata.get("source", "N/A"),
+                    "raw_content": text,
+                    "url": metadata.get("source", "N/A"),
                     "source": "obsidian",
                 }
             )
@@ -3,6 +3,8 @@ from raggaeton.backend.src.utils.common import logger, base_dir, config_loader
 from llama_index.packs.ragatouille_retriever.base import RAGatouilleRetrieverPack
 from llama_index.llms.openai import OpenAI
 from raggaeton.backend.src.utils.error_handler import DataError
+from raggaeton.backend.src.utils.facets import FacetIndex, filtered_search
+from raggaeton.backend.src.utils.recency import recency_search
 
 config = config_loader.get_config()
 INDEX_PATH = os.path.join(
@@ -30,13 +32,34 @@ def create_ragatouille_index(docs, index_name, index_path=None):
             index_name=index_name,
             top_k=10,
         )
+        FacetIndex.from_documents(docs).save(ragatouille_pack.index_path)
     return ragatouille_pack
 
 
-def retrieve_nodes(ragatouille_pack, query):
-    retriever = ragatouille_pack.get_modules()["retriever"]
-    nodes = retriever.retrieve(query)
-    return nodes
+def retrieve_nodes(ragatouille_pack, query, recent=False, **filters):
+    """Retrieve nodes for `query`, only from documents matching `filters` (since,
+    until, author, source, status) when any are given, or ranked with recency
+    when `recent`."""
+    modules = ragatouille_pack.get_modules()
+    retriever = modules["retriever"]
+    if recent:
+        return recency_search(
+            modules["RAG"],
+            retriever.index_name,
+            ragatouille_pack.index_path,
+            query,
+            k=retriever.top_k,
+        )
+    if all(value is None for value in filters.values()):
+        return retriever.retrieve(query)
+    return filtered_search(
+        modules["RAG"],
+        retriever.index_name,
+        ragatouille_pack.index_path,
+        query,
+        k=retriever.top_k,
+        **filters,
+    )
 
 
 def construct_query(topics):
@@ -0,0 +1,313 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+import sqlite3
+import logging
+import threading
+import importlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from raggaeton.backend.src.utils.common import config_loader, base_dir
+from raggaeton.backend.src.utils.error_handler import ConfigurationError, DataError
+
+logger = logging.getLogger(__name__)
+
+# Job type -> "module:function" run in a worker process with the job's params
+JOB_TYPES = {
+    "ingest": "raggaeton.backend.src.api.endpoints.ingest:ingest_research_data",
+    "preproc": "raggaeton.backend.scripts.preproc:main",
+    "index": "raggaeton.backend.src.api.endpoints.index:create_index",
+}
+MAX_RESULT_BYTES = 65536
+PROGRESS_INTERVAL = 1.0  # seconds between progress writes from a running job
+
+_job_queue = None
+_worker_state = threading.local()
+
+
+class JobStore:
+    """Job rows in SQLite, shared by the server and the worker processes."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        job_dir = os.path.dirname(path)
+        if job_dir and not os.path.exists(job_dir):
+            os.makedirs(job_dir)
+        self._conn = self.connect(path)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                type TEXT,
+                params TEXT,
+                status TEXT,
+                created_at REAL,
+                started_at REAL,
+                finished_at REAL,
+                progress_done INTEGER DEFAULT 0,
+                progress_total INTEGER,
+                result TEXT,
+                error TEXT
+            )
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def connect(path):
+        conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        # Workers write progress while the server reads, WAL keeps them from blocking
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _execute(self, query, args=()):
+        with self._lock:
+            cursor = self._conn.execute(query, args)
+            self._conn.commit()
+        return cursor
+
+    def create(self, job_type, params):
+        job_id = uuid.uuid4().hex
+        self._execute(
+            "INSERT INTO jobs (id, type, params, status, created_at) VALUES (?, ?, ?, ?, ?)",
+            (job_id, job_type, json.dumps(params), "queued", time.time()),
+        )
+        return job_id
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return job_to_dict(row) if row else None
+
+    def list(self, status=None, limit=50):
+        query, args = "SELECT * FROM jobs", []
+        if status:
+            query += " WHERE status = ?"
+            args.append(status)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        args.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, args).fetchall()
+        return [job_to_dict(row) for row in rows]
+
+    def set_status(self, job_id, status, expected=None, **fields):
+        """Move a job to `status`, only from `expected` when given. Returns whether
+        the job moved."""
+        assignments = ", ".join(["status = ?"] + [f"{name} = ?" for name in fields])
+        query = f"UPDATE jobs SET {assignments} WHERE id = ?"
+        args = [status, *fields.values(), job_id]
+        if expected:
+            query += " AND status = ?"
+            args.append(expected)
+        return self._execute(query, args).rowcount > 0
+
+    def recover(self):
+        """Fail jobs a restart interrupted and return the ids still queued, oldest
+        first."""
+        interrupted = self._execute(
+            "UPDATE jobs SET status = 'failed', finished_at = ?, "
+            "error = 'Interrupted by a server restart' WHERE status = 'running'",
+            (time.time(),),
+        ).rowcount
+        if interrupted:
+            logger.warning(f"Marked {interrupted} interrupted jobs as failed")
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at"
+            ).fetchall()
+        return [row["id"] for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def job_to_dict(row):
+    job = dict(row)
+    job["params"] = json.loads(job["params"] or "{}")
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    finished_at = job["finished_at"] or time.time()
+    elapsed = finished_at - job["started_at"] if job["started_at"] else None
+    job["elapsed_seconds"] = round(elapsed, 3) if elapsed is not None else None
+    job["items_per_second"] = (
+        round(job["progress_done"] / elapsed, 2) if elapsed and elapsed > 0 else None
+    )
+    return job
+
+
+def report_progress(done, total=None):
+    """Record how many items the running job has processed.
+
+    Called from inside job functions; does nothing outside a job. Writes are
+    throttled, the last call is always written when the job finishes.
+    """
+    state = getattr(_worker_state, "job", None)
+    if state is None:
+        return
+    state["done"], state["total"] = done, total or state["total"]
+    now = time.monotonic()
+    if now - state["written_at"] >= PROGRESS_INTERVAL:
+        write_progress(state)
+        state["written_at"] = now
+
+
+def write_progress(state):
+    conn = JobStore.connect(state["path"])
+    try:
+        conn.execute(
+            "UPDATE jobs SET progress_done = ?, progress_total = ? WHERE id = ?",
+            (state["done"], state["total"], state["job_id"]),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def resolve_target(target):
+    module_name, function_name = target.split(":")
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def encode_result(result):
+    encoded = json.dumps(result, default=str)
+    if len(encoded) > MAX_RESULT_BYTES:
+        return json.dumps({"truncated": True, "bytes": len(encoded)})
+    return encoded
+
+
+def run_job(store_path, job_id, target, params):
+    """Entry point in the worker: run `target(**params)` and return its JSON result."""
+    _worker_state.job = {
+        "path": store_path,
+        "job_id": job_id,
+        "done": 0,
+        "total": None,
+        "written_at": time.monotonic(),
+    }
+    try:
+        result = resolve_target(target)(**params)
+        return encode_result(result)
+    finally:
+        write_progress(_worker_state.job)
+        _worker_state.job = None
+
+
+def lower_priority(niceness):
+    # Heavy jobs yield the CPU to the server handling requests
+    if niceness and hasattr(os, "nice"):
+        os.nice(niceness)
+
+
+class JobQueue:
+    """Runs queued jobs on at most `max_concurrency` workers.
+
+    Jobs are persisted before they are queued, so queued jobs survive a restart. The
+    executor defaults to a process pool, keeping the work off the server's event
+    loop and GIL.
+    """
+
+    def __init__(self, store, max_concurrency=1, executor="process", niceness=10):
+        self.store = store
+        self.max_concurrency = max_concurrency
+        if executor == "process":
+            # Spawned rather than forked, the server process is multi-threaded
+            self.executor = ProcessPoolExecutor(
+                max_workers=max_concurrency,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=lower_priority,
+                initargs=(niceness,),
+            )
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        self._queue = asyncio.Queue()
+        self._workers = []
+
+    def start(self):
+        for job_id in self.store.recover():
+            self._queue.put_nowait(job_id)
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(self.max_concurrency)
+        ]
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, job_type, params=None):
+        if job_type not in JOB_TYPES:
+            raise ConfigurationError(f"Unsupported job type: {job_type}")
+        job_id = self.store.create(job_type, params or {})
+        self._queue.put_nowait(job_id)
+        logger.info(f"Queued {job_type} job {job_id}")
+        return self.store.get(job_id)
+
+    def cancel(self, job_id):
+        if not self.store.set_status(
+            job_id, "cancelled", expected="queued", finished_at=time.time()
+        ):
+            raise DataError(f"Job {job_id} is not queued and cannot be cancelled")
+        return self.store.get(job_id)
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job_id = await self._queue.get()
+            try:
+                # Skips jobs cancelled while queued
+                if not self.store.set_status(
+                    job_id, "running", expected="queued", started_at=time.time()
+                ):
+                    continue
+                job = self.store.get(job_id)
+                try:
+                    result = await loop.run_in_executor(
+                        self.executor,
+                        run_job,
+                        self.store.path,
+                        job_id,
+                        JOB_TYPES[job["type"]],
+                        job["params"],
+                    )
+                except Exception as e:
+                    logger.error(f"Job {job_id} ({job['type']}) failed: {e}")
+                    self.store.set_status(
+                        job_id, "failed", finished_at=time.time(), error=str(e)
+                    )
+                else:
+                    logger.info(f"Job {job_id} ({job['type']}) succeeded")
+                    self.store.set_status(
+                        job_id, "succeeded", finished_at=time.time(), result=result
+                    )
+            finally:
+                self._queue.task_done()
+
+
+def get_job_queue():
+    global _job_queue
+    if _job_queue is None:
+        jobs_config = config_loader.get_config().get("jobs", {})
+        _job_queue = JobQueue(
+            JobStore(
+                os.path.join(base_dir, jobs_config.get("path", "cache/jobs.sqlite"))
+            ),
+            max_concurrency=jobs_config.get("max_concurrency", 1),
+            executor=jobs_config.get("executor", "process"),
+            niceness=jobs_config.get("niceness", 10),
+        )
+    return _job_queue
+
+
+async def close_job_queue():
+    global _job_queue
+    if _job_queue is not None:
+        await _job_queue.stop()
+        _job_queue.store.close()
+        _job_queue = None
@@ -0,0 +1,146 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import logging
+import contextvars
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+_bypass_lookups = contextvars.ContextVar("bypass_response_cache", default=False)
+
+
+@contextmanager
+def bypass_response_cache():
+    """Miss the cache for every lookup made inside, e.g. by a forced pipeline
+    stage. Fresh responses are still stored."""
+    token = _bypass_lookups.set(True)
+    try:
+        yield
+    finally:
+        _bypass_lookups.reset(token)
+
+
+def make_cache_key(system_prompt, message_prompt, model_name, params=None):
+    payload = json.dumps(
+        {
+            "system_prompt": system_prompt,
+            "message_prompt": message_prompt,
+            "model_name": model_name,
+            "params": params or {},
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Persistent exact-match cache of raw LLM responses, stored in SQLite."""
+
+    def __init__(self, path, default_ttl=86400, ttls=None, bypass_edit_types=None):
+        self.path = path
+        self.default_ttl = default_ttl
+        self.ttls = ttls or {}
+        self.bypass_edit_types = set(bypass_edit_types or [])
+        self.stats = {"hits": 0, "misses": 0, "bypassed": 0, "tokens_saved": 0}
+        self._lock = threading.Lock()
+
+        cache_dir = os.path.dirname(path)
+        if cache_dir and not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_responses (
+                key TEXT PRIMARY KEY,
+                function_name TEXT,
+                model_name TEXT,
+                content TEXT,
+                token_count INTEGER,
+                created_at REAL,
+                expires_at REAL
+            )
+            """
+        )
+        self._conn.commit()
+        logger.info(f"LLM response cache initialized at {path}")
+
+    def ttl_for(self, function_name):
+        if function_name in self.ttls:
+            return self.ttls[function_name]
+        # generate_draft_<article_type> falls back to the generate_draft entry
+        for prefix, ttl in self.ttls.items():
+            if function_name.startswith(f"{prefix}_"):
+                return ttl
+        return self.default_ttl
+
+    def should_bypass(self, function_name, kwargs):
+        if kwargs.get("edit_type") in self.bypass_edit_types:
+            logger.debug(
+                f"Bypassing response cache for {function_name} with edit_type: {kwargs.get('edit_type')}"
+            )
+            with self._lock:
+                self.stats["bypassed"] += 1
+            return True
+        return self.ttl_for(function_name) <= 0
+
+    def get(self, key):
+        if _bypass_lookups.get():
+            with self._lock:
+                self.stats["bypassed"] += 1
+            return None
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, token_count, expires_at FROM llm_responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None or row[2] < now:
+                if row is not None:
+                    self._conn.execute(
+                        "DELETE FROM llm_responses WHERE key = ?", (key,)
+                    )
+                    self._conn.commit()
+                self.stats["misses"] += 1
+                return None
+            self.stats["hits"] += 1
+            self.stats["tokens_saved"] += row[1] or 0
+        return {"content": row[0], "token_count": row[1]}
+
+    def set(self, key, function_name, model_name, content, token_count):
+        now = time.time()
+        ttl = self.ttl_for(function_name)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, function_name, model_name, content, token_count, now, now + ttl),
+            )
+            self._conn.commit()
+
+    def purge_expired(self):
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM llm_responses WHERE expires_at < ?", (time.time(),)
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_responses")
+            self._conn.commit()
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,20 +1,311 @@
 import os
-from tiktoken import get_encoding
-from raggaeton.backend.src.api.services.prompts import get_prompts, config
+import asyncio
+import httpx
+from functools import lru_cache
+from tiktoken import get_encoding, encoding_for_model
+from raggaeton.backend.src.api.services.prompts import (
+    get_prompt_parts,
+    get_prompt_version,
+    join_prompt_prefix,
+    config,
+)
+from raggaeton.backend.src.api.services.llm_cache import ResponseCache, make_cache_key
+from raggaeton.backend.src.api.services.rate_limiter import ProviderLimiter
+from raggaeton.backend.src.utils.common import base_dir
 import anthropic
 import openai
 from raggaeton.backend.src.utils.error_handler import error_handling_context, LLMError
-from raggaeton.backend.src.utils.llm_processing import parse_llm_response
+from raggaeton.backend.src.utils.llm_processing import (
+    parse_llm_response,
+    parse_llm_item,
+    get_stream_spec,
+)
+from raggaeton.backend.src.utils.json_stream import IncrementalArrayParser
+from raggaeton.backend.src.utils.replay import wrap_transport
 from langfuse.decorators import observe, langfuse_context
 import logging
 
 logger = logging.getLogger(__name__)
 
-enc = get_encoding("cl100k_base")
+SUPPORTED_PROVIDERS = ("anthropic", "openai")
+MAX_TOKENS = 4096
+ANTHROPIC_PROMPT_CACHING_BETA = "prompt-caching-2024-07-31"
 
+# Provider clients shared by every LLMHandler, keyed by (provider, api_key, is_async)
+_shared_clients = {}
+_response_cache = None
+_rate_limiters = {}
+_prompt_cache_stats = {
+    "requests": 0,
+    "prompt_tokens": 0,
+    "cached_prompt_tokens": 0,
+    "cache_write_tokens": 0,
+}
 
-def count_tokens(text):
-    return len(enc.encode(text))
+
+@lru_cache(maxsize=None)
+def get_tokenizer(model_name=None):
+    if model_name:
+        try:
+            return encoding_for_model(model_name)
+        except KeyError:
+            # Claude models have no tiktoken encoding, cl100k_base is a close estimate
+            logger.debug(f"No tiktoken encoding for {model_name}, using cl100k_base")
+    return get_encoding("cl100k_base")
+
+
+def count_tokens(text, model_name=None):
+    return len(get_tokenizer(model_name).encode(text))
+
+
+def compute_cost(
+    model_name, prompt_tokens, completion_tokens, cached_tokens=0, cache_write_tokens=0
+):
+    # Pricing in config.yaml is in USD per 1M tokens
+    pricing = config["llm"].get("pricing", {}).get(model_name)
+    if not pricing:
+        return None, None
+    # Cache reads and writes fall back to the regular input price when not listed
+    uncached_tokens = prompt_tokens - cached_tokens - cache_write_tokens
+    input_cost = (
+        uncached_tokens * pricing["input"]
+        + cached_tokens * pricing.get("cached_input", pricing["input"])
+        + cache_write_tokens * pricing.get("cache_write", pricing["input"])
+    ) / 1_000_000
+    output_cost = completion_tokens * pricing["output"] / 1_000_000
+    return input_cost, output_cost
+
+
+def build_usage(
+    model_name, reported=None, system_prompt="", message_prompt="", full_content=""
+):
+    """Prefer provider-reported token counts, tokenizing locally only when missing."""
+    reported = reported or {}
+    source = "provider"
+    prompt_tokens = reported.get("prompt_tokens")
+    completion_tokens = reported.get("completion_tokens")
+    if prompt_tokens is None:
+        source = "tokenizer"
+        prompt_tokens = count_tokens(system_prompt or "", model_name) + count_tokens(
+            message_prompt, model_name
+        )
+    if completion_tokens is None:
+        source = "tokenizer"
+        completion_tokens = count_tokens(full_content, model_name)
+    cached_prompt_tokens = reported.get("cached_prompt_tokens", 0)
+    cache_write_tokens = reported.get("cache_write_tokens", 0)
+
+    input_cost, output_cost = compute_cost(
+        model_name,
+        prompt_tokens,
+        completion_tokens,
+        cached_prompt_tokens,
+        cache_write_tokens,
+    )
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+        "cached_prompt_tokens": cached_prompt_tokens,
+        "cache_write_tokens": cache_write_tokens,
+        "source": source,
+        "input_cost": input_cost,
+        "output_cost": output_cost,
+        "total_cost": input_cost + output_cost if input_cost is not None else None,
+    }
+
+
+def cached_usage(cached):
+    # Nothing is sent to the provider on a cache hit, so nothing is billed
+    return {
+        "prompt_tokens": 0,
+        "completion_tokens": cached["token_count"] or 0,
+        "total_tokens": cached["token_count"] or 0,
+        "cached_prompt_tokens": 0,
+        "cache_write_tokens": 0,
+        "source": "cache",
+        "input_cost": 0.0,
+        "output_cost": 0.0,
+        "total_cost": 0.0,
+    }
+
+
+def record_openai_usage(chunk, reported_usage):
+    reported_usage["prompt_tokens"] = chunk.usage.prompt_tokens
+    reported_usage["completion_tokens"] = chunk.usage.completion_tokens
+    # Cached tokens are already part of prompt_tokens; older SDKs leave details untyped
+    details = getattr(chunk.usage, "prompt_tokens_details", None)
+    if isinstance(details, dict):
+        cached_tokens = details.get("cached_tokens")
+    else:
+        cached_tokens = getattr(details, "cached_tokens", None)
+    reported_usage["cached_prompt_tokens"] = cached_tokens or 0
+
+
+def record_anthropic_usage(message, reported_usage):
+    # Anthropic reports cache reads and writes separately from input_tokens
+    cache_read = getattr(message.usage, "cache_read_input_tokens", None) or 0
+    cache_write = getattr(message.usage, "cache_creation_input_tokens", None) or 0
+    reported_usage["prompt_tokens"] = (
+        message.usage.input_tokens + cache_read + cache_write
+    )
+    reported_usage["completion_tokens"] = message.usage.output_tokens
+    reported_usage["cached_prompt_tokens"] = cache_read
+    reported_usage["cache_write_tokens"] = cache_write
+
+
+def record_prompt_cache_stats(usage):
+    if usage["source"] == "cache":
+        return
+    _prompt_cache_stats["requests"] += 1
+    for key in ("prompt_tokens", "cached_prompt_tokens", "cache_write_tokens"):
+        _prompt_cache_stats[key] += usage[key]
+
+
+def get_prompt_cache_stats():
+    prompt_tokens = _prompt_cache_stats["prompt_tokens"]
+    return {
+        **_prompt_cache_stats,
+        "cached_ratio": (
+            _prompt_cache_stats["cached_prompt_tokens"] / prompt_tokens
+            if prompt_tokens
+            else 0.0
+        ),
+    }
+
+
+def prompt_caching_enabled():
+    return config["llm"].get("prompt_caching", {}).get("enabled", True)
+
+
+def anthropic_prompt_options(system_prompt, static_prompt):
+    """System prompt arguments for Anthropic, marking the static prefix for caching.
+
+    The pinned SDK only types `system` as a string, so the block list and beta
+    header are passed straight through to the API.
+    """
+    if not prompt_caching_enabled():
+        prefix = join_prompt_prefix(system_prompt, static_prompt)
+        return {"system": prefix if prefix else None}
+    blocks = [
+        {"type": "text", "text": text}
+        for text in (system_prompt, static_prompt)
+        if text
+    ]
+    if not blocks:
+        return {"system": None}
+    # One breakpoint caches everything up to and including the last static block
+    blocks[-1]["cache_control"] = {"type": "ephemeral"}
+    return {
+        "system": blocks,
+        "extra_headers": {"anthropic-beta": ANTHROPIC_PROMPT_CACHING_BETA},
+    }
+
+
+def openai_messages(system_prompt, static_prompt, message_prompt):
+    # OpenAI caches matching prefixes automatically, so the static part goes first
+    return [
+        {"role": "system", "content": join_prompt_prefix(system_prompt, static_prompt)},
+        {"role": "user", "content": message_prompt},
+    ]
+
+
+def get_http_settings():
+    http_config = config["llm"].get("http", {})
+    limits = httpx.Limits(
+        max_connections=http_config.get("max_connections", 100),
+        max_keepalive_connections=http_config.get("max_keepalive_connections", 20),
+        keepalive_expiry=http_config.get("keepalive_expiry", 30),
+    )
+    timeout = httpx.Timeout(http_config.get("timeout", 240))
+    return limits, timeout
+
+
+def create_http_client(limits, timeout):
+    # Provider traffic goes through the record/replay cassette when it is enabled
+    transport = wrap_transport(httpx.AsyncHTTPTransport(limits=limits))
+    return httpx.AsyncClient(transport=transport, timeout=timeout)
+
+
+def create_client(provider, api_key=None):
+    # Retries are left to the shared rate limiter, not the SDK
+    limits, timeout = get_http_settings()
+    if provider == "anthropic":
+        return anthropic.AsyncAnthropic(
+            api_key=api_key or os.getenv("CLAUDE_API_KEY"),
+            max_retries=0,
+            http_client=create_http_client(limits, timeout),
+        )
+    elif provider == "openai":
+        return openai.AsyncOpenAI(
+            api_key=api_key or os.getenv("OPENAI_API_KEY"),
+            max_retries=0,
+            http_client=create_http_client(limits, timeout),
+        )
+    else:
+        raise ValueError("Unsupported provider")
+
+
+def get_shared_client(provider, api_key=None):
+    key = (provider, api_key)
+    if key not in _shared_clients:
+        logger.info(f"Creating shared async client for provider: {provider}")
+        _shared_clients[key] = create_client(provider, api_key)
+    return _shared_clients[key]
+
+
+def init_shared_clients(providers=None):
+    # Warm up the pooled async clients so the first request skips client setup
+    for provider in providers or [config["llm"].get("default_provider")]:
+        get_shared_client(provider)
+
+
+async def close_shared_clients():
+    for (provider, _), client in list(_shared_clients.items()):
+        logger.info(f"Closing shared client for provider: {provider}")
+        await client.close()
+    _shared_clients.clear()
+
+
+def get_rate_limiter(provider):
+    if provider not in _rate_limiters:
+        limits_config = config["llm"].get("rate_limits", {})
+        provider_limits = limits_config.get(provider, {})
+        _rate_limiters[provider] = ProviderLimiter(
+            provider,
+            requests_per_minute=provider_limits.get("requests_per_minute", 500),
+            tokens_per_minute=provider_limits.get("tokens_per_minute", 30000),
+            max_concurrency=provider_limits.get("max_concurrency", 10),
+            retries=limits_config.get("retries", 5),
+            base_delay=limits_config.get("base_delay", 1),
+            max_delay=limits_config.get("max_delay", 60),
+        )
+    return _rate_limiters[provider]
+
+
+def estimate_tokens(system_prompt, message_prompt):
+    # ~4 characters per token is close enough to reserve budget before the call
+    expected_completion = (
+        config["llm"].get("rate_limits", {}).get("expected_completion_tokens", 1000)
+    )
+    return (len(system_prompt or "") + len(message_prompt)) // 4 + expected_completion
+
+
+def get_response_cache():
+    global _response_cache
+    cache_config = config["llm"].get("cache", {})
+    if not cache_config.get("enabled", False):
+        return None
+    if _response_cache is None:
+        _response_cache = ResponseCache(
+            path=os.path.join(
+                base_dir, cache_config.get("path", "cache/llm_responses.sqlite")
+            ),
+            default_ttl=cache_config.get("default_ttl", 86400),
+            ttls=cache_config.get("ttl", {}),
+            bypass_edit_types=cache_config.get("bypass_edit_types", []),
+        )
+    return _response_cache
 
 
 class LLMHandler:
@@ -22,109 +313,328 @@ class LLMHandler:
         self.provider = provider or config["llm"].get("default_provider")
         self.model_name = model_name or config["llm"]["default_model"]
         self.session_id = session_id
+        self.api_key = api_key
+        self.last_usage = None
         logger.info(
             f"Initializing LLMHandler with provider: {self.provider}, model: {self.model_name}, session_id: {self.session_id}"
         )
 
-        if self.provider == "anthropic":
-            self.client = anthropic.Anthropic(
-                api_key=api_key or os.getenv("CLAUDE_API_KEY")
-            )
-        elif self.provider == "openai":
-            self.client = openai.OpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"))
-        else:
+        if self.provider not in SUPPORTED_PROVIDERS:
             raise ValueError("Unsupported provider")
 
-    @observe(as_type="generation")
-    def call_llm(self, function_name, request, model_name=None, **kwargs):
-        logger.debug(f"LLM Handler - Received kwargs in call_llm: {kwargs}")
+    @property
+    def async_client(self):
+        return get_shared_client(self.provider, self.api_key)
+
+    def _prepare_call(self, function_name, request, model_name, kwargs):
+        logger.debug(f"LLM Handler - Received kwargs: {kwargs}")
         # Ensure edit_type is included in kwargs if present in request
         if hasattr(request, "edit_type"):
             kwargs["edit_type"] = request.edit_type
 
-        system_prompt, message_prompt = get_prompts(function_name, request, **kwargs)
+        system_prompt, static_prompt, message_prompt = get_prompt_parts(
+            function_name, request, **kwargs
+        )
         logger.info(f"System Prompt: {system_prompt}")
+        logger.info(f"Static Prompt: {static_prompt}")
         logger.info(f"Message Prompt: {message_prompt}")
 
         # Use the default model from the config if model_name is not provided
         model_to_use = model_name if model_name else self.model_name
         logger.info(f"Using model: {model_to_use}")
 
-        # Enrich the trace with input, model, and metadata
+        # Enrich the trace with input, model, prompt version and metadata
+        prompt_version = get_prompt_version(function_name)
         langfuse_context.update_current_observation(
             name=f"llm_handler_{function_name}",
-            input={"system_prompt": system_prompt, "message_prompt": message_prompt},
+            input={
+                "system_prompt": system_prompt,
+                "static_prompt": static_prompt,
+                "message_prompt": message_prompt,
+            },
             model=model_to_use,
-            metadata=kwargs,
+            version=prompt_version,
+            metadata={**kwargs, "prompt_version": prompt_version},
         )
 
         # Update the trace with the session ID
         langfuse_context.update_current_trace(session_id=self.session_id)
 
+        return system_prompt, static_prompt, message_prompt, model_to_use
+
+    def _cache_lookup(
+        self, function_name, system_prompt, message_prompt, model_to_use, kwargs
+    ):
+        cache = get_response_cache()
+        if cache is None or cache.should_bypass(function_name, kwargs):
+            return None, None
+        cache_key = make_cache_key(
+            system_prompt,
+            message_prompt,
+            model_to_use,
+            params={
+                "provider": self.provider,
+                "max_tokens": MAX_TOKENS,
+                "prompt_version": get_prompt_version(function_name),
+            },
+        )
+        return cache_key, cache.get(cache_key)
+
+    def _cache_metadata(self, cache_key, cached):
+        cache = get_response_cache()
+        if cache is None:
+            return {"status": "disabled"}
+        if cache_key is None:
+            status = "bypass"
+        else:
+            status = "hit" if cached else "miss"
+        return {"status": status, "key": cache_key, **cache.get_stats()}
+
+    def _finalize(
+        self,
+        full_content,
+        function_name,
+        request,
+        model_to_use,
+        kwargs,
+        usage,
+        cache_metadata=None,
+    ):
+        self.last_usage = usage
+        record_prompt_cache_stats(usage)
+        token_count = usage["completion_tokens"]
+        logger.info(
+            f"LLM API request completed with response: {(full_content[:500] + '...') if len(full_content) > 500 else full_content}"
+            f"\nResponse type: {type(full_content)}"
+            f"\nToken count: {token_count}"
+            f"\nUsage: {usage}"
+        )
+        logger.debug(f"Full response content: {full_content}")
+
+        # Enrich the trace with output, token usage and cost
+        langfuse_context.update_current_observation(
+            output=full_content,
+            usage={
+                "unit": "TOKENS",
+                "input": usage["prompt_tokens"],
+                "output": usage["completion_tokens"],
+                "total": usage["total_tokens"],
+                "input_cost": usage["input_cost"],
+                "output_cost": usage["output_cost"],
+                "total_cost": usage["total_cost"],
+            },
+            metadata={
+                "token_count": token_count,
+                "usage": usage,
+                "model_name": model_to_use,
+                "kwargs": kwargs,
+                "cache": cache_metadata,
+                "rate_limit": get_rate_limiter(self.provider).stats,
+                "prompt_cache": get_prompt_cache_stats(),
+            },
+        )
+
+        # Parse the response into the appropriate Pydantic model
+        logger.debug(f"Calling parse_llm_response with function_name: {function_name}")
+
+        try:
+            parsed_response = parse_llm_response(
+                full_content,
+                function_name,
+                request_data=request.model_dump() if request else {},
+            )
+            logger.debug("Successfully called parse_llm_response")
+        except Exception as e:
+            logger.error(f"Failed to parse LLM response: {e}")
+            raise LLMError(f"Failed to parse LLM response: {e}")
+
+        return parsed_response, token_count
+
+    async def _astream_text(
+        self, system_prompt, static_prompt, message_prompt, model_to_use, reported_usage
+    ):
+        if self.provider == "anthropic":
+            async with self.async_client.messages.stream(
+                model=model_to_use,
+                max_tokens=MAX_TOKENS,
+                messages=[{"role": "user", "content": message_prompt}],
+                **anthropic_prompt_options(system_prompt, static_prompt),
+            ) as stream:
+                async for text in stream.text_stream:
+                    yield text
+                record_anthropic_usage(await stream.get_final_message(), reported_usage)
+        elif self.provider == "openai":
+            stream = await self.async_client.chat.completions.create(
+                model=model_to_use,
+                messages=openai_messages(system_prompt, static_prompt, message_prompt),
+                stream=True,
+                stream_options={"include_usage": True},
+                response_format={"type": "json_object"},
+            )
+            async for chunk in stream:
+                # The final chunk carries usage and no choices
+                if chunk.usage is not None:
+                    record_openai_usage(chunk, reported_usage)
+                if chunk.choices and chunk.choices[0].delta.content is not None:
+                    yield chunk.choices[0].delta.content
+        else:
+            raise ValueError("Unsupported provider")
+
+    async def _astore_cache(
+        self, cache_key, function_name, model_to_use, content, token_count
+    ):
+        if cache_key:
+            await asyncio.to_thread(
+                get_response_cache().set,
+                cache_key,
+                function_name,
+                model_to_use,
+                content,
+                token_count,
+            )
+
+    @observe(as_type="generation")
+    async def acall_llm(self, function_name, request, model_name=None, **kwargs):
+        system_prompt, static_prompt, message_prompt, model_to_use = self._prepare_call(
+            function_name, request, model_name, kwargs
+        )
+        prompt_prefix = join_prompt_prefix(system_prompt, static_prompt)
+        cache_key, cached = await asyncio.to_thread(
+            self._cache_lookup,
+            function_name,
+            prompt_prefix,
+            message_prompt,
+            model_to_use,
+            kwargs,
+        )
+        if cached:
+            logger.info(f"Serving {function_name} from response cache")
+            return self._finalize(
+                cached["content"],
+                function_name,
+                request,
+                model_to_use,
+                kwargs,
+                cached_usage(cached),
+                self._cache_metadata(cache_key, cached),
+            )
+
         with error_handling_context():
-            if self.provider == "anthropic":
-                with self.client.messages.stream(
-                    model=model_to_use,
-                    max_tokens=4096,
-                    messages=[{"role": "user", "content": message_prompt}],
-                    system=system_prompt if system_prompt else None,
-                ) as stream:
-                    content = []
-                    for text in stream.text_stream:
-                        content.append(text)
-                full_content = "".join(content)
-            elif self.provider == "openai":
-                stream = self.client.chat.completions.create(
-                    model=model_to_use,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": message_prompt},
-                    ],
-                    stream=True,
-                    response_format={"type": "json_object"},
-                )
+            reported_usage = {}
 
+            async def collect():
+                # Reset on every attempt so a retried call does not mix partial output
+                reported_usage.clear()
                 content = []
-                for chunk in stream:
-                    if chunk.choices[0].delta.content is not None:
-                        chunk_message = chunk.choices[0].delta.content
-                        content.append(chunk_message)
-                full_content = "".join(content)
-            else:
-                raise ValueError("Unsupported provider")
+                async for text in self._astream_text(
+                    system_prompt,
+                    static_prompt,
+                    message_prompt,
+                    model_to_use,
+                    reported_usage,
+                ):
+                    content.append(text)
+                return "".join(content)
 
-            token_count = count_tokens(full_content)
-            logger.info(
-                f"LLM API request completed with response: {(full_content[:500] + '...') if len(full_content) > 500 else full_content}"
-                f"\nResponse type: {type(full_content)}"
-                f"\nToken count: {token_count}"
-            )
-            logger.debug(f"Full response content: {full_content}")
-
-            # Enrich the trace with output
-            langfuse_context.update_current_observation(
-                output=full_content,
-                metadata={
-                    "token_count": token_count,
-                    "model_name": model_to_use,
-                    "kwargs": kwargs,
-                },
+            limiter = get_rate_limiter(self.provider)
+            estimated_tokens = estimate_tokens(prompt_prefix, message_prompt)
+            full_content = await limiter.call(collect, estimated_tokens)
+            usage = build_usage(
+                model_to_use,
+                reported_usage,
+                prompt_prefix,
+                message_prompt,
+                full_content,
             )
+            limiter.record_usage(estimated_tokens, usage["total_tokens"])
 
-            # Parse the response into the appropriate Pydantic model
-            logger.debug(
-                f"Calling parse_llm_response with function_name: {function_name}"
+            parsed_response, token_count = self._finalize(
+                full_content,
+                function_name,
+                request,
+                model_to_use,
+                kwargs,
+                usage,
+                self._cache_metadata(cache_key, cached),
+            )
+            await self._astore_cache(
+                cache_key, function_name, model_to_use, full_content, token_count
             )
+            return parsed_response, token_count
+
+    @observe(
+        as_type="generation", transform_to_string=lambda items: f"{len(items)} blocks"
+    )
+    async def astream_llm(self, function_name, request, model_name=None, **kwargs):
+        """Yield each validated content block of the response as soon as it is complete."""
+        array_key, _ = get_stream_spec(function_name)
+        parser = IncrementalArrayParser(array_key)
+        system_prompt, static_prompt, message_prompt, model_to_use = self._prepare_call(
+            function_name, request, model_name, kwargs
+        )
+        prompt_prefix = join_prompt_prefix(system_prompt, static_prompt)
+        cache_key, cached = await asyncio.to_thread(
+            self._cache_lookup,
+            function_name,
+            prompt_prefix,
+            message_prompt,
+            model_to_use,
+            kwargs,
+        )
 
-            try:
-                parsed_response = parse_llm_response(
-                    full_content,
-                    function_name,
-                    request_data=request.model_dump() if request else {},
+        with error_handling_context():
+            if cached:
+                logger.info(f"Streaming {function_name} from response cache")
+                for item in parser.feed(cached["content"]):
+                    yield parse_llm_item(item, function_name)
+                usage = cached_usage(cached)
+            else:
+                reported_usage = {}
+                limiter = get_rate_limiter(self.provider)
+                estimated_tokens = estimate_tokens(prompt_prefix, message_prompt)
+                attempt = 0
+                while True:
+                    try:
+                        async with limiter.limit(estimated_tokens):
+                            async for text in self._astream_text(
+                                system_prompt,
+                                static_prompt,
+                                message_prompt,
+                                model_to_use,
+                                reported_usage,
+                            ):
+                                for item in parser.feed(text):
+                                    yield parse_llm_item(item, function_name)
+                        break
+                    except Exception as e:
+                        # Blocks already sent to the client cannot be taken back
+                        if parser.text:
+                            raise
+                        delay = limiter.retry_delay(e, attempt)
+                        if delay is None:
+                            raise
+                        await asyncio.sleep(delay)
+                        attempt += 1
+                usage = build_usage(
+                    model_to_use,
+                    reported_usage,
+                    prompt_prefix,
+                    message_prompt,
+                    parser.text,
                 )
-                logger.debug("Successfully called parse_llm_response")
-            except Exception as e:
-                logger.error(f"Failed to parse LLM response: {e}")
-                raise LLMError(f"Failed to parse LLM response: {e}")
+                limiter.record_usage(estimated_tokens, usage["total_tokens"])
 
-            return parsed_response, token_count
+            # Validate the complete response too, so the trace and cache match acall_llm
+            _, token_count = self._finalize(
+                parser.text,
+                function_name,
+                request,
+                model_to_use,
+                kwargs,
+                usage,
+                self._cache_metadata(cache_key, cached),
+            )
+            if not cached:
+                await self._astore_cache(
+                    cache_key, function_name, model_to_use, parser.text, token_count
+                )
@@ -0,0 +1,149 @@
+import os
+import json
+import uuid
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from llama_index.readers.file import MarkdownReader
+from raggaeton.backend.src.utils.common import config_loader, base_dir
+
+logger = logging.getLogger(__name__)
+
+_vault_indexes = {}
+_vault_indexes_lock = threading.Lock()
+
+
+def note_id(relative_path, section):
+    # The same note section keeps its id across scans and processes
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"obsidian:{relative_path}#{section}"))
+
+
+def parse_note(file_path):
+    return [
+        {"text": doc.text, "metadata": doc.metadata}
+        for doc in MarkdownReader().load_data(Path(file_path))
+    ]
+
+
+class VaultIndex:
+    """Parsed sections of every note in an Obsidian vault, kept up to date
+    incrementally.
+
+    Each scan walks the vault like ObsidianReader but only re-reads notes whose
+    mtime or size changed, and only re-parses those whose content hash changed.
+    The parsed notes are persisted to `cache_path`, so restarts skip parsing too.
+    """
+
+    def __init__(self, vault_path, cache_path, max_workers=4):
+        self.vault_path = vault_path
+        self.cache_path = cache_path
+        self.max_workers = max_workers
+        self.notes = self._load()
+        self.stats = {"scans": 0, "parsed": 0, "reused": 0, "removed": 0}
+        self._lock = threading.Lock()
+
+    def _load(self):
+        try:
+            with open(self.cache_path, "r") as file:
+                return json.load(file)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(self.notes, file)
+        os.replace(tmp_path, self.cache_path)
+
+    def _walk(self):
+        for dirpath, dirnames, filenames in os.walk(self.vault_path):
+            dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+            for filename in filenames:
+                if filename.endswith(".md"):
+                    file_path = os.path.join(dirpath, filename)
+                    yield os.path.relpath(file_path, self.vault_path), file_path
+
+    def _refresh(self, relative_path, file_path, stat):
+        with open(file_path, "rb") as file:
+            content_hash = hashlib.sha256(file.read()).hexdigest()
+        known = self.notes.get(relative_path)
+        if known and known["hash"] == content_hash:
+            # Touched but unchanged, e.g. synced from another device
+            return {**known, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}, False
+        return {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "hash": content_hash,
+            "sections": parse_note(file_path),
+        }, True
+
+    def scan(self):
+        """Bring the index up to date with the vault and return its notes."""
+        with self._lock:
+            seen, changed = set(), []
+            for relative_path, file_path in self._walk():
+                seen.add(relative_path)
+                stat = os.stat(file_path)
+                known = self.notes.get(relative_path)
+                if (
+                    known
+                    and known["mtime_ns"] == stat.st_mtime_ns
+                    and known["size"] == stat.st_size
+                ):
+                    continue
+                changed.append((relative_path, file_path, stat))
+
+            parsed = 0
+            if changed:
+                with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                    refreshed = executor.map(lambda args: self._refresh(*args), changed)
+                    for (relative_path, _, _), (note, reparsed) in zip(
+                        changed, refreshed
+                    ):
+                        self.notes[relative_path] = note
+                        parsed += reparsed
+
+            removed = [path for path in self.notes if path not in seen]
+            for relative_path in removed:
+                del self.notes[relative_path]
+            if changed or removed:
+                self._save()
+
+            self.stats["scans"] += 1
+            self.stats["parsed"] += parsed
+            self.stats["reused"] += len(seen) - parsed
+            self.stats["removed"] += len(removed)
+            logger.info(
+                f"Scanned Obsidian vault {self.vault_path}: {len(seen)} notes, "
+                f"{parsed} parsed, {len(removed)} removed"
+            )
+            return dict(self.notes)
+
+    def documents(self):
+        """Every note section as (stable id, text, metadata)."""
+        for relative_path, note in sorted(self.scan().items()):
+            for section, parsed in enumerate(note["sections"]):
+                metadata = {**parsed["metadata"], "file_path": relative_path}
+                yield note_id(relative_path, section), parsed["text"], metadata
+
+
+def get_vault_index(vault_path):
+    """The shared VaultIndex for `vault_path`, persisted under obsidian.cache_dir."""
+    vault_path = os.path.abspath(vault_path)
+    with _vault_indexes_lock:
+        if vault_path not in _vault_indexes:
+            obsidian_config = config_loader.get_config().get("obsidian", {})
+            cache_name = hashlib.sha256(vault_path.encode("utf-8")).hexdigest()[:16]
+            _vault_indexes[vault_path] = VaultIndex(
+                vault_path,
+                os.path.join(
+                    base_dir,
+                    obsidian_config.get("cache_dir", "cache/obsidian"),
+                    f"{cache_name}.json",
+                ),
+                max_workers=obsidian_config.get("max_workers", 4),
+            )
+        return _vault_indexes[vault_path]
@@ -0,0 +1,78 @@
+import time
+import logging
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from raggaeton.backend.src.utils.common import config_loader
+
+logger = logging.getLogger(__name__)
+
+
+class PipelineOrchestrator:
+    """Runs independent branches concurrently, each through the same ordered stages.
+
+    A stage is a `(name, func)` pair where `func(state)` returns the state passed to
+    the next stage. Returning None stops that branch without affecting the others.
+    """
+
+    def __init__(self, stages, max_workers=None):
+        self.stages = stages
+        self.max_workers = max_workers or config_loader.config.get("pipeline", {}).get(
+            "max_workers", 4
+        )
+
+    def _run_branch(self, branch, state):
+        timings = {}
+        for stage_name, func in self.stages:
+            start = time.perf_counter()
+            try:
+                state = func(state)
+            finally:
+                timings[stage_name] = time.perf_counter() - start
+            if state is None:
+                logger.warning(f"Branch {branch} stopped after stage {stage_name}")
+                break
+        return state, timings
+
+    def run(self, branches):
+        """Run `branches` ({branch name: initial state}) and return results with timings."""
+        start = time.perf_counter()
+        results, errors, branch_timings = {}, {}, {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # Copy the context per branch so Langfuse traces follow the worker threads
+            futures = {
+                branch: executor.submit(
+                    contextvars.copy_context().run, self._run_branch, branch, state
+                )
+                for branch, state in branches.items()
+            }
+            for branch, future in futures.items():
+                try:
+                    results[branch], branch_timings[branch] = future.result()
+                except Exception as e:
+                    logger.error(f"Branch {branch} failed: {e}")
+                    results[branch] = None
+                    errors[branch] = str(e)
+
+        timings = {
+            "wall_seconds": time.perf_counter() - start,
+            "stages": summarize_stage_timings(branch_timings),
+            "branches": branch_timings,
+        }
+        logger.info(
+            f"Pipeline finished {len(branches)} branches in {timings['wall_seconds']:.2f}s "
+            f"with {self.max_workers} workers, stage timings: {timings['stages']}"
+        )
+        return {"results": results, "errors": errors, "timings": timings}
+
+
+def summarize_stage_timings(branch_timings):
+    stages = {}
+    for timings in branch_timings.values():
+        for stage_name, seconds in timings.items():
+            summary = stages.setdefault(
+                stage_name, {"calls": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+            )
+            summary["calls"] += 1
+            summary["total_seconds"] += seconds
+            summary["max_seconds"] = max(summary["max_seconds"], seconds)
+    return stages
@@ -1,32 +1,19 @@
 import yaml
 import os
-import json
 import random
+import string
+import threading
 from raggaeton.backend.src.utils.common import find_project_root, logger
-from raggaeton.backend.src.utils.error_handler import error_handling_context
+from raggaeton.backend.src.utils.error_handler import DataError, error_handling_context
+from raggaeton.backend.src.utils.prompt_registry import (
+    get_prompt_registry,
+    hash_content,
+)
 
 base_dir = find_project_root(os.path.dirname(__file__))
 config_path = os.path.join(
     base_dir, "raggaeton", "backend", "src", "config", "config.yaml"
 )
-prompts_dir = os.path.join(base_dir, "raggaeton", "backend", "src", "config", "prompts")
-content_blocks_path = os.path.join(
-    base_dir,
-    "raggaeton",
-    "backend",
-    "src",
-    "config",
-    "article_templates",
-    "content_blocks.json",
-)
-textfx_examples_path = os.path.join(
-    base_dir,
-    "raggaeton",
-    "backend",
-    "src",
-    "config",
-    "textfx_examples.json",
-)
 
 
 def load_yaml(file_path):
@@ -34,24 +21,48 @@ def load_yaml(file_path):
         return yaml.safe_load(file)
 
 
-def load_json(file_path):
-    with open(file_path, "r") as file:
-        return json.load(file)
-
-
 config = load_yaml(config_path)
-content_blocks = load_json(content_blocks_path)
-textfx_examples = load_json(textfx_examples_path)
-
-prompts = {}
-for file_name in os.listdir(prompts_dir):
-    if file_name.endswith(".yaml"):
-        file_path = os.path.join(prompts_dir, file_name)
-        loaded_prompts = load_yaml(file_path)
-        prompts.update(loaded_prompts)
+prompt_registry = get_prompt_registry()
+
+
+class PromptTemplate:
+    """A prompt compiled once per registry snapshot.
+
+    The message template is parsed up front, so malformed templates fail at load
+    rather than per request, and params missing a field are reported together.
+    Rendering is then a single `format_map` call, and the content-block suggestions
+    are precomputed for the static prompt prefix.
+    """
+
+    def __init__(self, function_name, prompt_config, content_blocks, version=None):
+        self.function_name = function_name
+        self.version = version
+        self.system_prompt = prompt_config.get("system_prompt", "")
+        self.message_template = prompt_config["message_prompt"]
+        self.fields = {
+            field_name.split("[")[0].split(".")[0]
+            for _, field_name, _, _ in string.Formatter().parse(self.message_template)
+            if field_name
+        }
+        self.suggestions = format_content_block_suggestions(
+            get_content_block_suggestions(
+                prompt_config.get("structures", []), content_blocks
+            )
+        )
+        self._render = self.message_template.format_map
+
+    def render(self, params):
+        missing = self.fields.difference(params)
+        if missing:
+            raise DataError(
+                f"Prompt {self.function_name} is missing params: {sorted(missing)}"
+            )
+        return self._render(params)
 
 
-def get_content_block_suggestions(structures):
+def get_content_block_suggestions(structures, content_blocks=None):
+    if content_blocks is None:
+        content_blocks = prompt_registry.snapshot.content_blocks
     suggestions = []
     unique_blocks = set()
     for structure in structures:
@@ -72,10 +83,24 @@ def get_content_block_suggestions(structures):
     return suggestions
 
 
-def get_textfx_examples():
+def format_content_block_suggestions(suggestions):
+    if not suggestions:
+        return ""
+    lines = ["Content Block Suggestions:\n"]
+    for suggestion in suggestions:
+        lines.append(
+            f"- **{suggestion['content_block']}**: {suggestion['description']}\n"
+        )
+        lines.append(f"  - Required: {suggestion['required']}\n")
+        if suggestion["optional"]:
+            lines.append(f"  - Optional: {suggestion['optional']}\n")
+    return "".join(lines)
+
+
+def get_textfx_examples(rng=random):
     examples = []
-    for method, data in textfx_examples.items():
-        selected_examples = random.sample(
+    for method, data in prompt_registry.snapshot.textfx_examples.items():
+        selected_examples = rng.sample(
             data["examples"], 3
         )  # Take 3 random examples for each method
         formatted_examples = {
@@ -109,6 +134,69 @@ def format_textfx_instructions(textfx_examples):
     return "\n".join(instructions)
 
 
+_compiled = {"generation": None, "templates": {}}
+_compile_lock = threading.Lock()
+
+
+def get_compiled_prompts():
+    """Compiled templates for the registry's current snapshot, rebuilt after a reload."""
+    snapshot = prompt_registry.snapshot
+    if _compiled["generation"] != snapshot.generation:
+        with _compile_lock:
+            if _compiled["generation"] != snapshot.generation:
+                _compiled["templates"] = {
+                    function_name: PromptTemplate(
+                        function_name,
+                        prompt_config,
+                        snapshot.content_blocks,
+                        snapshot.versions[function_name],
+                    )
+                    for function_name, prompt_config in snapshot.prompts.items()
+                    if "message_prompt" in prompt_config
+                }
+                _compiled["generation"] = snapshot.generation
+    return _compiled["templates"]
+
+
+_stable_textfx = {"generation": None, "instructions": ""}
+
+
+def stable_textfx():
+    return config.get("prompts", {}).get("stable_textfx", False)
+
+
+def get_textfx_instructions():
+    """TextFX instructions for flair edits.
+
+    With prompts.stable_textfx the sample is fixed per registry snapshot (seeded from
+    the examples themselves, so every worker agrees), which keeps the prompt prefix
+    identical between calls and lets the provider cache it. Otherwise every call
+    gets a fresh sample.
+    """
+    if not stable_textfx():
+        return format_textfx_instructions(get_textfx_examples())
+    snapshot = prompt_registry.snapshot
+    if _stable_textfx["generation"] != snapshot.generation:
+        rng = random.Random(hash_content(snapshot.textfx_examples))
+        _stable_textfx["instructions"] = format_textfx_instructions(
+            get_textfx_examples(rng)
+        )
+        _stable_textfx["generation"] = snapshot.generation
+    return _stable_textfx["instructions"]
+
+
+def join_prompt_prefix(system_prompt, static_prompt):
+    return f"{system_prompt}\n\n{static_prompt}" if static_prompt else system_prompt
+
+
+def get_prompt_version(function_name):
+    return prompt_registry.version(function_name)
+
+
+# Compile at import so a broken template fails at startup
+get_compiled_prompts()
+
+
 def get_optional_params(params, **kwargs):
     # Ensure 'optional_params' is included in params
     if "optional_params" not in params:
@@ -149,36 +237,44 @@ def prepare_params(params):
     return params
 
 
-def get_prompts(function_name, request, **kwargs):
-    logger.info(f"Get Prompts - Received request {request} with kwargs: {kwargs}")
+def get_prompt_parts(function_name, request, **kwargs):
+    """Return (system_prompt, static_prompt, message_prompt).
 
-    system_prompt = prompts[function_name].get("system_prompt", "")
+    static_prompt holds the request-independent context (content-block suggestions,
+    and TextFX examples for flair edits with prompts.stable_textfx) so it can follow the system prompt as one
+    stable, cacheable prefix, with only message_prompt varying per request.
+    """
+    logger.debug("Get Prompts - Received request %s with kwargs: %s", request, kwargs)
+
+    template = get_compiled_prompts()[function_name]
 
     # Convert the request model to a dictionary, excluding unset and None values
     params = request.model_dump(exclude_unset=True, exclude_none=True)
 
     # Get optional parameters
     params = get_optional_params(params, **kwargs)
-    logger.debug(f"Formatted parameters for prompt: {params}")
-
-    # Fetch content block suggestions based on the structures defined in the YAML file
-    structures = prompts[function_name].get("structures", [])
-    content_block_suggestions = (
-        get_content_block_suggestions(structures) if structures else []
-    )
+    logger.debug("Formatted parameters for prompt: %s", params)
 
     # Prepare params by including nested keys
     params = prepare_params(params)
 
+    static_parts = []
     # Conditionally include textfx examples for edit_flair
     if params.get("edit_type") == "flair":
-        textfx_examples = get_textfx_examples()
-        logger.info(f"TextFX Examples: {textfx_examples}")
-        textfx_instructions = format_textfx_instructions(textfx_examples)
-        params["textfx_instructions"] = textfx_instructions
+        textfx_instructions = get_textfx_instructions()
         logger.debug(f"TextFX Instructions: {textfx_instructions}")
+        if stable_textfx():
+            static_parts.append(textfx_instructions)
+            params["textfx_instructions"] = (
+                "Use the TextFX examples given in the system prompt."
+            )
+        else:
+            # A fresh sample per call would change the prefix and defeat its cache
+            params["textfx_instructions"] = textfx_instructions
     else:
         params["textfx_instructions"] = ""
+    if template.suggestions:
+        static_parts.append(template.suggestions)
 
     # Ensure draft_outlines and other optional fields are included in params
     params["draft_outlines"] = params.get("draft_outlines", "None")
@@ -186,19 +282,15 @@ def get_prompts(function_name, request, **kwargs):
     params["edit_type"] = params.get("edit_type", "None")
 
     with error_handling_context():
-        message_prompt = prompts[function_name]["message_prompt"].format(**params)
-
-    # Include content block suggestions in the prompt if available
-    if content_block_suggestions:
-        message_prompt += "\n\nContent Block Suggestions:\n"
-        for suggestion in content_block_suggestions:
-            message_prompt += (
-                f"- **{suggestion['content_block']}**: {suggestion['description']}\n"
-            )
-            message_prompt += f"  - Required: {suggestion['required']}\n"
-            if suggestion["optional"]:
-                message_prompt += f"  - Optional: {suggestion['optional']}\n"
+        message_prompt = template.render(params)
 
-    logger.debug(f"Formatted message prompt: {message_prompt}")
+    logger.debug("Formatted message prompt: %s", message_prompt)
 
-    return system_prompt, message_prompt
+    return template.system_prompt, "\n\n".join(static_parts), message_prompt
+
+
+def get_prompts(function_name, request, **kwargs):
+    system_prompt, static_prompt, message_prompt = get_prompt_parts(
+        function_name, request, **kwargs
+    )
+    return join_prompt_prefix(system_prompt, static_prompt), message_prompt
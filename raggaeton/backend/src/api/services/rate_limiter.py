@@ -0,0 +1,139 @@
+import time
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+import anthropic
+import openai
+import httpx
+from raggaeton.backend.src.utils.retry import (
+    RETRYABLE_STATUS_CODES,
+    get_status_code,
+    get_retry_delay,
+)
+
+logger = logging.getLogger(__name__)
+
+CONNECTION_ERRORS = (
+    openai.APIConnectionError,
+    anthropic.APIConnectionError,
+    httpx.TransportError,
+)
+
+
+def is_retryable(exc):
+    return (
+        isinstance(exc, CONNECTION_ERRORS)
+        or get_status_code(exc) in RETRYABLE_STATUS_CODES
+    )
+
+
+class TokenBucket:
+    """Async token bucket refilled continuously at `capacity` units per minute."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.available = float(capacity)
+        self.rate = capacity / 60.0
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.available = min(
+            self.capacity, self.available + (now - self.updated) * self.rate
+        )
+        self.updated = now
+
+    async def acquire(self, amount=1):
+        # A single request larger than the bucket would otherwise wait forever
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.available >= amount:
+                    self.available -= amount
+                    return
+                await asyncio.sleep((amount - self.available) / self.rate)
+
+    def adjust(self, amount):
+        # Reconcile an estimate with the real usage; may go negative to repay debt
+        self._refill()
+        self.available = min(self.capacity, self.available - amount)
+
+
+class ProviderLimiter:
+    """Bounds concurrency, requests/min and tokens/min for one LLM provider."""
+
+    def __init__(
+        self,
+        provider,
+        requests_per_minute,
+        tokens_per_minute,
+        max_concurrency,
+        retries=5,
+        base_delay=1.0,
+        max_delay=60.0,
+    ):
+        self.provider = provider
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.paused_until = 0.0
+        self.stats = {
+            "requests": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "wait_seconds": 0.0,
+        }
+
+    def pause(self, seconds):
+        # A 429 means the provider's window is exhausted for every caller, not just one
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    @asynccontextmanager
+    async def limit(self, estimated_tokens=0):
+        start = time.monotonic()
+        async with self.semaphore:
+            pause = self.paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+            await self.requests.acquire(1)
+            await self.tokens.acquire(estimated_tokens)
+            self.stats["requests"] += 1
+            self.stats["wait_seconds"] += time.monotonic() - start
+            yield self
+
+    def record_usage(self, estimated_tokens, actual_tokens):
+        self.tokens.adjust(actual_tokens - estimated_tokens)
+
+    def retry_delay(self, exc, attempt):
+        """Return how long to wait before retrying `exc`, or None to give up."""
+        if attempt >= self.retries or not is_retryable(exc):
+            return None
+        delay = get_retry_delay(exc, attempt, self.base_delay, self.max_delay)
+        self.stats["retries"] += 1
+        if get_status_code(exc) == 429:
+            self.stats["rate_limited"] += 1
+            self.pause(delay)
+        logger.warning(
+            f"{self.provider} call failed ({exc}), "
+            f"retry {attempt + 1}/{self.retries} in {delay:.2f}s"
+        )
+        return delay
+
+    async def call(self, func, estimated_tokens=0):
+        """Run `await func()` under the limits, retrying 429/5xx with backoff."""
+        attempt = 0
+        while True:
+            try:
+                async with self.limit(estimated_tokens):
+                    return await func()
+            except Exception as e:
+                delay = self.retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
@@ -0,0 +1,217 @@
+import os
+import re
+import json
+import math
+import time
+import zlib
+import logging
+import threading
+from collections import Counter
+from llama_index.core.base.base_selector import (
+    BaseSelector,
+    SelectorResult,
+    SingleSelection,
+)
+from raggaeton.backend.src.utils.common import config_loader, base_dir
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIMS = 4096
+
+
+def get_routing_config():
+    routing_config = config_loader.get_config().get("routing", {})
+    return {
+        "path": os.path.join(
+            base_dir, routing_config.get("path", "cache/routing/decisions.jsonl")
+        ),
+        "neighbors": routing_config.get("neighbors", 5),
+        "min_similarity": routing_config.get("min_similarity", 0.6),
+        "min_agreement": routing_config.get("min_agreement", 0.8),
+        "min_examples": routing_config.get("min_examples", 3),
+    }
+
+
+def normalize_query(query):
+    return " ".join(re.findall(r"\w+", query.lower()))
+
+
+def embed_query(query):
+    """Hashed bag of words and word pairs, L2-normalized. Local and deterministic,
+    so routing a query costs no API call."""
+    words = normalize_query(query).split()
+    features = Counter(words + [" ".join(pair) for pair in zip(words, words[1:])])
+    vector = Counter()
+    for feature, count in features.items():
+        vector[zlib.crc32(feature.encode("utf-8")) % EMBEDDING_DIMS] += 1 + math.log(
+            count
+        )
+    norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+    return {index: weight / norm for index, weight in vector.items()}
+
+
+def cosine(a, b):
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(weight * b.get(index, 0.0) for index, weight in a.items())
+
+
+def choices_key(choices):
+    return "|".join(choice.name or choice.description for choice in choices)
+
+
+class CachedSelector(BaseSelector):
+    """Selector that answers routable queries locally, asking `selector` otherwise.
+
+    A query seen before gets its logged choice back. Otherwise its nearest logged
+    queries (by embedding cosine similarity) vote, and their choice is used when
+    the nearest is similar enough and they agree. Everything else goes to the
+    wrapped LLM selector, whose decision is logged to `path` and trains both.
+    """
+
+    def __init__(
+        self,
+        selector,
+        path=None,
+        embed=embed_query,
+        neighbors=5,
+        min_similarity=0.6,
+        min_agreement=0.8,
+        min_examples=3,
+    ):
+        self.selector = selector
+        self.path = path
+        self.embed = embed
+        self.neighbors = neighbors
+        self.min_similarity = min_similarity
+        self.min_agreement = min_agreement
+        self.min_examples = min_examples
+        self.cache = {}
+        self.examples = {}
+        self.stats = {
+            "queries": 0,
+            "cache_hits": 0,
+            "classifier_hits": 0,
+            "llm_calls": 0,
+        }
+        self._lock = threading.Lock()
+        self._load()
+
+    def _get_prompts(self):
+        return {}
+
+    def _update_prompts(self, prompts):
+        pass
+
+    def _get_prompt_modules(self):
+        return {"selector": self.selector}
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        with open(self.path, "r") as file:
+            for line in file:
+                try:
+                    decision = json.loads(line)
+                except ValueError:
+                    continue
+                self._learn(decision["choices"], decision["query"], decision["index"])
+        logger.info(f"Loaded {len(self.cache)} routing decisions from {self.path}")
+
+    def _learn(self, key, query, index):
+        self.cache[(key, normalize_query(query))] = index
+        self.examples.setdefault(key, []).append((self.embed(query), index))
+
+    def record(self, choices, query, result):
+        if len(result.selections) != 1:
+            return
+        key, index = choices_key(choices), result.selections[0].index
+        decision = {"choices": key, "query": query, "index": index, "at": time.time()}
+        with self._lock:
+            self._learn(key, query, index)
+            if self.path:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(self.path, "a") as file:
+                    file.write(json.dumps(decision) + "\n")
+
+    def classify(self, key, query):
+        """The choice the nearest logged queries agree on, None when unsure."""
+        examples = self.examples.get(key, [])
+        if len(examples) < self.min_examples:
+            return None
+        vector = self.embed(query)
+        nearest = sorted(
+            ((cosine(vector, example), index) for example, index in examples),
+            reverse=True,
+        )[: self.neighbors]
+        if nearest[0][0] < self.min_similarity:
+            return None
+        votes = Counter()
+        for similarity, index in nearest:
+            votes[index] += similarity
+        index, weight = votes.most_common(1)[0]
+        if weight / sum(votes.values()) < self.min_agreement:
+            return None
+        return index
+
+    def route(self, choices, query):
+        """(choice index, how it was decided) without an LLM call, or None."""
+        key = choices_key(choices)
+        with self._lock:
+            self.stats["queries"] += 1
+            index = self.cache.get((key, normalize_query(query)))
+            if index is not None:
+                self.stats["cache_hits"] += 1
+                return index, "cache"
+            index = self.classify(key, query)
+            if index is not None:
+                self.stats["classifier_hits"] += 1
+                return index, "classifier"
+            self.stats["llm_calls"] += 1
+        return None
+
+    def report(self):
+        with self._lock:
+            saved = self.stats["cache_hits"] + self.stats["classifier_hits"]
+            return {**self.stats, "saved_round_trips": saved}
+
+    def _routed(self, choices, query):
+        routed = self.route(choices, query.query_str)
+        if routed is None:
+            return None
+        index, decided_by = routed
+        logger.info(
+            f"Routed to {choices[index].name or index} by {decided_by}, "
+            f"{self.report()['saved_round_trips']} LLM round trips saved"
+        )
+        return SelectorResult(
+            selections=[
+                SingleSelection(index=index, reason=f"Routed locally by {decided_by}")
+            ]
+        )
+
+    def _select(self, choices, query):
+        result = self._routed(choices, query)
+        if result is None:
+            result = self.selector.select(choices, query)
+            self.record(choices, query.query_str, result)
+        return result
+
+    async def _aselect(self, choices, query):
+        result = self._routed(choices, query)
+        if result is None:
+            result = await self.selector.aselect(choices, query)
+            self.record(choices, query.query_str, result)
+        return result
+
+
+def create_cached_selector(selector):
+    routing_config = get_routing_config()
+    return CachedSelector(
+        selector,
+        path=routing_config["path"],
+        neighbors=routing_config["neighbors"],
+        min_similarity=routing_config["min_similarity"],
+        min_agreement=routing_config["min_agreement"],
+        min_examples=routing_config["min_examples"],
+    )
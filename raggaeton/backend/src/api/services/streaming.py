@@ -0,0 +1,195 @@
+import time
+import queue
+import logging
+import threading
+import contextvars
+from raggaeton.backend.src.utils.common import config_loader
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class Stage:
+    """One step of a StreamingPipeline.
+
+    `func(item)` returns an iterable of outputs for the next stage, so a stage can
+    drop, pass on or expand items. With `batch_size`, `func` receives lists of up to
+    that many items instead. `workers` threads run the stage side by side.
+    """
+
+    def __init__(self, name, func, workers=1, batch_size=None):
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.batch_size = batch_size
+
+
+class StageStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.items_in = 0
+        self.items_out = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.blocked_seconds = 0.0
+        self.max_queue_depth = 0
+        self.first_output_at = None
+
+    def add(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def to_dict(self, started):
+        return {
+            "items_in": self.items_in,
+            "items_out": self.items_out,
+            "errors": self.errors,
+            "busy_seconds": round(self.busy_seconds, 3),
+            # Time spent waiting for a full downstream queue, i.e. backpressure
+            "blocked_seconds": round(self.blocked_seconds, 3),
+            "items_per_second": (
+                round(self.items_in / self.busy_seconds, 2)
+                if self.busy_seconds
+                else None
+            ),
+            "max_queue_depth": self.max_queue_depth,
+            "first_output_seconds": (
+                round(self.first_output_at - started, 3)
+                if self.first_output_at
+                else None
+            ),
+        }
+
+
+class StreamingPipeline:
+    """Streams items from a source through stages connected by bounded queues.
+
+    A stage blocks when the queue to the next one is full, so a slow stage slows
+    the ones before it instead of letting items pile up in memory. Items reach the
+    last stage while the source is still producing. A failing item is logged and
+    counted in its stage's errors; the rest keep flowing.
+    """
+
+    def __init__(self, stages, queue_size=None):
+        self.stages = stages
+        self.queue_size = queue_size or config_loader.config.get("pipeline", {}).get(
+            "queue_size", 32
+        )
+
+    def _put(self, out_queue, item, stats):
+        started = time.perf_counter()
+        out_queue.put(item)
+        blocked = time.perf_counter() - started
+        stats.add(blocked_seconds=blocked)
+        return blocked
+
+    def _emit(self, output, out_queue, stats):
+        if stats.first_output_at is None:
+            stats.first_output_at = time.perf_counter()
+        stats.add(items_out=1)
+        return self._put(out_queue, output, stats)
+
+    def _process(self, stage, items, out_queue, stats):
+        started = time.perf_counter()
+        blocked = 0.0
+        try:
+            # Outputs are passed on as they are produced, so an expanding stage
+            # never holds its whole fan-out; outputs before a failure are kept
+            for output in stage.func(items) or ():
+                blocked += self._emit(output, out_queue, stats)
+        except Exception as e:
+            logger.error(f"Stage {stage.name} failed: {e}")
+            stats.add(errors=1)
+        finally:
+            stats.add(busy_seconds=time.perf_counter() - started - blocked)
+
+    def _worker(self, stage, in_queue, out_queue, stats):
+        batch = []
+        while True:
+            stats.max_queue_depth = max(stats.max_queue_depth, in_queue.qsize())
+            item = in_queue.get()
+            if item is _DONE:
+                break
+            stats.add(items_in=1)
+            if stage.batch_size is None:
+                self._process(stage, item, out_queue, stats)
+                continue
+            batch.append(item)
+            if len(batch) >= stage.batch_size:
+                self._process(stage, batch, out_queue, stats)
+                batch = []
+        if batch:
+            self._process(stage, batch, out_queue, stats)
+
+    def _feed(self, source, out_queue, stats, errors):
+        try:
+            for item in source:
+                stats.add(items_out=1)
+                self._put(out_queue, item, stats)
+        except Exception as e:
+            logger.error(f"Pipeline source failed: {e}")
+            errors.append(e)
+
+    def run(self, source):
+        """Run every item of `source` through the stages and return the last stage's
+        outputs with per-stage statistics.
+
+        The last stage's outputs are kept in memory, so it should yield summaries
+        (like counts of documents indexed) rather than the items themselves.
+        """
+        started = time.perf_counter()
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        results = queue.Queue()
+        stats = {"source": StageStats()}
+        stats.update({stage.name: StageStats() for stage in self.stages})
+        source_errors = []
+
+        def start(target, *args):
+            # Copy the context per thread so Langfuse traces follow the stages
+            thread = threading.Thread(
+                target=contextvars.copy_context().run, args=(target, *args), daemon=True
+            )
+            thread.start()
+            return thread
+
+        feeder = start(self._feed, source, queues[0], stats["source"], source_errors)
+        stage_threads = []
+        for index, stage in enumerate(self.stages):
+            out_queue = queues[index + 1] if index + 1 < len(queues) else results
+            stage_threads.append(
+                [
+                    start(
+                        self._worker, stage, queues[index], out_queue, stats[stage.name]
+                    )
+                    for _ in range(stage.workers)
+                ]
+            )
+
+        # Each stage ends once everything before it has, one end marker per worker
+        feeder.join()
+        for index, (stage, threads) in enumerate(zip(self.stages, stage_threads)):
+            for _ in threads:
+                queues[index].put(_DONE)
+            for thread in threads:
+                thread.join()
+
+        outputs = []
+        while not results.empty():
+            outputs.append(results.get())
+        if source_errors:
+            raise source_errors[0]
+
+        report = {
+            name: stage_stats.to_dict(started) for name, stage_stats in stats.items()
+        }
+        wall_seconds = time.perf_counter() - started
+        logger.info(
+            f"Streaming pipeline finished in {wall_seconds:.2f}s, stage stats: {report}"
+        )
+        return {
+            "outputs": outputs,
+            "stats": report,
+            "wall_seconds": round(wall_seconds, 3),
+        }
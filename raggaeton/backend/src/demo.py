@@ -10,6 +10,7 @@ from raggaeton.backend.src.api.services.index import (
     construct_query,
 )
 from raggaeton.backend.src.db.supabase import upsert_data, fetch_data
+from raggaeton.backend.src.api.services.pipeline import PipelineOrchestrator
 from raggaeton.backend.src.schemas.content import (
     GenerateHeadlinesRequest,
     GenerateDraftRequest,
@@ -199,148 +200,181 @@ def main():
         headlines_response = response.json()
         logger.debug("Generated Headlines: %s", headlines_response)
 
-        # Step 11: Generate drafts for each headline
-        logger.debug("Generating drafts for each headline...")
-        for headline_data in headlines_response["headlines"]:
-            draft_request = GenerateDraftRequest(
-                topics=topics,
-                context={"context": context},
-                headline=headline_data["headline"],
-                hook=headline_data["hook"],
-                thesis=headline_data["thesis"],
-                article_type=headline_data["article_type"],
-                optional_params=optional_params,
-            )
-            logger.debug("Generate Draft Request: %s", draft_request.dict())
-            response = requests.post(
-                f"{API_BASE_URL}/generate-draft",
-                json=draft_request.dict(),
-                timeout=TIMEOUT,
-            )
-            response.raise_for_status()
-            draft_response = response.json()
-            logger.debug("Generated Draft: %s", draft_response)
-            logger.debug("Draft Response Type: %s", type(draft_response))
-
-            # Log the raw response
-            logger.debug("Raw Draft Response: %s", response.text)
-
-            # Enrich the trace with the output of the draft generation
-            langfuse_context.update_current_observation(
-                name="draft_generation",
-                output={"draft_response": draft_response},
-                metadata={"model_name": "gpt-4o", "token_use": 565, "cost": "0.01"},
-            )
+        # Steps 11-14: Each headline runs draft -> topic sentences -> full content
+        # -> edit in order, and headlines run in parallel
+        logger.debug("Generating articles for each headline...")
+        headline_states = {
+            headline_data["headline"]: {
+                "topics": topics,
+                "context": context,
+                "optional_params": optional_params,
+                "headline_data": headline_data,
+            }
+            for headline_data in headlines_response["headlines"]
+        }
+        run = PipelineOrchestrator(HEADLINE_STAGES).run(headline_states)
+        logger.info("Pipeline timings: %s", run["timings"])
+        langfuse_context.update_current_observation(
+            name="headline_pipeline",
+            metadata={"timings": run["timings"], "errors": run["errors"]},
+        )
+
+
+def post_request(endpoint, request):
+    response = requests.post(
+        f"{API_BASE_URL}/{endpoint}",
+        json=request.dict(),
+        timeout=TIMEOUT,
+    )
+    response.raise_for_status()
+    return response
+
+
+def generate_drafts_stage(state):
+    headline_data = state["headline_data"]
+    draft_request = GenerateDraftRequest(
+        topics=state["topics"],
+        context={"context": state["context"]},
+        headline=headline_data["headline"],
+        hook=headline_data["hook"],
+        thesis=headline_data["thesis"],
+        article_type=headline_data["article_type"],
+        optional_params=state["optional_params"],
+    )
+    logger.debug("Generate Draft Request: %s", draft_request.dict())
+    response = post_request("generate-draft", draft_request)
+    draft_response = response.json()
+    logger.debug("Generated Draft: %s", draft_response)
+    logger.debug("Draft Response Type: %s", type(draft_response))
+
+    # Log the raw response
+    logger.debug("Raw Draft Response: %s", response.text)
+
+    # Enrich the trace with the output of the draft generation
+    langfuse_context.update_current_observation(
+        name="draft_generation",
+        output={"draft_response": draft_response},
+        metadata={"model_name": "gpt-4o", "token_use": 565, "cost": "0.01"},
+    )
+
+    # Log the draft outlines specifically
+    drafts = draft_response.get("drafts", [])
+    for draft in drafts:
+        logger.debug("Draft Outlines: %s", draft.get("draft_outlines", []))
+    return {**state, "drafts": drafts}
+
+
+def generate_topic_sentences_stage(state):
+    topic_sentences_responses = []
+    for draft in state["drafts"]:
+        topic_sentences_request = GenerateTopicSentencesRequest(
+            topics=state["topics"],
+            context={"context": state["context"]},
+            headline=draft["headline"],
+            hook=draft["hook"],
+            thesis=draft["thesis"],
+            article_type=draft["article_type"],
+            draft_outlines=draft["draft_outlines"],
+            optional_params=state["optional_params"],
+        )
+        logger.debug(
+            "Generate Topic Sentences Request: %s",
+            topic_sentences_request.dict(),
+        )
+        topic_sentences_response = post_request(
+            "generate-topic-sentences", topic_sentences_request
+        ).json()
+        logger.debug("Generated Topic Sentences: %s", topic_sentences_response)
+
+        # Enrich the trace with the output of the topic sentences generation
+        langfuse_context.update_current_observation(
+            name="topic_sentences_generation",
+            output={"topic_sentences_response": topic_sentences_response},
+            metadata={
+                "model_name": "gpt-4o",
+                "token_use": 300,
+                "cost": "0.005",
+            },
+        )
+        topic_sentences_responses.append(topic_sentences_response)
+    return {**state, "topic_sentences": topic_sentences_responses}
+
+
+def generate_full_content_stage(state):
+    full_content_responses = []
+    for draft, topic_sentences_response in zip(
+        state["drafts"], state["topic_sentences"]
+    ):
+        full_content_request = GenerateFullContentRequest(
+            topics=state["topics"],
+            context={"context": state["context"]},
+            headline=draft["headline"],
+            hook=draft["hook"],
+            thesis=draft["thesis"],
+            article_type=draft["article_type"],
+            draft_outlines=topic_sentences_response["draft_outlines"],
+            optional_params=state["optional_params"],
+        )
+        logger.debug("Generate Full Content Request: %s", full_content_request.dict())
+        full_content_response = post_request(
+            "generate-full-content", full_content_request
+        ).json()
+        logger.info("Generated Full Content: %s", full_content_response)
+
+        # Enrich the trace with the output of the full content generation
+        langfuse_context.update_current_observation(
+            name="full_content_generation",
+            output={"full_content_response": full_content_response},
+            metadata={
+                "model_name": "gpt-4o",
+                "token_use": 800,
+                "cost": "0.015",
+            },
+        )
+        full_content_responses.append(full_content_response)
+    return {**state, "full_content": full_content_responses}
+
+
+def edit_content_stage(state):
+    edit_content_responses = []
+    for draft, full_content_response in zip(state["drafts"], state["full_content"]):
+        edit_content_request = EditContentRequest(
+            topics=state["topics"],
+            context={"context": state["context"]},
+            headline=draft["headline"],
+            hook=draft["hook"],
+            thesis=draft["thesis"],
+            article_type=draft["article_type"],
+            full_content_response=full_content_response,
+            edit_type="flair",  # or "structure" based on your requirement
+            optional_params=state["optional_params"],
+        )
+        logger.debug("Edit Content Request: %s", edit_content_request.dict())
+        edit_content_response = post_request(
+            "edit-content", edit_content_request
+        ).json()
+        logger.info("Edited Content: %s", edit_content_response)
+
+        # Enrich the trace with the output of the content editing
+        langfuse_context.update_current_observation(
+            name="content_editing",
+            output={"edit_content_response": edit_content_response},
+            metadata={
+                "model_name": "gpt-4o",
+                "token_use": 400,
+                "cost": "0.007",
+            },
+        )
+        edit_content_responses.append(edit_content_response)
+    return {**state, "edited_content": edit_content_responses}
+
 
-            # Log the draft outlines specifically
-            for draft in draft_response.get("drafts", []):
-                logger.debug("Draft Outlines: %s", draft.get("draft_outlines", []))
-
-                # Step 12: Generate topic sentences for each draft
-                logger.debug("Generating topic sentences for each draft...")
-                topic_sentences_request = GenerateTopicSentencesRequest(
-                    topics=topics,
-                    context={"context": context},
-                    headline=draft["headline"],
-                    hook=draft["hook"],
-                    thesis=draft["thesis"],
-                    article_type=draft["article_type"],
-                    draft_outlines=draft["draft_outlines"],
-                    optional_params=optional_params,
-                )
-                logger.debug(
-                    "Generate Topic Sentences Request: %s",
-                    topic_sentences_request.dict(),
-                )
-                response = requests.post(
-                    f"{API_BASE_URL}/generate-topic-sentences",
-                    json=topic_sentences_request.dict(),
-                    timeout=TIMEOUT,
-                )
-                response.raise_for_status()
-                topic_sentences_response = response.json()
-                logger.debug("Generated Topic Sentences: %s", topic_sentences_response)
-
-                # Enrich the trace with the output of the topic sentences generation
-                langfuse_context.update_current_observation(
-                    name="topic_sentences_generation",
-                    output={"topic_sentences_response": topic_sentences_response},
-                    metadata={
-                        "model_name": "gpt-4o",
-                        "token_use": 300,
-                        "cost": "0.005",
-                    },
-                )
-
-                # Step 13: Generate full content for each draft
-                logger.debug("Generating full content for each draft...")
-                full_content_request = GenerateFullContentRequest(
-                    topics=topics,
-                    context={"context": context},
-                    headline=draft["headline"],
-                    hook=draft["hook"],
-                    thesis=draft["thesis"],
-                    article_type=draft["article_type"],
-                    draft_outlines=topic_sentences_response["draft_outlines"],
-                    optional_params=optional_params,
-                )
-                logger.debug(
-                    "Generate Full Content Request: %s", full_content_request.dict()
-                )
-                response = requests.post(
-                    f"{API_BASE_URL}/generate-full-content",
-                    json=full_content_request.dict(),
-                    timeout=TIMEOUT,
-                )
-                response.raise_for_status()
-                full_content_response = response.json()
-                logger.info("Generated Full Content: %s", full_content_response)
-
-                # Enrich the trace with the output of the full content generation
-                langfuse_context.update_current_observation(
-                    name="full_content_generation",
-                    output={"full_content_response": full_content_response},
-                    metadata={
-                        "model_name": "gpt-4o",
-                        "token_use": 800,
-                        "cost": "0.015",
-                    },
-                )
-
-                # Step 14: Edit content for each draft
-                logger.debug("Editing content for each draft...")
-                edit_content_request = EditContentRequest(
-                    topics=topics,
-                    context={"context": context},
-                    headline=draft["headline"],
-                    hook=draft["hook"],
-                    thesis=draft["thesis"],
-                    article_type=draft["article_type"],
-                    full_content_response=full_content_response,
-                    edit_type="flair",  # or "structure" based on your requirement
-                    optional_params=optional_params,
-                )
-                logger.debug("Edit Content Request: %s", edit_content_request.dict())
-
-                response = requests.post(
-                    f"{API_BASE_URL}/edit-content",
-                    json=edit_content_request.dict(),
-                    timeout=TIMEOUT,
-                )
-                response.raise_for_status()
-                edit_content_response = response.json()
-                logger.info("Edited Content: %s", edit_content_response)
-
-                # Enrich the trace with the output of the content editing
-                langfuse_context.update_current_observation(
-                    name="content_editing",
-                    output={"edit_content_response": edit_content_response},
-                    metadata={
-                        "model_name": "gpt-4o",
-                        "token_use": 400,
-                        "cost": "0.007",
-                    },
-                )
+HEADLINE_STAGES = [
+    ("generate_draft", generate_drafts_stage),
+    ("generate_topic_sentences", generate_topic_sentences_stage),
+    ("generate_full_content", generate_full_content_stage),
+    ("edit_content", edit_content_stage),
+]
 
 
 if __name__ == "__main__":
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Dict, Optional, Any
 from .common import OptionalParams
 
@@ -49,6 +49,12 @@ class GenerateDraftResponse(BaseModel):
     drafts: List[Draft]
 
 
+class GenerateDraftsBatchRequest(BaseModel):
+    requests: List[GenerateDraftRequest]
+    # Capped by llm.batch.max_concurrency
+    max_concurrency: Optional[int] = Field(None, ge=1)
+
+
 class GenerateTopicSentencesRequest(GenerateDraftRequest):
     topics: List[str]
     context: Optional[Dict[str, Any]] = None
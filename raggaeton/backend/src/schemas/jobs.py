@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+from typing import Dict, Optional, Any
+
+
+class JobRequest(BaseModel):
+    type: str
+    params: Dict[str, Any] = {}
+
+
+class Job(BaseModel):
+    id: str
+    type: str
+    params: Dict[str, Any]
+    status: str
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    progress_done: int = 0
+    progress_total: Optional[int] = None
+    elapsed_seconds: Optional[float] = None
+    items_per_second: Optional[float] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None
@@ -0,0 +1,174 @@
+import os
+import json
+import bisect
+import logging
+from datetime import datetime
+from llama_index.core.schema import NodeWithScore, TextNode
+from raggaeton.backend.src.utils.error_handler import DataError
+
+logger = logging.getLogger(__name__)
+
+FACETS_NAME = "facets.json"
+# RAGatouille's passage id -> document id map, written into every index
+PID_DOCID_MAP_NAME = "pid_docid_map.json"
+
+# Facet -> metadata keys it is read from, first present wins. Posts from the
+# database carry date_gmt and author_id, fetched research data created_at and author.
+FACET_FIELDS = {
+    "date": ("date_gmt", "created_at", "date_fetched"),
+    "author": ("author_id", "author"),
+    "source": ("source",),
+    "status": ("status",),
+}
+
+
+def parse_day(value):
+    """The YYYY-MM-DD bucket of a date, datetime or ISO string, None if unparseable."""
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    try:
+        return datetime.fromisoformat(str(value)[:10]).date().isoformat()
+    except ValueError:
+        return None
+
+
+def facet_value(metadata, facet):
+    for key in FACET_FIELDS[facet]:
+        value = metadata.get(key)
+        if value not in (None, "", "N/A"):
+            return parse_day(value) if facet == "date" else str(value)
+    return None
+
+
+class FacetIndex:
+    """Postings from metadata values to document positions in a retrieval index.
+
+    Positions follow the order documents were indexed in. Dates are bucketed by day
+    and kept sorted, so a date range is a bisect over the buckets rather than a scan
+    of the documents.
+    """
+
+    def __init__(self, size=0, postings=None):
+        self.size = size
+        self.postings = postings or {facet: {} for facet in FACET_FIELDS}
+        self.days = sorted(self.postings["date"])
+
+    @classmethod
+    def from_documents(cls, documents):
+        facets = cls()
+        facets.add(documents)
+        return facets
+
+    def add(self, documents):
+        """Append postings for documents indexed after the ones already present."""
+        for position, doc in enumerate(documents, start=self.size):
+            for facet in FACET_FIELDS:
+                value = facet_value(doc.metadata, facet)
+                if value is not None:
+                    self.postings[facet].setdefault(value, []).append(position)
+        self.size += len(documents)
+        self.days = sorted(self.postings["date"])
+
+    def save(self, index_path):
+        tmp_path = os.path.join(index_path, f"{FACETS_NAME}.tmp")
+        with open(tmp_path, "w") as file:
+            json.dump({"size": self.size, "postings": self.postings}, file)
+        os.replace(tmp_path, os.path.join(index_path, FACETS_NAME))
+
+    @classmethod
+    def load(cls, index_path):
+        """The facets built with the index at `index_path`, None for older builds."""
+        try:
+            with open(os.path.join(index_path, FACETS_NAME), "r") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return None
+        return cls(data["size"], data["postings"])
+
+    def select(self, since=None, until=None, **values):
+        """Positions of documents matching every filter given, None when no filter
+        is. `since` and `until` are inclusive days; other filters match a facet
+        value or any of a list of values."""
+        selected = None
+        if since or until:
+            start = bisect.bisect_left(self.days, parse_day(since)) if since else 0
+            end = (
+                bisect.bisect_right(self.days, parse_day(until))
+                if until
+                else len(self.days)
+            )
+            selected = {
+                position
+                for day in self.days[start:end]
+                for position in self.postings["date"][day]
+            }
+        for facet, wanted in values.items():
+            if facet not in FACET_FIELDS or facet == "date":
+                raise DataError(f"Unsupported facet: {facet}")
+            if wanted is None:
+                continue
+            wanted = wanted if isinstance(wanted, (list, tuple, set)) else [wanted]
+            matches = {
+                position
+                for value in wanted
+                for position in self.postings[facet].get(str(value), [])
+            }
+            selected = matches if selected is None else selected & matches
+        return None if selected is None else sorted(selected)
+
+
+def indexed_document_ids(index_path):
+    """RAGatouille document ids in the order their documents were indexed."""
+    with open(os.path.join(index_path, PID_DOCID_MAP_NAME), "r") as file:
+        pid_docid_map = json.load(file)
+    document_ids = []
+    seen = set()
+    for pid in sorted(pid_docid_map, key=int):
+        document_id = pid_docid_map[pid]
+        if document_id not in seen:
+            seen.add(document_id)
+            document_ids.append(document_id)
+    return document_ids
+
+
+def facet_document_ids(index_path, **filters):
+    """Document ids to restrict a search at `index_path` to, None to search all.
+
+    Falls back to searching all documents when the index has no facets or they
+    no longer line up with its documents.
+    """
+    facets = FacetIndex.load(index_path)
+    if facets is None:
+        if any(value is not None for value in filters.values()):
+            logger.warning(f"No facets for index at {index_path}, not filtering")
+        return None
+    positions = facets.select(**filters)
+    if positions is None:
+        return None
+    document_ids = indexed_document_ids(index_path)
+    if len(document_ids) != facets.size:
+        logger.warning(
+            f"Facets cover {facets.size} documents but index at {index_path} has "
+            f"{len(document_ids)}, not filtering"
+        )
+        return None
+    logger.debug(
+        f"Facet filters {filters} kept {len(positions)} of {facets.size} documents"
+    )
+    return [document_ids[position] for position in positions]
+
+
+def filtered_search(rag, index_name, index_path, query, k=10, **filters):
+    """Search a RAGatouille index within the documents matching `filters`.
+
+    The filters become RAGatouille's doc_ids, which restrict the passages ColBERT
+    scores instead of filtering results afterwards.
+    """
+    document_ids = facet_document_ids(index_path, **filters)
+    if document_ids == []:
+        return []
+    results = rag.search(query, index_name=index_name, k=k, doc_ids=document_ids)
+    return [
+        NodeWithScore(node=TextNode(text=result["content"]), score=result["score"])
+        for result in results
+    ]
@@ -1,12 +1,32 @@
 import os
+import json
+import time
+import base64
 import logging
+from google.auth.credentials import AnonymousCredentials
+from google.api_core.exceptions import NotFound
 from google.cloud import storage
+from google.cloud.storage import transfer_manager
+import google_crc32c
 from raggaeton.backend.src.utils.common import config_loader, base_dir
 
 logger = logging.getLogger(__name__)
 
+# Published last under gcs_path, so readers only ever see a complete index
+MANIFEST_NAME = "manifest.json"
+# Local record of what was last synced, never uploaded
+LOCAL_MANIFEST_NAME = ".gcs_manifest.json"
+HASH_METADATA_KEY = "crc32c"
+READ_SIZE = 8 * 2**20
+
 
 def get_gcs_client():
+    if os.getenv("STORAGE_EMULATOR_HOST"):
+        # A local fake GCS server takes no credentials
+        return storage.Client(
+            project=os.getenv("GOOGLE_CLOUD_PROJECT", "test"),
+            credentials=AnonymousCredentials(),
+        )
     return storage.Client()
 
 
@@ -15,36 +35,272 @@ def get_bucket(bucket_name):
     return client.bucket(bucket_name)
 
 
+def get_sync_config():
+    sync_config = config_loader.get_config().get("gcs", {}).get("sync", {})
+    return {
+        "max_workers": sync_config.get("max_workers", 8),
+        "slice_threshold": sync_config.get("slice_threshold_mb", 64) * 2**20,
+        "slice_size": sync_config.get("slice_size_mb", 32) * 2**20,
+    }
+
+
+def file_crc32c(file_path):
+    # Base64 like the crc32c GCS reports for every object, composite ones included
+    checksum = google_crc32c.Checksum()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(READ_SIZE), b""):
+            checksum.update(chunk)
+    return base64.b64encode(checksum.digest()).decode("ascii")
+
+
+def load_manifest_file(file_path):
+    try:
+        with open(file_path, "r") as file:
+            return json.load(file).get("files", {})
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def write_manifest_file(file_path, files):
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, "w") as file:
+        json.dump({"version": 1, "files": files}, file, indent=2, sort_keys=True)
+    os.replace(tmp_path, file_path)
+
+
+def build_local_manifest(local_path, previous=None):
+    """Hash every file under `local_path` as {relative path: {size, crc32c}}.
+
+    Files whose size and mtime match `previous` keep their recorded hash instead of
+    being read again.
+    """
+    previous = previous or {}
+    files = {}
+    for root, _, file_names in os.walk(local_path):
+        for file_name in file_names:
+            file_path = os.path.join(root, file_name)
+            relative_path = os.path.relpath(file_path, local_path).replace(os.sep, "/")
+            if relative_path == LOCAL_MANIFEST_NAME or file_name.endswith(".part"):
+                continue
+            stat = os.stat(file_path)
+            known = previous.get(relative_path, {})
+            if (
+                known.get("size") == stat.st_size
+                and known.get("mtime_ns") == stat.st_mtime_ns
+            ):
+                crc32c = known["crc32c"]
+            else:
+                crc32c = file_crc32c(file_path)
+            files[relative_path] = {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "crc32c": crc32c,
+            }
+    return files
+
+
+def remove_empty_dirs(local_path):
+    # Bottom up, so a directory emptied by removing its subdirectories goes too
+    for root, _, _ in os.walk(local_path, topdown=False):
+        if root != local_path and not os.listdir(root):
+            os.rmdir(root)
+
+
+def changed_files(source, target):
+    """Paths in `source` missing from `target` or with a different hash."""
+    return sorted(
+        path
+        for path, entry in source.items()
+        if target.get(path, {}).get("crc32c") != entry["crc32c"]
+    )
+
+
+def get_remote_manifest(bucket, gcs_path):
+    blob = bucket.blob(f"{gcs_path}/{MANIFEST_NAME}")
+    try:
+        return json.loads(blob.download_as_bytes()).get("files", {})
+    except NotFound:
+        return None
+
+
+def list_remote_files(bucket, gcs_path):
+    # Hashes of what is actually in the bucket, so an interrupted upload or a bucket
+    # written before manifests existed is still synced incrementally
+    files = {}
+    prefix = f"{gcs_path}/"
+    for blob in bucket.list_blobs(prefix=prefix):
+        relative_path = blob.name[len(prefix) :]
+        if relative_path == MANIFEST_NAME:
+            continue
+        files[relative_path] = {
+            "size": blob.size,
+            "crc32c": (blob.metadata or {}).get(HASH_METADATA_KEY) or blob.crc32c,
+        }
+    return files
+
+
+def transfer(paths, sizes, transfer_one, transfer_many, sync_config):
+    # Large ColBERT shards go in parallel slices one at a time, the rest side by side
+    large = [path for path in paths if sizes[path] >= sync_config["slice_threshold"]]
+    small = [path for path in paths if sizes[path] < sync_config["slice_threshold"]]
+    for path in large:
+        transfer_one(path)
+    if small:
+        results = transfer_many(small)
+        for path, result in zip(small, results):
+            if isinstance(result, Exception):
+                raise result
+
+
 def save_data(local_path, bucket_name=None, gcs_path=None):
+    """Upload the files under `local_path` that differ from the bucket copy.
+
+    Files are compared by crc32c, uploaded in parallel (large ones as parallel
+    slices), and the manifest is published last. Uploaded objects carry their hash,
+    so rerunning after an interruption skips whatever already made it.
+    """
     config = config_loader.get_config()
     bucket_name = bucket_name or config["gcs"]["bucket_name"]
-    gcs_path = gcs_path or config["gcs"]["index_path"]
+    gcs_path = (gcs_path or config["gcs"]["index_path"]).strip("/")
+    sync_config = get_sync_config()
+    started = time.perf_counter()
 
+    local_manifest_path = os.path.join(local_path, LOCAL_MANIFEST_NAME)
+    local_files = build_local_manifest(
+        local_path, load_manifest_file(local_manifest_path)
+    )
     bucket = get_bucket(bucket_name)
-    for root, _, files in os.walk(local_path):
-        for file in files:
-            local_file_path = os.path.join(root, file)
-            blob_path = os.path.relpath(local_file_path, local_path)
-            blob = bucket.blob(os.path.join(gcs_path, blob_path))
-            blob.upload_from_filename(local_file_path)
-            logger.info(
-                f"Uploaded {local_file_path} to gs://{bucket_name}/{gcs_path}/{blob_path}"
-            )
+    to_upload = changed_files(local_files, list_remote_files(bucket, gcs_path))
+
+    def make_blob(path):
+        blob = bucket.blob(f"{gcs_path}/{path}")
+        blob.metadata = {HASH_METADATA_KEY: local_files[path]["crc32c"]}
+        return blob
+
+    def upload_one(path):
+        transfer_manager.upload_chunks_concurrently(
+            os.path.join(local_path, path),
+            make_blob(path),
+            chunk_size=sync_config["slice_size"],
+            worker_type=transfer_manager.THREAD,
+            max_workers=sync_config["max_workers"],
+            checksum="crc32c",
+        )
+
+    def upload_many(paths):
+        return transfer_manager.upload_many(
+            [(os.path.join(local_path, path), make_blob(path)) for path in paths],
+            upload_kwargs={"checksum": "crc32c"},
+            worker_type=transfer_manager.THREAD,
+            max_workers=sync_config["max_workers"],
+        )
+
+    sizes = {path: entry["size"] for path, entry in local_files.items()}
+    transfer(to_upload, sizes, upload_one, upload_many, sync_config)
+
+    published = {
+        path: {"size": entry["size"], "crc32c": entry["crc32c"]}
+        for path, entry in local_files.items()
+    }
+    bucket.blob(f"{gcs_path}/{MANIFEST_NAME}").upload_from_string(
+        json.dumps({"version": 1, "files": published}, indent=2, sort_keys=True),
+        content_type="application/json",
+    )
+    write_manifest_file(local_manifest_path, local_files)
+
+    stats = {
+        "uploaded": len(to_upload),
+        "unchanged": len(local_files) - len(to_upload),
+        "bytes": sum(sizes[path] for path in to_upload),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+    logger.info(f"Synced {local_path} to gs://{bucket_name}/{gcs_path}: {stats}")
+    return stats
 
 
 def read_data(bucket_name=None, gcs_path=None, local_path=None):
+    """Download the files in the bucket manifest that differ from the local copy,
+    and delete local files the manifest no longer lists.
+
+    Downloads run in parallel (large files as parallel slices) into `.part` files
+    that are verified and renamed, so an interrupted sync never leaves a corrupt
+    file behind and rerunning only fetches what is still missing.
+    """
     config = config_loader.get_config()
     bucket_name = bucket_name or config["gcs"]["bucket_name"]
-    gcs_path = gcs_path or config["gcs"]["index_path"]
+    gcs_path = (gcs_path or config["gcs"]["index_path"]).strip("/")
     local_path = local_path or os.path.join(base_dir, ".ragatouille/colbert/indexes")
+    sync_config = get_sync_config()
+    started = time.perf_counter()
 
     bucket = get_bucket(bucket_name)
-    blobs = bucket.list_blobs(prefix=gcs_path)
-    for blob in blobs:
-        local_file_path = os.path.join(local_path, os.path.relpath(blob.name, gcs_path))
-        os.makedirs(os.path.dirname(local_file_path), exist_ok=True)
-        blob.download_to_filename(local_file_path)
-        logger.info(f"Downloaded {blob.name} to {local_file_path}")
+    remote_files = get_remote_manifest(bucket, gcs_path)
+    if remote_files is None:
+        logger.warning(f"No manifest in gs://{bucket_name}/{gcs_path}, listing blobs")
+        remote_files = list_remote_files(bucket, gcs_path)
+
+    os.makedirs(local_path, exist_ok=True)
+    local_manifest_path = os.path.join(local_path, LOCAL_MANIFEST_NAME)
+    local_files = build_local_manifest(
+        local_path, load_manifest_file(local_manifest_path)
+    )
+    to_download = changed_files(remote_files, local_files)
+
+    def part_path(path):
+        file_path = os.path.join(local_path, *path.split("/"))
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        return f"{file_path}.part"
+
+    def download_one(path):
+        transfer_manager.download_chunks_concurrently(
+            bucket.blob(f"{gcs_path}/{path}"),
+            part_path(path),
+            chunk_size=sync_config["slice_size"],
+            worker_type=transfer_manager.THREAD,
+            max_workers=sync_config["max_workers"],
+        )
+
+    def download_many(paths):
+        return transfer_manager.download_many(
+            [(bucket.blob(f"{gcs_path}/{path}"), part_path(path)) for path in paths],
+            worker_type=transfer_manager.THREAD,
+            max_workers=sync_config["max_workers"],
+        )
+
+    sizes = {path: entry.get("size") or 0 for path, entry in remote_files.items()}
+    transfer(to_download, sizes, download_one, download_many, sync_config)
+
+    for path in to_download:
+        file_path = os.path.join(local_path, *path.split("/"))
+        crc32c = file_crc32c(f"{file_path}.part")
+        if crc32c != remote_files[path]["crc32c"]:
+            os.remove(f"{file_path}.part")
+            raise ValueError(f"Checksum mismatch downloading {path}")
+        os.replace(f"{file_path}.part", file_path)
+        stat = os.stat(file_path)
+        local_files[path] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "crc32c": crc32c,
+        }
+
+    # An empty listing is more likely a wrong path than an emptied bucket
+    to_delete = sorted(set(local_files) - set(remote_files)) if remote_files else []
+    for path in to_delete:
+        os.remove(os.path.join(local_path, *path.split("/")))
+        del local_files[path]
+    remove_empty_dirs(local_path)
+    write_manifest_file(local_manifest_path, local_files)
+
+    stats = {
+        "downloaded": len(to_download),
+        "deleted": len(to_delete),
+        "unchanged": len(remote_files) - len(to_download),
+        "bytes": sum(sizes[path] for path in to_download),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+    logger.info(f"Synced gs://{bucket_name}/{gcs_path} to {local_path}: {stats}")
+    return stats
 
 
 def create_bucket(bucket_name):
@@ -0,0 +1,262 @@
+import os
+import json
+import time
+import shutil
+import asyncio
+import hashlib
+import logging
+from raggaeton.backend.src.utils.common import config_loader, base_dir
+from raggaeton.backend.src.utils.error_handler import DataError
+from raggaeton.backend.src.utils.gcs import build_local_manifest
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+# ColBERT's metadata, whose config records where the index was built
+METADATA_NAME = "metadata.json"
+CURRENT_NAME = "current"
+STAGING_PREFIX = ".staging-"
+
+
+def get_versions_config():
+    versions_config = config_loader.get_config().get("index_versions", {})
+    return {
+        "dir": os.path.join(
+            base_dir, versions_config.get("dir", ".ragatouille/colbert/versions")
+        ),
+        "keep": versions_config.get("keep", 3),
+        "watch_interval": versions_config.get("watch_interval", 10),
+    }
+
+
+def index_root(index_name, versions_dir=None):
+    return os.path.join(versions_dir or get_versions_config()["dir"], index_name)
+
+
+def read_manifest(version_path):
+    with open(os.path.join(version_path, MANIFEST_NAME), "r") as file:
+        return json.load(file)
+
+
+def current_version(index_name, versions_dir=None):
+    """The version `current` points at, or None before the first publish."""
+    try:
+        return os.readlink(
+            os.path.join(index_root(index_name, versions_dir), CURRENT_NAME)
+        )
+    except FileNotFoundError:
+        return None
+
+
+def version_path(index_name, version, versions_dir=None):
+    return os.path.join(index_root(index_name, versions_dir), version)
+
+
+def version_index_path(index_name, version, versions_dir=None):
+    """The index files of a version. They sit in a directory named after the index,
+    as RAGatouille searches `<parent of the loaded path>/<index_name>`."""
+    return os.path.join(version_path(index_name, version, versions_dir), index_name)
+
+
+def relocate_index_metadata(copy_path, index_path, index_name):
+    """Point the ColBERT config in the copy at `copy_path` at `index_path`, where
+    the copy will live, so nothing still refers to the build directory once it is
+    rebuilt or deleted."""
+    metadata_path = os.path.join(copy_path, METADATA_NAME)
+    try:
+        with open(metadata_path, "r") as file:
+            metadata = json.load(file)
+    except FileNotFoundError:
+        return
+    index_config = metadata.get("config")
+    if not isinstance(index_config, dict):
+        return
+    index_config["root"] = os.path.dirname(os.path.abspath(index_path))
+    index_config["index_name"] = index_name
+    if index_config.get("index_path"):
+        index_config["index_path"] = os.path.abspath(index_path)
+    with open(metadata_path, "w") as file:
+        json.dump(metadata, file, indent=4)
+
+
+def list_versions(index_name, versions_dir=None):
+    root = index_root(index_name, versions_dir)
+    if not os.path.isdir(root):
+        return []
+    versions = [
+        name
+        for name in os.listdir(root)
+        if name != CURRENT_NAME
+        and not name.startswith(STAGING_PREFIX)
+        and os.path.exists(os.path.join(root, name, MANIFEST_NAME))
+    ]
+    # Oldest first; names only sort by time down to the second
+    return sorted(
+        versions,
+        key=lambda name: (read_manifest(os.path.join(root, name))["created_at"], name),
+    )
+
+
+def set_current(index_name, version, versions_dir=None):
+    """Point `current` at `version` by renaming a new symlink over the old one, so
+    readers see either version and never a missing pointer."""
+    root = index_root(index_name, versions_dir)
+    if not os.path.exists(os.path.join(root, version, MANIFEST_NAME)):
+        raise DataError(f"Index {index_name} has no published version {version}")
+    tmp_link = os.path.join(root, f"{STAGING_PREFIX}{CURRENT_NAME}-{os.getpid()}")
+    if os.path.lexists(tmp_link):
+        os.remove(tmp_link)
+    os.symlink(version, tmp_link)
+    os.replace(tmp_link, os.path.join(root, CURRENT_NAME))
+    logger.info(f"Index {index_name} now points at version {version}")
+
+
+def publish_index(build_path, index_name, versions_dir=None, keep=None):
+    """Copy a finished index build into a new immutable version and make it current.
+
+    The copy is staged under a hidden name and renamed into place once its manifest
+    is written, so a version directory is always complete. Publishing a build whose
+    files match the current version changes nothing. Returns the current version.
+    The manifest lists the build's files; the copy's metadata is relocated to it.
+    """
+    versions_config = get_versions_config()
+    versions_dir = versions_dir or versions_config["dir"]
+    keep = versions_config["keep"] if keep is None else keep
+    if not os.path.isdir(build_path):
+        raise DataError(f"Index build {build_path} does not exist")
+
+    files = {
+        path: {"size": entry["size"], "crc32c": entry["crc32c"]}
+        for path, entry in build_local_manifest(build_path).items()
+    }
+    content_hash = hashlib.sha256(
+        json.dumps(files, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+    current = current_version(index_name, versions_dir)
+    if current:
+        current_manifest = read_manifest(
+            version_path(index_name, current, versions_dir)
+        )
+        if current_manifest["content_hash"] == content_hash:
+            logger.info(f"Index {index_name} unchanged, keeping version {current}")
+            return current
+
+    version = f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}-{content_hash[:8]}"
+    root = index_root(index_name, versions_dir)
+    staging_path = os.path.join(root, f"{STAGING_PREFIX}{version}")
+    shutil.rmtree(staging_path, ignore_errors=True)
+    staged_index_path = os.path.join(staging_path, index_name)
+    shutil.copytree(build_path, staged_index_path)
+    relocate_index_metadata(
+        staged_index_path,
+        version_index_path(index_name, version, versions_dir),
+        index_name,
+    )
+    with open(os.path.join(staging_path, MANIFEST_NAME), "w") as file:
+        json.dump(
+            {
+                "index_name": index_name,
+                "version": version,
+                "created_at": time.time(),
+                "source": os.path.abspath(build_path),
+                "content_hash": content_hash,
+                "files": files,
+            },
+            file,
+            indent=2,
+        )
+    os.rename(staging_path, os.path.join(root, version))
+    set_current(index_name, version, versions_dir)
+    prune_versions(index_name, keep, versions_dir)
+    return version
+
+
+def prune_versions(index_name, keep, versions_dir=None):
+    """Remove all but the newest `keep` versions, never the current one."""
+    current = current_version(index_name, versions_dir)
+    versions = list_versions(index_name, versions_dir)
+    stale = [version for version in versions[:-keep] if version != current]
+    for version in stale:
+        shutil.rmtree(version_path(index_name, version, versions_dir))
+        logger.info(f"Removed index {index_name} version {version}")
+    return stale
+
+
+def resolve_index_path(index_name, default=None, versions_dir=None):
+    """Path of the current version of `index_name`, else `default`."""
+    version = current_version(index_name, versions_dir)
+    if version is None:
+        return default
+    return version_index_path(index_name, version, versions_dir)
+
+
+class IndexHotSwap:
+    """Keeps whatever `load(path)` builds from the current index version, reloading
+    it in a worker thread when the version changes.
+
+    Until the new version has loaded, `loaded` stays the previous one, so requests
+    are served throughout. `on_swap(version, loaded)` runs right after each switch.
+    """
+
+    def __init__(self, index_name, load, on_swap=None, versions_dir=None):
+        self.index_name = index_name
+        self.load = load
+        self.on_swap = on_swap
+        self.versions_dir = versions_dir
+        self.version = None
+        self.loaded = None
+        self.loading = None
+        self.last_error = None
+        self._lock = asyncio.Lock()
+
+    async def reload(self, version=None, default_path=None):
+        """Load `version`, or the current one, and swap it in. Pinning a version
+        also points `current` at it, so the watcher does not swap it back.
+
+        Returns True when a new version was swapped in.
+        """
+        async with self._lock:
+            if version is not None:
+                set_current(self.index_name, version, self.versions_dir)
+            version = current_version(self.index_name, self.versions_dir)
+            if self.loaded is not None and version == self.version:
+                return False
+            path = (
+                version_index_path(self.index_name, version, self.versions_dir)
+                if version
+                else default_path
+            )
+            self.loading = version
+            try:
+                loaded = await asyncio.to_thread(self.load, path)
+            except Exception as e:
+                self.last_error = str(e)
+                raise
+            finally:
+                self.loading = None
+            self.version, self.loaded, self.last_error = version, loaded, None
+            if self.on_swap:
+                self.on_swap(version, loaded)
+            logger.info(f"Index {self.index_name} swapped to version {version}")
+            return True
+
+    async def watch(self, interval):
+        """Reload whenever `current` moves, checking every `interval` seconds."""
+        while True:
+            await asyncio.sleep(interval)
+            if current_version(self.index_name, self.versions_dir) == self.version:
+                continue
+            try:
+                await self.reload()
+            except Exception as e:
+                logger.error(f"Failed to swap index {self.index_name}: {e}")
+
+    def status(self):
+        return {
+            "index_name": self.index_name,
+            "version": self.version,
+            "current": current_version(self.index_name, self.versions_dir),
+            "loading": self.loading,
+            "last_error": self.last_error,
+            "versions": list_versions(self.index_name, self.versions_dir),
+        }
@@ -0,0 +1,86 @@
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalArrayParser:
+    """Parse a streamed JSON object and emit each item of one top-level array
+    field (e.g. "full_content") as soon as that item's closing brace arrives."""
+
+    def __init__(self, array_key):
+        self.array_key = array_key
+        self.text = ""
+        self.done = False
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._last_string = None
+        self._pending_key = None
+        self._array_depth = None
+        self._item_start = None
+
+    def feed(self, chunk):
+        """Add a chunk of streamed text and return the items completed by it."""
+        self.text += chunk
+        items = []
+        text = self.text
+        for i in range(self._pos, len(text)):
+            char = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_string = text[self._string_start + 1 : i]
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = i
+            elif char == ":" and self._depth == 1:
+                self._pending_key = self._last_string
+            elif char == "," and self._depth == 1:
+                self._pending_key = None
+            elif char in "{[":
+                self._depth += 1
+                if (
+                    char == "["
+                    and self._depth == 2
+                    and self._array_depth is None
+                    and not self.done
+                    and self._pending_key == self.array_key
+                ):
+                    self._array_depth = self._depth
+                elif (
+                    char == "{"
+                    and self._array_depth is not None
+                    and self._depth == self._array_depth + 1
+                ):
+                    self._item_start = i
+            elif char in "}]":
+                if (
+                    char == "}"
+                    and self._item_start is not None
+                    and self._depth == self._array_depth + 1
+                ):
+                    items.append(self._load_item(text[self._item_start : i + 1]))
+                    self._item_start = None
+                elif char == "]" and self._depth == self._array_depth:
+                    self._array_depth = None
+                    self.done = True
+                self._depth -= 1
+        self._pos = len(text)
+        return [item for item in items if item is not None]
+
+    def _load_item(self, raw_item):
+        try:
+            return json.loads(raw_item)
+        except json.JSONDecodeError as e:
+            logger.warning(f"Skipping malformed streamed item: {e}")
+            return None
@@ -6,20 +6,162 @@ from raggaeton.backend.src.schemas.content import (
     GenerateTopicSentencesResponse,
     GenerateFullContentResponse,
     EditContentResponse,
+    ContentBlock,
+    TopicSentence,
+    Paragraph,
+    EditedContentBlock,
 )
 from raggaeton.backend.src.utils.common import logger
 from raggaeton.backend.src.utils.error_handler import error_handling_context
+import re
 import json
 
+try:
+    import orjson
+except ImportError:  # optional, falls back to the standard library parser
+    orjson = None
+
+TRAILING_COMMA_HINT = re.compile(r",\s*[}\]]")
+TRAILING_COMMA = re.compile(r'("[^"\\]*(?:\\.[^"\\]*)*")|,(\s*[}\]])')
+
+# Request types whose response is a list of blocks that can be streamed one by one,
+# mapped to (array field in the response, model of each item)
+STREAMABLE_RESPONSES = {
+    "generate_draft_": ("draft_outlines", ContentBlock),
+    "generate_topic_sentences": ("draft_outlines", TopicSentence),
+    "generate_full_content": ("full_content", Paragraph),
+    "edit_content": ("edited_content", EditedContentBlock),
+}
+
+
+def loads_json(text):
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def match_request_type(specs: dict, request_type: str, error: str):
+    # Keys ending in "_" match every request type with that prefix
+    spec = specs.get(request_type)
+    if spec is not None:
+        return spec
+    for prefix, spec in specs.items():
+        if prefix.endswith("_") and request_type.startswith(prefix):
+            return spec
+    raise ValueError(f"{error}: {request_type}")
+
+
+def get_stream_spec(request_type: str):
+    return match_request_type(
+        STREAMABLE_RESPONSES, request_type, "Unsupported streaming request type"
+    )
+
+
+def normalize_details(block: dict):
+    # LLMs sometimes return block details as a list or an object instead of text
+    if isinstance(block.get("details"), list):
+        block["details"] = " ".join(str(detail) for detail in block["details"])
+    elif isinstance(block.get("details"), dict):
+        block["details"] = json.dumps(block["details"])
+
+
+def parse_llm_item(item: dict, request_type: str) -> BaseModel:
+    _, item_model = get_stream_spec(request_type)
+    # Same normalisation parse_llm_response applies to draft outlines
+    normalize_details(item)
+    return item_model.model_validate(item)
+
+
+async def stream_ndjson(blocks):
+    """Serialise streamed content blocks as NDJSON lines, ending with a status line."""
+    index = 0
+    try:
+        async for block in blocks:
+            yield (
+                json.dumps(
+                    {"type": "block", "index": index, "data": block.model_dump()}
+                )
+                + "\n"
+            )
+            index += 1
+        yield json.dumps({"type": "done", "blocks": index}) + "\n"
+    except Exception as e:
+        logger.error(f"Error while streaming content blocks: {e}")
+        yield json.dumps({"type": "error", "blocks": index, "detail": str(e)}) + "\n"
+
+
+def normalize_draft_response(json_data: dict, request_data: dict) -> dict:
+    # Wrap a bare outline in a draft built from the request
+    if "drafts" not in json_data:
+        json_data = {
+            "drafts": [
+                {
+                    "headline": request_data.get("headline"),
+                    "hook": request_data.get("hook"),
+                    "thesis": request_data.get("thesis"),
+                    "article_type": request_data.get("article_type"),
+                    "draft_outlines": json_data.get("draft_outlines", []),
+                    "optional_params": request_data.get("optional_params", {}),
+                }
+            ]
+        }
+    for draft in json_data.get("drafts", []):
+        for block in draft.get("draft_outlines", []):
+            normalize_details(block)
+    return json_data
+
+
+# Request types mapped to (response model, normalisation applied before validation).
+# Types without a normalisation are validated straight from the raw response.
+RESPONSE_PARSERS = {
+    "generate_research_questions": (GenerateResearchQuestionsResponse, None),
+    "generate_headlines": (GenerateHeadlinesResponse, None),
+    "generate_draft_": (GenerateDraftResponse, normalize_draft_response),
+    "generate_topic_sentences": (GenerateTopicSentencesResponse, None),
+    "generate_full_content": (GenerateFullContentResponse, None),
+    "edit_content": (EditContentResponse, None),
+}
+
+
+def repair_json(text: str) -> str:
+    """Fix the JSON defects LLMs commonly produce: code fences, surrounding prose
+    and trailing commas."""
+    fence_start = text.find("```")
+    if fence_start != -1:
+        # Skip the opening fence and its language tag
+        body_start = text.find("\n", fence_start) + 1
+        fence_end = text.find("```", body_start)
+        if body_start and fence_end != -1:
+            text = text[body_start:fence_end]
+    start, end = text.find("{"), text.rfind("}")
+    if start != -1 and end > start:
+        text = text[start : end + 1]
+    if not TRAILING_COMMA_HINT.search(text):
+        return text
+    # Strings are matched first so commas inside them are left alone
+    return TRAILING_COMMA.sub(lambda m: m.group(1) or m.group(2), text)
+
+
+def load_llm_json(response_content: str):
+    try:
+        return loads_json(response_content)
+    except json.JSONDecodeError as e:
+        repaired = repair_json(response_content)
+        if repaired == response_content:
+            logger.error(f"Invalid JSON format: {e}")
+            raise
+        try:
+            json_data = loads_json(repaired)
+        except json.JSONDecodeError:
+            logger.error(f"Invalid JSON format, repair failed: {e}")
+            raise e
+        logger.warning(f"Repaired malformed JSON in LLM response: {e}")
+        return json_data
+
 
 def parse_llm_response(
     response_content: str, request_type: str, request_data: dict
 ) -> BaseModel:
-    logger.info("Entered parse_llm_response function")
-    logger.info(
-        f"Parsing response content: {response_content[:500]}..."
-    )  # Log the first 500 characters of the response
-
     if not isinstance(response_content, str):
         logger.error(
             f"Expected response_content to be a str, but got {type(response_content)}"
@@ -27,164 +169,26 @@ def parse_llm_response(
         raise TypeError(
             f"Expected response_content to be a str, but got {type(response_content)}"
         )
-
-    # Log the entire response content for debugging
-    logger.debug(f"Full response content: {response_content}")
-
-    # Validate JSON manually
-    try:
-        json_data = json.loads(response_content)
-    except json.JSONDecodeError as e:
-        logger.error(f"Invalid JSON format: {e}")
-        raise
+    logger.debug(f"Parsing {request_type} response: {response_content[:500]}...")
 
     with error_handling_context():
-        if request_type == "generate_research_questions":
+        response_model, normalize = match_request_type(
+            RESPONSE_PARSERS, request_type, "Unsupported request type"
+        )
+        if normalize is None:
             try:
-                logger.info(
-                    "Attempting to parse JSON into GenerateResearchQuestionsResponse model"
-                )
-                transformed_response = (
-                    GenerateResearchQuestionsResponse.model_validate_json(
-                        json.dumps(json_data)
-                    )
-                )
-                logger.info(
-                    "Successfully parsed response into GenerateResearchQuestionsResponse model"
-                )
-                return transformed_response
+                return response_model.model_validate_json(response_content)
             except ValidationError as e:
-                logger.error(f"Validation error: {e}")
-                raise
-            except Exception as e:
-                logger.error(f"Error parsing JSON response: {e}")
-                raise
-        elif request_type == "generate_headlines":
-            try:
-                logger.info(
-                    "Attempting to parse JSON into GenerateHeadlinesResponse model"
-                )
-                transformed_response = GenerateHeadlinesResponse.model_validate_json(
-                    json.dumps(json_data)
-                )
-                logger.info(
-                    "Successfully parsed response into GenerateHeadlinesResponse model"
-                )
-                return transformed_response
-            except ValidationError as e:
-                logger.error(f"Validation error: {e}")
-                raise
-            except Exception as e:
-                logger.error(f"Error parsing JSON response: {e}")
-                raise
-        elif request_type.startswith("generate_draft_"):
-            try:
-                logger.info(
-                    f"Attempting to parse JSON into GenerateDraftResponse model for {request_type}"
-                )
+                # Only malformed JSON is worth repairing, schema errors are final
+                if any(error["type"] != "json_invalid" for error in e.errors()):
+                    logger.error(f"Validation error: {e}")
+                    raise
 
-                # Transform the response to include the 'drafts' field if it is missing
-                if "drafts" not in json_data:
-                    json_data = {
-                        "drafts": [
-                            {
-                                "headline": request_data.get("headline"),
-                                "hook": request_data.get("hook"),
-                                "thesis": request_data.get("thesis"),
-                                "article_type": request_data.get("article_type"),
-                                "draft_outlines": json_data.get("draft_outlines", []),
-                                "optional_params": request_data.get(
-                                    "optional_params", {}
-                                ),
-                            }
-                        ]
-                    }
-
-                # Ensure 'details' is a string
-                for draft in json_data.get("drafts", []):
-                    for block in draft.get("draft_outlines", []):
-                        logger.debug(
-                            f"Original details for block {block['content_block']}: {block['details']}"
-                        )
-                        logger.debug(
-                            f"Type of details: {type(block['details'])}, Content of details: {block['details']}"
-                        )
-                        if isinstance(block["details"], list):
-                            block["details"] = " ".join(
-                                str(item) for item in block["details"]
-                            )
-                        elif isinstance(block["details"], dict):
-                            block["details"] = json.dumps(block["details"])
-                        logger.debug(
-                            f"Transformed details for block {block['content_block']}: {block['details']}"
-                        )
-
-                transformed_response = GenerateDraftResponse.model_validate_json(
-                    json.dumps(json_data)
-                )
-                logger.info(
-                    f"Successfully parsed response into GenerateDraftResponse model for {request_type}"
-                )
-                return transformed_response
-            except ValidationError as e:
-                logger.error(f"Validation error: {e}")
-                raise
-            except Exception as e:
-                logger.error(f"Error parsing JSON response: {e}")
-                raise
-        elif request_type == "generate_topic_sentences":
-            try:
-                logger.info(
-                    "Attempting to parse JSON into GenerateTopicSentencesResponse model"
-                )
-                transformed_response = (
-                    GenerateTopicSentencesResponse.model_validate_json(
-                        json.dumps(json_data)
-                    )
-                )
-                logger.info(
-                    "Successfully parsed response into GenerateTopicSentencesResponse model"
-                )
-                return transformed_response
-            except ValidationError as e:
-                logger.error(f"Validation error: {e}")
-                raise
-            except Exception as e:
-                logger.error(f"Error parsing JSON response: {e}")
-                raise
-        elif request_type == "generate_full_content":
-            try:
-                logger.info(
-                    "Attempting to parse JSON into GenerateFullContentResponse model"
-                )
-                transformed_response = GenerateFullContentResponse.model_validate_json(
-                    json.dumps(json_data)
-                )
-                logger.info(
-                    "Successfully parsed response into GenerateFullContentResponse model"
-                )
-                return transformed_response
-            except ValidationError as e:
-                logger.error(f"Validation error: {e}")
-                raise
-            except Exception as e:
-                logger.error(f"Error parsing JSON response: {e}")
-                raise
-        elif request_type == "edit_content":
-            try:
-                logger.info("Attempting to parse JSON into EditContentResponse model")
-                transformed_response = EditContentResponse.model_validate_json(
-                    json.dumps(json_data)
-                )
-                logger.info(
-                    "Successfully parsed response into EditContentResponse model"
-                )
-                return transformed_response
-            except ValidationError as e:
-                logger.error(f"Validation error: {e}")
-                raise
-            except Exception as e:
-                logger.error(f"Error parsing JSON response: {e}")
-                raise
-        # Add more parsing logic for other request types as needed
-        raise ValueError(f"Unsupported request type: {request_type}")
+        json_data = load_llm_json(response_content)
+        if normalize is not None:
+            json_data = normalize(json_data, request_data)
+        try:
+            return response_model.model_validate(json_data)
+        except ValidationError as e:
+            logger.error(f"Validation error: {e}")
+            raise
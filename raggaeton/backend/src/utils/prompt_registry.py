@@ -0,0 +1,184 @@
+import os
+import json
+import time
+import string
+import hashlib
+import logging
+import threading
+import yaml
+from raggaeton.backend.src.utils.common import load_config
+
+logger = logging.getLogger(__name__)
+
+config_dir = os.path.join(os.path.dirname(__file__), "..", "config")
+prompts_dir = os.path.join(config_dir, "prompts")
+content_blocks_path = os.path.join(
+    config_dir, "article_templates", "content_blocks.json"
+)
+textfx_examples_path = os.path.join(config_dir, "textfx_examples.json")
+
+
+def hash_content(content):
+    payload = json.dumps(content, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:12]
+
+
+def prompt_files():
+    return sorted(
+        os.path.join(prompts_dir, file_name)
+        for file_name in os.listdir(prompts_dir)
+        if file_name.endswith(".yaml")
+    )
+
+
+class PromptSnapshot:
+    """One consistent, read-only view of the prompt files, swapped whole on reload."""
+
+    def __init__(self, prompts, content_blocks, textfx_examples, generation):
+        self.prompts = prompts
+        self.content_blocks = content_blocks
+        self.textfx_examples = textfx_examples
+        self.generation = generation
+        textfx_version = hash_content(textfx_examples)
+        self.versions = {}
+        for function_name, prompt_config in prompts.items():
+            message_prompt = prompt_config.get("message_prompt", "")
+            used_blocks = {
+                block: content_blocks.get(block)
+                for structure in prompt_config.get("structures", [])
+                for block in structure
+            }
+            self.versions[function_name] = hash_content(
+                {
+                    "prompt": prompt_config,
+                    "content_blocks": used_blocks,
+                    # Only flair edits pull in TextFX examples
+                    "textfx": textfx_version
+                    if "{textfx_instructions}" in message_prompt
+                    else None,
+                }
+            )
+
+
+class PromptRegistry:
+    """Process-wide prompts, content blocks and TextFX examples, reloaded on change.
+
+    Files are re-checked at most every `reload_interval` seconds when the snapshot is
+    read; `start_watching` additionally reloads as soon as a file changes.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = super(PromptRegistry, cls).__new__(cls)
+                    instance._init()
+                    cls._instance = instance
+        return cls._instance
+
+    def _init(self):
+        registry_config = load_config().get("prompts", {})
+        self.reload_interval = registry_config.get("reload_interval", 2)
+        self.watch = registry_config.get("watch", True)
+        self._reload_lock = threading.Lock()
+        self._watch_stop = None
+        self._snapshot = None
+        self._signature = None
+        self._checked_at = 0.0
+        self.reload()
+
+    def _file_signature(self):
+        files = prompt_files() + [content_blocks_path, textfx_examples_path]
+        return tuple((path, os.stat(path).st_mtime_ns) for path in files)
+
+    def _load_snapshot(self, generation):
+        prompts = {}
+        for file_path in prompt_files():
+            with open(file_path, "r") as file:
+                prompts.update(yaml.safe_load(file) or {})
+        for function_name, prompt_config in prompts.items():
+            # Reject broken templates here instead of failing requests later
+            list(string.Formatter().parse(prompt_config.get("message_prompt", "")))
+        with open(content_blocks_path, "r") as file:
+            content_blocks = json.load(file)
+        with open(textfx_examples_path, "r") as file:
+            textfx_examples = json.load(file)
+        return PromptSnapshot(prompts, content_blocks, textfx_examples, generation)
+
+    def reload(self):
+        """Reload from disk, keeping the current snapshot if the new files are invalid."""
+        with self._reload_lock:
+            signature = self._file_signature()
+            generation = self._snapshot.generation + 1 if self._snapshot else 0
+            try:
+                snapshot = self._load_snapshot(generation)
+            except (OSError, ValueError, yaml.YAMLError) as e:
+                if self._snapshot is None:
+                    raise
+                logger.error(f"Prompt reload failed, keeping previous prompts: {e}")
+                self._signature = signature
+                return False
+            if self._snapshot is not None:
+                changed = [
+                    name
+                    for name, version in snapshot.versions.items()
+                    if self._snapshot.versions.get(name) != version
+                ]
+                logger.info(f"Reloaded prompts, changed: {changed}")
+            self._snapshot = snapshot
+            self._signature = signature
+            return True
+
+    def maybe_reload(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_interval:
+            return
+        self._checked_at = now
+        try:
+            if self._file_signature() != self._signature:
+                self.reload()
+        except OSError as e:
+            logger.error(f"Could not check prompt files for changes: {e}")
+
+    @property
+    def snapshot(self):
+        # A negative interval turns polling off
+        if self.reload_interval >= 0:
+            self.maybe_reload()
+        return self._snapshot
+
+    def version(self, function_name):
+        return self.snapshot.versions.get(function_name)
+
+    def start_watching(self):
+        """Reload on file changes from a background thread, if watchfiles is installed."""
+        try:
+            from watchfiles import watch
+        except ImportError:
+            logger.info("watchfiles not installed, prompts reload on read instead")
+            return False
+        if self._watch_stop is not None:
+            return True
+
+        self._watch_stop = threading.Event()
+        stop_event = self._watch_stop
+
+        def run():
+            for _ in watch(config_dir, stop_event=stop_event):
+                self.reload()
+
+        threading.Thread(target=run, name="prompt-registry-watch", daemon=True).start()
+        logger.info(f"Watching {config_dir} for prompt changes")
+        return True
+
+    def stop_watching(self):
+        if self._watch_stop is not None:
+            self._watch_stop.set()
+            self._watch_stop = None
+
+
+def get_prompt_registry():
+    return PromptRegistry()
@@ -0,0 +1,138 @@
+import logging
+from datetime import date, datetime, timedelta
+from llama_index.core.retrievers import BaseRetriever
+from llama_index.core.schema import NodeWithScore, TextNode
+from raggaeton.backend.src.utils.common import config_loader
+from raggaeton.backend.src.utils.facets import FacetIndex, indexed_document_ids
+
+logger = logging.getLogger(__name__)
+
+
+def get_recency_config():
+    recency_config = config_loader.get_config().get("retrieval", {}).get("recency", {})
+    return {
+        "enabled": recency_config.get("enabled", False),
+        "half_life_days": recency_config.get("half_life_days", 30),
+        "weight": recency_config.get("weight", 0.3),
+        "windows_days": recency_config.get("windows_days", [7, 30, 90]),
+        "approximate_stop": recency_config.get("approximate_stop", False),
+    }
+
+
+def recency_factor(age_days, half_life_days, weight):
+    """Multiplier for a document `age_days` old: 1 today, halving its recency
+    share every `half_life_days`, never below 1 - weight. Undated documents get
+    the floor."""
+    if age_days is None:
+        return 1 - weight
+    return (1 - weight) + weight * 0.5 ** (max(age_days, 0) / half_life_days)
+
+
+def recency_search(rag, index_name, index_path, query, k=10, now=None, config=None):
+    """Search a RAGatouille index ranking by similarity blended with recency.
+
+    Documents are searched newest window first (the last `windows_days` days, then
+    the next window, then everything older or undated), using the facets' sorted
+    day buckets. Older windows are skipped once the k-th blended score beats the
+    highest score any older document could still reach: the top similarity in the
+    whole index, from one unrestricted k=1 search, discounted by the next window's
+    recency factor. With `approximate_stop` the best similarity seen so far stands
+    in for it, which saves that search but can miss an older post that matches far
+    better than the recent ones.
+    """
+    config = config or get_recency_config()
+    facets = FacetIndex.load(index_path)
+    document_ids = indexed_document_ids(index_path) if facets else []
+    if facets is None or len(document_ids) != facets.size:
+        logger.warning(
+            f"No usable facets for index at {index_path}, not ranking by recency"
+        )
+        return [
+            NodeWithScore(node=TextNode(text=result["content"]), score=result["score"])
+            for result in rag.search(query, index_name=index_name, k=k)
+        ]
+
+    today = (now or datetime.utcnow()).date()
+    day_of = {
+        position: day
+        for day, positions in facets.postings["date"].items()
+        for position in positions
+    }
+    position_of = {
+        document_id: position for position, document_id in enumerate(document_ids)
+    }
+    half_life, weight = config["half_life_days"], config["weight"]
+
+    bound = None
+    if not config["approximate_stop"]:
+        # No document, searched or not, scores above the best match in the index
+        top = rag.search(query, index_name=index_name, k=1)
+        if not top:
+            return []
+        bound = top[0]["score"]
+
+    searched, ranked, best_similarity = set(), [], 0.0
+    windows = sorted(config["windows_days"]) + [None]
+    for scored, window in enumerate(windows, start=1):
+        if window is None:
+            positions = [p for p in range(facets.size) if p not in searched]
+        else:
+            since = (today - timedelta(days=window)).isoformat()
+            positions = [p for p in facets.select(since=since) if p not in searched]
+        if not positions:
+            continue
+        searched.update(positions)
+        results = rag.search(
+            query,
+            index_name=index_name,
+            k=k,
+            doc_ids=[document_ids[position] for position in positions],
+        )
+        for result in results:
+            day = day_of.get(position_of.get(result["document_id"]))
+            age = (today - date.fromisoformat(day)).days if day else None
+            best_similarity = max(best_similarity, result["score"])
+            ranked.append(
+                (result["score"] * recency_factor(age, half_life, weight), day, result)
+            )
+        ranked = sorted(ranked, key=lambda item: item[0], reverse=True)[:k]
+
+        # Everything not yet scored is older than `window` days
+        if window is None or len(ranked) < k:
+            continue
+        ceiling = best_similarity if bound is None else bound
+        if ranked[-1][0] >= ceiling * recency_factor(window, half_life, weight):
+            logger.debug(
+                f"Recency search stopped after {scored} of {len(windows)} windows, "
+                f"{len(searched)} of {facets.size} documents"
+            )
+            break
+
+    return [
+        NodeWithScore(
+            node=TextNode(text=result["content"], metadata={"date": day}), score=score
+        )
+        for score, day, result in ranked
+    ]
+
+
+class RecencyRetriever(BaseRetriever):
+    """Retriever for a RAGatouille index ranking newer documents higher."""
+
+    def __init__(self, rag, index_name, index_path, top_k=10, config=None):
+        super().__init__()
+        self.rag = rag
+        self.index_name = index_name
+        self.index_path = index_path
+        self.top_k = top_k
+        self.config = config
+
+    def _retrieve(self, query_bundle):
+        return recency_search(
+            self.rag,
+            self.index_name,
+            self.index_path,
+            query_bundle.query_str,
+            k=self.top_k,
+            config=self.config,
+        )
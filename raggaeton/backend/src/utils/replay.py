@@ -0,0 +1,292 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+from urllib.parse import urlsplit, parse_qsl, urlencode
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from raggaeton.backend.src.utils.common import load_config, base_dir
+
+logger = logging.getLogger(__name__)
+
+MODES = ("off", "record", "replay")
+# The stored body is already decoded, so these no longer describe it
+DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+# Never written to cassettes
+SECRET_PARAMS = {"key", "api_key", "apikey", "access_token"}
+
+_cassette = None
+_cassette_lock = threading.Lock()
+_session = None
+
+
+class CassetteMiss(LookupError):
+    """Raised in replay mode when no recorded response matches a request."""
+
+
+def canonical_url(url):
+    parts = urlsplit(str(url))
+    query = sorted(
+        (name, value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if name.lower() not in SECRET_PARAMS
+    )
+    return f"{parts.scheme}://{parts.netloc}{parts.path}?{urlencode(query)}"
+
+
+def canonical_body(body):
+    if not body:
+        return ""
+    if isinstance(body, bytes):
+        body = body.decode("utf-8", errors="replace")
+    try:
+        return json.dumps(json.loads(body), sort_keys=True)
+    except ValueError:
+        return body
+
+
+def make_request_key(method, url, body):
+    payload = json.dumps(
+        [method.upper(), canonical_url(url), canonical_body(body)], sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def split_events(body):
+    # Server-sent events are replayed one event at a time, anything else in one piece
+    if "\n\n" not in body:
+        return [body]
+    events = [event + "\n\n" for event in body.split("\n\n") if event]
+    return events or [body]
+
+
+class Cassette:
+    """Recorded HTTP interactions as JSON files under `<path>/<host>/<request hash>.json`.
+
+    Replayed responses wait `first_byte_ms` before the first byte and stream
+    server-sent events at `events_per_second` (about one token per event for the LLM
+    providers), so replays keep the timing profile of the live services.
+    """
+
+    def __init__(self, path, mode="replay", first_byte_ms=0, events_per_second=0):
+        if mode not in MODES:
+            raise ValueError(f"Unknown replay mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.first_byte_delay = first_byte_ms / 1000
+        self.event_delay = 1 / events_per_second if events_per_second else 0
+        self.stats = {"recorded": 0, "replayed": 0, "missed": 0}
+
+    def _file(self, key, url):
+        host = urlsplit(str(url)).netloc or "unknown"
+        return os.path.join(self.path, host, f"{key}.json")
+
+    def get(self, method, url, body):
+        key = make_request_key(method, url, body)
+        try:
+            with open(self._file(key, url), "r") as file:
+                interaction = json.load(file)
+        except FileNotFoundError:
+            self.stats["missed"] += 1
+            raise CassetteMiss(
+                f"No recorded response for {method} {canonical_url(url)}"
+            )
+        self.stats["replayed"] += 1
+        return interaction["response"]
+
+    def save(self, method, url, body, status_code, headers, text):
+        key = make_request_key(method, url, body)
+        file_path = self._file(key, url)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        interaction = {
+            "request": {"method": method.upper(), "url": canonical_url(url)},
+            "response": {
+                "status_code": status_code,
+                "headers": {
+                    name: value
+                    for name, value in headers.items()
+                    if name.lower() not in DROPPED_HEADERS
+                },
+                "body": text,
+            },
+            "recorded_at": time.time(),
+        }
+        # Write then rename so a concurrent replay never reads a half-written file
+        tmp_path = f"{file_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(interaction, file, indent=2)
+        os.replace(tmp_path, file_path)
+        self.stats["recorded"] += 1
+
+    def event_delays(self, body):
+        events = split_events(body)
+        for index, event in enumerate(events):
+            yield (self.first_byte_delay if index == 0 else self.event_delay), event
+
+
+class ReplayStream(httpx.SyncByteStream, httpx.AsyncByteStream):
+    def __init__(self, cassette, body):
+        self.cassette = cassette
+        self.body = body
+
+    def __iter__(self):
+        for delay, event in self.cassette.event_delays(self.body):
+            if delay:
+                time.sleep(delay)
+            yield event.encode("utf-8")
+
+    async def __aiter__(self):
+        for delay, event in self.cassette.event_delays(self.body):
+            if delay:
+                await asyncio.sleep(delay)
+            yield event.encode("utf-8")
+
+
+class ReplayTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """httpx transport that records through `transport` or replays from the cassette.
+
+    Recording reads each response in full before handing it back, so streamed
+    responses arrive in one piece while recording.
+    """
+
+    def __init__(self, cassette, transport=None):
+        self.cassette = cassette
+        self.transport = transport
+
+    def _replay(self, request):
+        recorded = self.cassette.get(request.method, request.url, request.content)
+        return httpx.Response(
+            recorded["status_code"],
+            headers=recorded["headers"],
+            stream=ReplayStream(self.cassette, recorded["body"]),
+            request=request,
+        )
+
+    def _record(self, request, response):
+        self.cassette.save(
+            request.method,
+            request.url,
+            request.content,
+            response.status_code,
+            response.headers,
+            response.text,
+        )
+        return httpx.Response(
+            response.status_code,
+            headers=[
+                (name, value)
+                for name, value in response.headers.items()
+                if name.lower() not in DROPPED_HEADERS
+            ],
+            content=response.content,
+            request=request,
+        )
+
+    def handle_request(self, request):
+        if self.cassette.mode == "replay":
+            return self._replay(request)
+        response = self.transport.handle_request(request)
+        response.read()
+        return self._record(request, response)
+
+    async def handle_async_request(self, request):
+        if self.cassette.mode == "replay":
+            return self._replay(request)
+        response = await self.transport.handle_async_request(request)
+        await response.aread()
+        return self._record(request, response)
+
+    def close(self):
+        if self.transport is not None:
+            self.transport.close()
+
+    async def aclose(self):
+        if self.transport is not None:
+            await self.transport.aclose()
+
+
+class ReplayAdapter(HTTPAdapter):
+    """requests adapter with the same record/replay behaviour as ReplayTransport."""
+
+    def __init__(self, cassette, **kwargs):
+        self.cassette = cassette
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if self.cassette.mode == "record":
+            response = super().send(request, **kwargs)
+            self.cassette.save(
+                request.method,
+                request.url,
+                request.body,
+                response.status_code,
+                response.headers,
+                response.text,
+            )
+            return response
+
+        recorded = self.cassette.get(request.method, request.url, request.body)
+        if self.cassette.first_byte_delay:
+            time.sleep(self.cassette.first_byte_delay)
+        response = requests.Response()
+        response.status_code = recorded["status_code"]
+        response.headers = CaseInsensitiveDict(recorded["headers"])
+        response.encoding = get_encoding_from_headers(response.headers) or "utf-8"
+        response._content = recorded["body"].encode(response.encoding)
+        response.url = request.url
+        response.request = request
+        response.reason = "Replayed"
+        return response
+
+
+def get_cassette():
+    """The configured cassette, or None when record/replay is off.
+
+    `REPLAY_MODE` in the environment overrides `replay.mode` in config.yaml.
+    """
+    global _cassette
+    replay_config = load_config().get("replay", {})
+    mode = os.getenv("REPLAY_MODE", replay_config.get("mode", "off"))
+    if mode == "off":
+        return None
+    with _cassette_lock:
+        if _cassette is None or _cassette.mode != mode:
+            latency = replay_config.get("latency", {})
+            _cassette = Cassette(
+                os.path.join(
+                    base_dir, replay_config.get("cassette_dir", "cache/cassettes")
+                ),
+                mode=mode,
+                first_byte_ms=latency.get("first_byte_ms", 0),
+                events_per_second=latency.get("events_per_second", 0),
+            )
+            logger.info(f"HTTP {mode} enabled with cassettes in {_cassette.path}")
+        return _cassette
+
+
+def wrap_transport(transport):
+    cassette = get_cassette()
+    return ReplayTransport(cassette, transport) if cassette else transport
+
+
+def mount_replay(session):
+    cassette = get_cassette()
+    if cassette:
+        adapter = ReplayAdapter(cassette)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+    return session
+
+
+def get_session():
+    # One pooled session for the research providers, recorded/replayed when enabled
+    global _session
+    if _session is None:
+        _session = mount_replay(requests.Session())
+    return _session
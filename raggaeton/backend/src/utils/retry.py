@@ -0,0 +1,50 @@
+import random
+import time
+from email.utils import parsedate_to_datetime
+
+# Status codes worth retrying: timeouts, rate limits, server errors and
+# Anthropic's 529 "overloaded"
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504, 529}
+
+
+def get_status_code(exc):
+    status_code = getattr(exc, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(exc, "response", None), "status_code", None)
+    return status_code
+
+
+def parse_retry_after(headers):
+    """Return the delay in seconds requested by retry-after(-ms) headers, if any."""
+    if not headers:
+        return None
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def jittered_backoff(attempt, base_delay=1.0, max_delay=60.0):
+    # "Full jitter" keeps concurrent retries from hitting the provider in lockstep
+    return random.uniform(0, min(max_delay, base_delay * (2**attempt)))
+
+
+def get_retry_delay(exc, attempt, base_delay=1.0, max_delay=60.0):
+    response = getattr(exc, "response", None)
+    retry_after = parse_retry_after(getattr(response, "headers", None))
+    if retry_after is not None:
+        return min(retry_after, max_delay)
+    return jittered_backoff(attempt, base_delay, max_delay)
@@ -2,14 +2,17 @@ from typing import List, Dict, Any
 from datetime import datetime
 from llama_index.core import Document
 from llama_index.core import SummaryIndex, VectorStoreIndex
-from raggaeton.backend.src.utils.common import base_dir
+from raggaeton.backend.src.utils.prompt_registry import get_prompt_registry
+from raggaeton.backend.src.utils.retry import (
+    RETRYABLE_STATUS_CODES,
+    get_status_code,
+    get_retry_delay,
+)
 
 import logging
 import time
 import requests
 from typing import Callable
-import json
-import os
 import random
 
 logger = logging.getLogger(__name__)
@@ -92,31 +95,32 @@ def exponential_retry(
     func: Callable, retries: int = 5, backoff_in_seconds: int = 3, *args, **kwargs
 ):
     attempt = 0
-    while attempt < retries:
+    while True:
         try:
             return func(*args, **kwargs)
         except requests.RequestException as e:
+            status_code = get_status_code(e)
+            # Client errors other than 408/409/429 will not succeed on retry
+            if status_code is not None and status_code not in RETRYABLE_STATUS_CODES:
+                raise
             logger.warning(f"Attempt {attempt + 1} failed: {e}")
             attempt += 1
-            sleep_time = backoff_in_seconds * (2**attempt)
-            logger.info(f"Retrying in {sleep_time} seconds...")
+            if attempt >= retries:
+                logger.error(f"All {retries} retries failed.")
+                raise
+            sleep_time = get_retry_delay(e, attempt, backoff_in_seconds)
+            logger.info(f"Retrying in {sleep_time:.2f} seconds...")
             time.sleep(sleep_time)
-    raise Exception(f"All {retries} retries failed.")
 
 
 def load_textfx_examples():
-    with open(
-        os.path.join(base_dir, "raggaeton/backend/src/config/textfx_examples.json"), "r"
-    ) as file:
-        return json.load(file)
-
-
-textfx_examples = load_textfx_examples()
+    # Shared, hot-reloaded copy instead of re-reading the file per module
+    return get_prompt_registry().snapshot.textfx_examples
 
 
 def get_random_examples():
     examples = {}
-    for textfx_type in textfx_examples.keys():
+    for textfx_type in load_textfx_examples().keys():
         example = get_random_example(textfx_type)
         if example:
             examples[textfx_type] = example
@@ -124,7 +128,7 @@ def get_random_examples():
 
 
 def get_random_example(textfx_type):
-    examples = textfx_examples.get(textfx_type, {}).get("examples", [])
+    examples = load_textfx_examples().get(textfx_type, {}).get("examples", [])
     if examples:
         return random.choice(examples)
     return None
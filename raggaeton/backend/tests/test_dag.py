@@ -0,0 +1,133 @@
+import os
+import asyncio
+import tempfile
+import unittest
+from raggaeton.backend.src.api.services.dag import Stage, DAGRunner, CheckpointStore
+from raggaeton.backend.src.api.services.llm_cache import (
+    ResponseCache,
+    bypass_response_cache,
+)
+
+
+class TestDAGRunner(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.calls = []
+        self.fail_on = None
+        self.suffix = ""
+
+        async def research(inputs):
+            self.calls.append("research")
+            return {"notes": f"notes on {inputs['params']['topic']}"}
+
+        def headlines(inputs):
+            self.calls.append("headlines")
+            return [f"Headline from {inputs['research']['notes']}"]
+
+        async def edit(inputs):
+            self.calls.append("edit")
+            if self.fail_on == "edit":
+                raise RuntimeError("edit failed")
+            return [headline.upper() + self.suffix for headline in inputs["headlines"]]
+
+        async def publish(inputs):
+            self.calls.append("publish")
+            return {"published": inputs["edit"]}
+
+        self.stages = [
+            Stage("research", research),
+            Stage("headlines", headlines, depends_on=["research"]),
+            Stage("edit", edit, depends_on=["headlines"]),
+            Stage("publish", publish, depends_on=["edit"]),
+        ]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def run_pipeline(self, params=None, **kwargs):
+        runner = DAGRunner(self.stages, CheckpointStore(self.tmp_dir.name))
+        return asyncio.run(runner.run(params or {"topic": "hiking"}, **kwargs))
+
+    def test_resumes_after_failure(self):
+        self.fail_on = "edit"
+        with self.assertRaises(RuntimeError):
+            self.run_pipeline()
+        self.assertEqual(self.calls, ["research", "headlines", "edit"])
+
+        self.fail_on = None
+        self.calls.clear()
+        run = self.run_pipeline()
+
+        self.assertEqual(self.calls, ["edit", "publish"])
+        self.assertEqual(run["stages"]["research"]["status"], "cached")
+        self.assertEqual(
+            run["outputs"]["publish"],
+            {"published": ["HEADLINE FROM NOTES ON HIKING"]},
+        )
+
+    def test_new_params_rerun_everything(self):
+        self.run_pipeline()
+        self.calls.clear()
+        self.run_pipeline({"topic": "climbing"})
+        self.assertEqual(self.calls, ["research", "headlines", "edit", "publish"])
+
+    def test_rerun_single_stage(self):
+        self.run_pipeline()
+        self.calls.clear()
+
+        # Unchanged output: downstream checkpoints are still valid
+        self.run_pipeline(targets=["edit"], force={"edit"})
+        self.assertEqual(self.calls, ["edit"])
+
+        # Changed output: only the stages below it run again
+        self.calls.clear()
+        self.suffix = "!"
+        run = self.run_pipeline(force={"edit"})
+        self.assertEqual(self.calls, ["edit", "publish"])
+        self.assertEqual(
+            run["outputs"]["publish"]["published"], ["HEADLINE FROM NOTES ON HIKING!"]
+        )
+
+    def test_forced_stage_skips_response_cache(self):
+        cache = ResponseCache(os.path.join(self.tmp_dir.name, "llm.sqlite"))
+        replies = iter(["First draft", "Second draft"])
+
+        async def draft(inputs):
+            self.calls.append("draft")
+            cached = cache.get("draft")
+            if cached:
+                return cached["content"]
+            content = next(replies)
+            cache.set("draft", "generate_draft", "model", content, 2)
+            return content
+
+        async def publish(inputs):
+            self.calls.append("publish")
+            return {"published": inputs["draft"]}
+
+        runner = DAGRunner(
+            [Stage("draft", draft), Stage("publish", publish, depends_on=["draft"])],
+            CheckpointStore(self.tmp_dir.name),
+            force_context=bypass_response_cache,
+        )
+        asyncio.run(runner.run({"topic": "hiking"}))
+        self.calls.clear()
+
+        run = asyncio.run(runner.run({"topic": "hiking"}, force={"draft"}))
+        self.assertEqual(self.calls, ["draft", "publish"])
+        self.assertEqual(run["outputs"]["publish"], {"published": "Second draft"})
+        self.assertEqual(cache.stats["bypassed"], 1)
+        # The fresh response replaced the cached one
+        self.assertEqual(cache.get("draft")["content"], "Second draft")
+
+    def test_cycle_is_rejected(self):
+        stages = [
+            Stage("a", lambda inputs: 1, depends_on=["b"]),
+            Stage("b", lambda inputs: 2, depends_on=["a"]),
+        ]
+        with self.assertRaises(ValueError):
+            DAGRunner(stages, CheckpointStore(self.tmp_dir.name))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import json
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+from llama_index.core import Document
+from raggaeton.backend.src.utils import facets
+from raggaeton.backend.src.utils.error_handler import DataError
+
+DOCUMENTS = [
+    Document(text="a", metadata={"date_gmt": "2024-06-01T08:00:00", "author_id": 1}),
+    Document(text="b", metadata={"date_gmt": "2024-06-02T09:30:00", "author_id": 2}),
+    Document(
+        text="c",
+        metadata={"created_at": "2024-06-03T10:00:00", "source": "wikipedia"},
+    ),
+]
+
+
+class TestFacetIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.index_path = self.tmp_dir.name
+        facets.FacetIndex.from_documents(DOCUMENTS).save(self.index_path)
+        # Two passages for the first document, as RAGatouille splits long ones
+        pid_docid_map = {"0": "doc-a", "1": "doc-a", "2": "doc-b", "3": "doc-c"}
+        with open(os.path.join(self.index_path, "pid_docid_map.json"), "w") as file:
+            json.dump(pid_docid_map, file)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_select(self):
+        index = facets.FacetIndex.load(self.index_path)
+
+        self.assertIsNone(index.select())
+        self.assertEqual(index.select(since="2024-06-02"), [1, 2])
+        self.assertEqual(index.select(until="2024-06-01T23:59:59"), [0])
+        self.assertEqual(index.select(author=[1, 2], until="2024-06-01"), [0])
+        self.assertEqual(index.select(source="wikipedia"), [2])
+        self.assertEqual(index.select(source="you_snippets"), [])
+        with self.assertRaises(DataError):
+            index.select(editor="Jane Doe")
+
+    def test_filters_resolve_to_indexed_document_ids(self):
+        self.assertEqual(
+            facets.facet_document_ids(self.index_path, since="2024-06-02"),
+            ["doc-b", "doc-c"],
+        )
+        self.assertIsNone(facets.facet_document_ids(self.index_path, author=None))
+
+    def test_stale_facets_do_not_filter(self):
+        facets.FacetIndex.from_documents(DOCUMENTS[:2]).save(self.index_path)
+        self.assertIsNone(facets.facet_document_ids(self.index_path, author=1))
+
+    def test_filtered_search_passes_doc_ids(self):
+        rag = MagicMock()
+        rag.search.return_value = [{"content": "b", "score": 12.5}]
+
+        nodes = facets.filtered_search(
+            rag, "my_index", self.index_path, "news", k=5, author=2
+        )
+
+        rag.search.assert_called_once_with(
+            "news", index_name="my_index", k=5, doc_ids=["doc-b"]
+        )
+        self.assertEqual([(n.node.text, n.score) for n in nodes], [("b", 12.5)])
+
+        rag.reset_mock()
+        self.assertEqual(
+            facets.filtered_search(rag, "my_index", self.index_path, "news", author=3),
+            [],
+        )
+        rag.search.assert_not_called()
@@ -0,0 +1,152 @@
+import os
+import uuid
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+from raggaeton.backend.src.utils import gcs
+
+
+def write_file(root, path, content):
+    file_path = os.path.join(root, path)
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, "wb") as file:
+        file.write(content)
+
+
+class TestManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = self.tmp_dir.name
+        write_file(self.root, "index/metadata.json", b"{}")
+        write_file(self.root, "index/0.codes.pt", b"codes" * 100)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_unchanged_files_are_not_rehashed(self):
+        first = gcs.build_local_manifest(self.root)
+        self.assertEqual(sorted(first), ["index/0.codes.pt", "index/metadata.json"])
+
+        with patch.object(gcs, "file_crc32c") as file_crc32c:
+            second = gcs.build_local_manifest(self.root, first)
+        file_crc32c.assert_not_called()
+        self.assertEqual(first, second)
+
+    def test_changed_files(self):
+        local = gcs.build_local_manifest(self.root)
+        remote = {path: dict(entry) for path, entry in local.items()}
+        remote["index/0.codes.pt"]["crc32c"] = "stale"
+        remote["index/old.pt"] = {"size": 1, "crc32c": "gone"}
+
+        self.assertEqual(gcs.changed_files(local, remote), ["index/0.codes.pt"])
+        self.assertEqual(
+            gcs.changed_files(remote, local), ["index/0.codes.pt", "index/old.pt"]
+        )
+
+    @patch.object(gcs.transfer_manager, "upload_many")
+    @patch.object(gcs, "get_bucket")
+    def test_save_data_uploads_only_changed_files(self, get_bucket, upload_many):
+        local = gcs.build_local_manifest(self.root)
+        bucket = MagicMock()
+        bucket.list_blobs.return_value = [
+            SimpleNamespace(
+                name="indexes/index/metadata.json",
+                size=2,
+                metadata={"crc32c": local["index/metadata.json"]["crc32c"]},
+                crc32c=None,
+            )
+        ]
+        get_bucket.return_value = bucket
+        upload_many.return_value = [None]
+
+        stats = gcs.save_data(self.root, "bucket", "indexes")
+
+        self.assertEqual((stats["uploaded"], stats["unchanged"]), (1, 1))
+        (file_blob_pairs,), _ = upload_many.call_args
+        self.assertEqual(
+            [path for path, _ in file_blob_pairs],
+            [os.path.join(self.root, "index/0.codes.pt")],
+        )
+        # The manifest is published after the files, and lists all of them
+        bucket.blob.assert_called_with("indexes/manifest.json")
+        self.assertTrue(
+            os.path.exists(os.path.join(self.root, gcs.LOCAL_MANIFEST_NAME))
+        )
+
+    @patch.object(gcs, "get_bucket")
+    def test_read_data_deletes_files_gone_from_bucket(self, get_bucket):
+        write_file(self.root, "old/0.codes.pt", b"old")
+        local = gcs.build_local_manifest(self.root)
+        gcs.write_manifest_file(os.path.join(self.root, gcs.LOCAL_MANIFEST_NAME), local)
+        remote = {
+            path: local[path] for path in ("index/metadata.json", "index/0.codes.pt")
+        }
+
+        with patch.object(gcs, "get_remote_manifest", return_value=remote):
+            stats = gcs.read_data("bucket", "indexes", self.root)
+
+        self.assertEqual((stats["downloaded"], stats["deleted"]), (0, 1))
+        self.assertFalse(os.path.exists(os.path.join(self.root, "old")))
+        self.assertTrue(os.path.exists(os.path.join(self.root, "index/0.codes.pt")))
+        manifest_path = os.path.join(self.root, gcs.LOCAL_MANIFEST_NAME)
+        self.assertEqual(sorted(gcs.load_manifest_file(manifest_path)), sorted(remote))
+
+
+@unittest.skipUnless(
+    os.getenv("STORAGE_EMULATOR_HOST"),
+    "Needs a local fake GCS server, e.g. "
+    "docker run -p 4443:4443 fsouza/fake-gcs-server -scheme http "
+    "and STORAGE_EMULATOR_HOST=http://localhost:4443",
+)
+class TestFakeGCSSync(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp_dir.name, "source")
+        self.target = os.path.join(self.tmp_dir.name, "target")
+        self.bucket_name = f"raggaeton-test-{uuid.uuid4().hex[:8]}"
+        gcs.get_gcs_client().create_bucket(self.bucket_name)
+        write_file(self.source, "index/metadata.json", b'{"num_chunks": 2}')
+        write_file(self.source, "index/0.codes.pt", os.urandom(2**20))
+        write_file(self.source, "index/1.codes.pt", os.urandom(2**20))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_round_trip_transfers_only_changes(self):
+        self.assertEqual(gcs.save_data(self.source, self.bucket_name)["uploaded"], 3)
+        self.assertEqual(
+            gcs.read_data(self.bucket_name, local_path=self.target)["downloaded"], 3
+        )
+
+        write_file(self.source, "index/1.codes.pt", os.urandom(2**20))
+        self.assertEqual(gcs.save_data(self.source, self.bucket_name)["uploaded"], 1)
+        stats = gcs.read_data(self.bucket_name, local_path=self.target)
+        self.assertEqual((stats["downloaded"], stats["unchanged"]), (1, 2))
+        with open(os.path.join(self.source, "index/1.codes.pt"), "rb") as source:
+            with open(os.path.join(self.target, "index/1.codes.pt"), "rb") as target:
+                self.assertEqual(source.read(), target.read())
+
+    def test_interrupted_download_resumes(self):
+        gcs.save_data(self.source, self.bucket_name)
+        # A half-written download from an earlier run is replaced, finished files kept
+        gcs.read_data(self.bucket_name, local_path=self.target)
+        os.remove(os.path.join(self.target, "index/0.codes.pt"))
+        write_file(self.target, "index/0.codes.pt.part", b"partial")
+
+        stats = gcs.read_data(self.bucket_name, local_path=self.target)
+        self.assertEqual((stats["downloaded"], stats["unchanged"]), (1, 2))
+        self.assertFalse(
+            os.path.exists(os.path.join(self.target, "index/0.codes.pt.part"))
+        )
+
+    @patch.object(gcs, "get_sync_config")
+    def test_large_files_move_in_slices(self, get_sync_config):
+        get_sync_config.return_value = {
+            "max_workers": 4,
+            "slice_threshold": 2**19,
+            "slice_size": 2**18,
+        }
+        gcs.save_data(self.source, self.bucket_name)
+        stats = gcs.read_data(self.bucket_name, local_path=self.target)
+        self.assertEqual(stats["downloaded"], 3)
@@ -0,0 +1,104 @@
+import json
+import asyncio
+import unittest
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from raggaeton.backend.src.api.endpoints.generate_draft import router
+from raggaeton.backend.src.schemas.content import GenerateDraftResponse
+
+app = FastAPI()
+app.include_router(router, prefix="/api")
+
+
+def draft_item(headline, article_type="benefits"):
+    return {
+        "topics": ["Hiking"],
+        "headline": headline,
+        "hook": "Why walk uphill?",
+        "thesis": "Hiking clears the head.",
+        "article_type": article_type,
+    }
+
+
+class TestGenerateDraftsBatch(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+        self.calls = []
+        self.in_flight = 0
+        self.peak = 0
+
+    async def fake_acall_llm(self, function_name, request, model_name=None, **kwargs):
+        self.calls.append(request.headline)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if request.headline == "broken":
+            raise ValueError("LLM returned invalid JSON")
+        response = GenerateDraftResponse(
+            drafts=[
+                {
+                    "headline": request.headline,
+                    "hook": request.hook,
+                    "thesis": request.thesis,
+                    "article_type": request.article_type,
+                    "draft_outlines": [{"content_block": "Intro", "details": "Why"}],
+                }
+            ]
+        )
+        return response, 42
+
+    def post_batch(self, payload):
+        with patch(
+            "raggaeton.backend.src.api.endpoints.generate_draft.LLMHandler.acall_llm",
+            new=lambda handler, *args, **kwargs: self.fake_acall_llm(*args, **kwargs),
+        ):
+            response = self.client.post("/api/generate-drafts:batch", json=payload)
+        self.assertEqual(response.status_code, 200)
+        return [json.loads(line) for line in response.text.splitlines()]
+
+    def test_each_item_reported_with_errors(self):
+        lines = self.post_batch(
+            {
+                "requests": [
+                    draft_item("first"),
+                    draft_item("broken"),
+                    draft_item("third", "how-to"),
+                ]
+            }
+        )
+
+        self.assertEqual(lines[-1], {"type": "done", "completed": 2, "failed": 1})
+        by_index = {line["index"]: line for line in lines[:-1]}
+        self.assertEqual(by_index[0]["data"]["drafts"][0]["headline"], "first")
+        self.assertEqual(by_index[0]["token_count"], 42)
+        self.assertEqual(by_index[1]["type"], "error")
+        self.assertIn("invalid JSON", by_index[1]["detail"])
+        self.assertEqual(by_index[2]["data"]["drafts"][0]["article_type"], "how-to")
+
+    def test_concurrency_limit_and_duplicates(self):
+        items = [draft_item(f"headline {i}") for i in range(6)] + [
+            draft_item("headline 0")
+        ]
+        lines = self.post_batch({"requests": items, "max_concurrency": 2})
+
+        self.assertLessEqual(self.peak, 2)
+        self.assertEqual(len(self.calls), 6)
+        self.assertEqual(lines[-1]["completed"], 7)
+        self.assertEqual(sorted(line["index"] for line in lines[:-1]), list(range(7)))
+
+    def test_invalid_concurrency_rejected(self):
+        for max_concurrency in (0, -1):
+            response = self.client.post(
+                "/api/generate-drafts:batch",
+                json={
+                    "requests": [draft_item("first")],
+                    "max_concurrency": max_concurrency,
+                },
+            )
+            self.assertEqual(response.status_code, 422)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import os
+import json
+import shutil
+import asyncio
+import tempfile
+import threading
+import unittest
+from raggaeton.backend.src.utils import index_versions
+from raggaeton.backend.src.utils.error_handler import DataError
+
+
+def write_build(path, codes):
+    os.makedirs(path, exist_ok=True)
+    # ColBERT records where the index was built
+    metadata = {
+        "config": {
+            "root": os.path.dirname(path),
+            "index_name": "my_index",
+            "index_path": path,
+        },
+        "num_chunks": 1,
+    }
+    with open(os.path.join(path, "metadata.json"), "w") as file:
+        json.dump(metadata, file)
+    with open(os.path.join(path, "0.codes.pt"), "wb") as file:
+        file.write(codes)
+
+
+class TestIndexVersions(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.versions_dir = os.path.join(self.tmp_dir.name, "versions")
+        self.build_path = os.path.join(self.tmp_dir.name, "build")
+        write_build(self.build_path, b"first")
+
+    def publish(self, keep=3):
+        return index_versions.publish_index(
+            self.build_path, "my_index", self.versions_dir, keep=keep
+        )
+
+    def test_publish_and_resolve(self):
+        version = self.publish()
+        path = index_versions.resolve_index_path("my_index", None, self.versions_dir)
+
+        self.assertEqual(
+            path, os.path.join(self.versions_dir, "my_index", version, "my_index")
+        )
+        manifest = index_versions.read_manifest(os.path.dirname(path))
+        self.assertEqual(manifest["version"], version)
+        self.assertEqual(sorted(manifest["files"]), ["0.codes.pt", "metadata.json"])
+        # The build directory is copied, so rebuilding does not touch the version
+        write_build(self.build_path, b"second")
+        with open(os.path.join(path, "0.codes.pt"), "rb") as file:
+            self.assertEqual(file.read(), b"first")
+
+    def test_version_loads_without_build_dir(self):
+        self.publish()
+        shutil.rmtree(self.build_path)
+        path = index_versions.resolve_index_path("my_index", None, self.versions_dir)
+
+        with open(os.path.join(path, "metadata.json"), "r") as file:
+            index_config = json.load(file)["config"]
+        # RAGatouille searches the index named in its config next to the loaded path
+        search_path = os.path.join(os.path.dirname(path), index_config["index_name"])
+        self.assertEqual(search_path, path)
+        self.assertEqual(index_config["root"], os.path.dirname(path))
+        self.assertEqual(index_config["index_path"], path)
+        with open(os.path.join(search_path, "0.codes.pt"), "rb") as file:
+            self.assertEqual(file.read(), b"first")
+
+    def test_unchanged_build_keeps_version(self):
+        version = self.publish()
+        self.assertEqual(self.publish(), version)
+        self.assertEqual(
+            index_versions.list_versions("my_index", self.versions_dir), [version]
+        )
+
+    def test_publish_prunes_but_keeps_current(self):
+        published = []
+        for codes in (b"one", b"two", b"three"):
+            write_build(self.build_path, codes)
+            published.append(self.publish(keep=2))
+
+        versions = index_versions.list_versions("my_index", self.versions_dir)
+        self.assertEqual(versions, published[1:])
+
+        index_versions.set_current("my_index", published[1], self.versions_dir)
+        write_build(self.build_path, b"four")
+        # Publishing moves current off the pinned version, which can then be pruned
+        newest = self.publish(keep=1)
+        self.assertEqual(
+            index_versions.list_versions("my_index", self.versions_dir), [newest]
+        )
+
+    def test_set_current_rejects_unknown_version(self):
+        self.publish()
+        with self.assertRaises(DataError):
+            index_versions.set_current("my_index", "missing", self.versions_dir)
+
+    def test_hot_swap_serves_previous_version_while_loading(self):
+        first = self.publish()
+        release = threading.Event()
+        swaps = []
+
+        def load(path):
+            version = os.path.basename(os.path.dirname(path))
+            if version != first:
+                release.wait(5)
+            return version
+
+        swap = index_versions.IndexHotSwap(
+            "my_index",
+            load,
+            on_swap=lambda version, loaded: swaps.append(version),
+            versions_dir=self.versions_dir,
+        )
+
+        async def scenario():
+            self.assertTrue(await swap.reload())
+            write_build(self.build_path, b"second")
+            second = self.publish()
+            reload = asyncio.create_task(swap.reload())
+            await asyncio.sleep(0.05)
+            self.assertEqual((swap.loaded, swap.loading), (first, second))
+            release.set()
+            self.assertTrue(await reload)
+            self.assertFalse(await swap.reload())
+            return second
+
+        second = asyncio.run(scenario())
+        self.assertEqual(swap.loaded, second)
+        self.assertEqual(swaps, [first, second])
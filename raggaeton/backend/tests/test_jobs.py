@@ -0,0 +1,84 @@
+import os
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import patch
+from raggaeton.backend.src.api.services import jobs
+from raggaeton.backend.src.utils.error_handler import ConfigurationError, DataError
+
+TEST_JOB_TYPES = {
+    "count": "raggaeton.backend.tests.test_jobs:count_job",
+    "fail": "raggaeton.backend.tests.test_jobs:failing_job",
+}
+
+
+def count_job(items=3):
+    for done in range(1, items + 1):
+        jobs.report_progress(done, items)
+    return {"counted": items, "pid": os.getpid()}
+
+
+def failing_job():
+    raise ValueError("no rows")
+
+
+@patch.dict(jobs.JOB_TYPES, TEST_JOB_TYPES, clear=True)
+class TestJobQueue(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = jobs.JobStore(os.path.join(self.tmp_dir.name, "jobs.sqlite"))
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp_dir.cleanup()
+
+    def run_jobs(self, submissions, executor="thread", max_concurrency=2):
+        async def scenario():
+            queue = jobs.JobQueue(
+                self.store, max_concurrency=max_concurrency, executor=executor
+            )
+            queue.start()
+            submitted = [queue.submit(*submission) for submission in submissions]
+            await asyncio.wait_for(queue._queue.join(), 60)
+            await queue.stop()
+            return [self.store.get(job["id"]) for job in submitted]
+
+        return asyncio.run(scenario())
+
+    def test_jobs_report_progress_and_results(self):
+        succeeded, failed = self.run_jobs([("count", {"items": 5}), ("fail", {})])
+
+        self.assertEqual(succeeded["status"], "succeeded")
+        self.assertEqual(succeeded["result"]["counted"], 5)
+        self.assertEqual(
+            (succeeded["progress_done"], succeeded["progress_total"]), (5, 5)
+        )
+        self.assertIsNotNone(succeeded["items_per_second"])
+        self.assertEqual((failed["status"], failed["error"]), ("failed", "no rows"))
+
+    def test_jobs_run_in_worker_processes(self):
+        (job,) = self.run_jobs([("count", {})], executor="process", max_concurrency=1)
+
+        self.assertEqual(job["status"], "succeeded")
+        self.assertNotEqual(job["result"]["pid"], os.getpid())
+        self.assertEqual(job["progress_done"], 3)
+
+    def test_unknown_job_type(self):
+        queue = jobs.JobQueue(self.store, executor="thread")
+        with self.assertRaises(ConfigurationError):
+            queue.submit("rebuild-everything")
+
+    def test_cancel_only_queued_jobs(self):
+        queue = jobs.JobQueue(self.store, executor="thread")
+        job = queue.submit("count")
+        self.assertEqual(queue.cancel(job["id"])["status"], "cancelled")
+        with self.assertRaises(DataError):
+            queue.cancel(job["id"])
+
+    def test_recover_after_restart(self):
+        running = self.store.create("count", {})
+        self.store.set_status(running, "running", started_at=1.0)
+        queued = self.store.create("count", {})
+
+        self.assertEqual(self.store.recover(), [queued])
+        self.assertEqual(self.store.get(running)["status"], "failed")
@@ -0,0 +1,55 @@
+import json
+import unittest
+from raggaeton.backend.src.utils.json_stream import IncrementalArrayParser
+
+FULL_CONTENT_RESPONSE = json.dumps(
+    {
+        "full_content": [
+            {
+                "content_block": "Intro",
+                "details": 'Sets up the {trip} and "why" it matters',
+                "topic_sentences": ["Fu Gai is steep."],
+                "paragraphs": ["The path [winds] up the ridge."],
+            },
+            {
+                "content_block": "Summit",
+                "details": "Views",
+                "topic_sentences": ["The top rewards you."],
+                "paragraphs": ["Clouds roll below."],
+            },
+        ],
+        "notes": [{"content_block": "ignored"}],
+    }
+)
+
+
+class TestIncrementalArrayParser(unittest.TestCase):
+    def test_items_emitted_as_they_complete(self):
+        parser = IncrementalArrayParser("full_content")
+        first_item_end = FULL_CONTENT_RESPONSE.index("}, {") + 1
+
+        self.assertEqual(parser.feed(FULL_CONTENT_RESPONSE[: first_item_end - 1]), [])
+        items = parser.feed(FULL_CONTENT_RESPONSE[first_item_end - 1 : first_item_end])
+
+        self.assertEqual(len(items), 1)
+        self.assertEqual(items[0]["content_block"], "Intro")
+        self.assertEqual(items[0]["details"], 'Sets up the {trip} and "why" it matters')
+
+    def test_char_by_char_matches_full_parse(self):
+        parser = IncrementalArrayParser("full_content")
+        items = []
+        for char in FULL_CONTENT_RESPONSE:
+            items.extend(parser.feed(char))
+
+        self.assertEqual(items, json.loads(FULL_CONTENT_RESPONSE)["full_content"])
+        self.assertTrue(parser.done)
+        self.assertEqual(parser.text, FULL_CONTENT_RESPONSE)
+
+    def test_other_arrays_are_ignored(self):
+        parser = IncrementalArrayParser("edited_content")
+        self.assertEqual(parser.feed(FULL_CONTENT_RESPONSE), [])
+        self.assertFalse(parser.done)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from raggaeton.backend.src.api.services.llm_cache import ResponseCache, make_cache_key
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(
+            path=os.path.join(self.tmp_dir.name, "cache", "llm_responses.sqlite"),
+            default_ttl=60,
+            ttls={"generate_headlines": 10, "generate_draft": 20, "edit_content": 0},
+            bypass_edit_types=["flair"],
+        )
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp_dir.cleanup()
+
+    def test_cache_key_changes_with_inputs(self):
+        key = make_cache_key("system", "message", "gpt-4o", {"max_tokens": 4096})
+        self.assertEqual(
+            key, make_cache_key("system", "message", "gpt-4o", {"max_tokens": 4096})
+        )
+        self.assertNotEqual(key, make_cache_key("system", "message 2", "gpt-4o"))
+        self.assertNotEqual(
+            key, make_cache_key("system", "message", "claude-3-haiku-20240307")
+        )
+
+    def test_hit_miss_and_tokens_saved(self):
+        key = make_cache_key("system", "message", "gpt-4o")
+        self.assertIsNone(self.cache.get(key))
+
+        self.cache.set(key, "generate_headlines", "gpt-4o", '{"headlines": []}', 12)
+        cached = self.cache.get(key)
+
+        self.assertEqual(cached["content"], '{"headlines": []}')
+        stats = self.cache.get_stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["tokens_saved"], 12)
+        self.assertEqual(stats["hit_rate"], 0.5)
+
+    def test_per_function_ttl(self):
+        self.assertEqual(self.cache.ttl_for("generate_headlines"), 10)
+        self.assertEqual(self.cache.ttl_for("generate_draft_benefits"), 20)
+        self.assertEqual(self.cache.ttl_for("generate_full_content"), 60)
+
+        key = make_cache_key("system", "message", "gpt-4o")
+        with patch("raggaeton.backend.src.api.services.llm_cache.time.time") as now:
+            now.return_value = 1000.0
+            self.cache.set(key, "generate_headlines", "gpt-4o", "{}", 1)
+            now.return_value = 1009.0
+            self.assertIsNotNone(self.cache.get(key))
+            now.return_value = 1011.0
+            self.assertIsNone(self.cache.get(key))
+
+    def test_bypass(self):
+        self.assertTrue(
+            self.cache.should_bypass("edit_content", {"edit_type": "flair"})
+        )
+        # A zero TTL disables caching for that function
+        self.assertTrue(
+            self.cache.should_bypass("edit_content", {"edit_type": "structure"})
+        )
+        self.assertFalse(self.cache.should_bypass("generate_headlines", {}))
+        self.assertEqual(self.cache.get_stats()["bypassed"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
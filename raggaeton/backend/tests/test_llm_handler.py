@@ -0,0 +1,253 @@
+import json
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+import httpx
+import anthropic
+from raggaeton.backend.src.api.services.llm_handler import (
+    LLMHandler,
+    build_usage,
+    cached_usage,
+    compute_cost,
+    record_anthropic_usage,
+)
+from raggaeton.backend.src.api.services.prompts import get_prompt_parts
+from raggaeton.backend.src.schemas.content import EditContentRequest
+
+
+class FakeTokenizer:
+    def encode(self, text):
+        return text.split()
+
+
+class TestTokenUsage(unittest.TestCase):
+    def test_provider_usage_skips_tokenizer(self):
+        with patch(
+            "raggaeton.backend.src.api.services.llm_handler.get_tokenizer"
+        ) as get_tokenizer:
+            usage = build_usage(
+                "gpt-4o",
+                {"prompt_tokens": 1000, "completion_tokens": 200},
+                "system",
+                "message",
+                "response",
+            )
+        get_tokenizer.assert_not_called()
+        self.assertEqual(usage["source"], "provider")
+        self.assertEqual(usage["total_tokens"], 1200)
+        self.assertAlmostEqual(usage["total_cost"], 0.008)
+
+    @patch(
+        "raggaeton.backend.src.api.services.llm_handler.get_tokenizer",
+        return_value=FakeTokenizer(),
+    )
+    def test_tokenizer_fallback_counts_prompt_and_completion(self, _):
+        usage = build_usage(
+            "claude-3-haiku-20240307",
+            None,
+            "You are an editor",
+            "Polish this draft",
+            '{"edited_content": []}',
+        )
+        self.assertEqual(usage["source"], "tokenizer")
+        self.assertEqual(usage["prompt_tokens"], 7)
+        self.assertEqual(usage["completion_tokens"], 2)
+
+    def test_unknown_model_has_no_cost(self):
+        self.assertEqual(compute_cost("unknown-model", 10, 10), (None, None))
+
+    def test_cache_hit_is_free(self):
+        usage = cached_usage({"content": "{}", "token_count": 42})
+        self.assertEqual(usage["completion_tokens"], 42)
+        self.assertEqual(usage["total_cost"], 0.0)
+
+
+def anthropic_stream_body(text):
+    events = [
+        (
+            "message_start",
+            {
+                "type": "message_start",
+                "message": {
+                    "id": "msg_1",
+                    "type": "message",
+                    "role": "assistant",
+                    "content": [],
+                    "model": "claude-3-haiku-20240307",
+                    "stop_reason": None,
+                    "stop_sequence": None,
+                    "usage": {
+                        "input_tokens": 20,
+                        "output_tokens": 1,
+                        "cache_read_input_tokens": 1500,
+                        "cache_creation_input_tokens": 0,
+                    },
+                },
+            },
+        ),
+        (
+            "content_block_start",
+            {
+                "type": "content_block_start",
+                "index": 0,
+                "content_block": {"type": "text", "text": ""},
+            },
+        ),
+        (
+            "content_block_delta",
+            {
+                "type": "content_block_delta",
+                "index": 0,
+                "delta": {"type": "text_delta", "text": text},
+            },
+        ),
+        ("content_block_stop", {"type": "content_block_stop", "index": 0}),
+        (
+            "message_delta",
+            {
+                "type": "message_delta",
+                "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                "usage": {"output_tokens": 5},
+            },
+        ),
+        ("message_stop", {"type": "message_stop"}),
+    ]
+    return "".join(
+        f"event: {name}\ndata: {json.dumps(data)}\n\n" for name, data in events
+    )
+
+
+class TestPromptCaching(unittest.TestCase):
+    def edit_request(self, edit_type):
+        return EditContentRequest(
+            topics=["Hiking"],
+            context={"context": "Fu Gai mountain has steep stone steps."},
+            headline="Climbing Fu Gai",
+            hook="Why walk uphill?",
+            thesis="The climb is the point.",
+            article_type="travel",
+            edit_type=edit_type,
+        )
+
+    def test_cached_tokens_priced_at_cache_rate(self):
+        usage = build_usage(
+            "gpt-4o",
+            {
+                "prompt_tokens": 1000,
+                "completion_tokens": 200,
+                "cached_prompt_tokens": 800,
+            },
+        )
+        self.assertEqual(usage["cached_prompt_tokens"], 800)
+        self.assertAlmostEqual(usage["input_cost"], 0.003)
+        self.assertAlmostEqual(usage["total_cost"], 0.006)
+
+    def test_anthropic_usage_counts_cache_reads_and_writes(self):
+        reported = {}
+        record_anthropic_usage(
+            SimpleNamespace(
+                usage=SimpleNamespace(
+                    input_tokens=100,
+                    output_tokens=50,
+                    cache_read_input_tokens=900,
+                    cache_creation_input_tokens=200,
+                )
+            ),
+            reported,
+        )
+        self.assertEqual(reported["prompt_tokens"], 1200)
+        self.assertEqual(reported["cached_prompt_tokens"], 900)
+        self.assertEqual(reported["cache_write_tokens"], 200)
+
+    @patch(
+        "raggaeton.backend.src.api.services.prompts.stable_textfx", return_value=True
+    )
+    def test_flair_static_prompt_is_stable(self, _):
+        request = self.edit_request("flair")
+        system_prompt, static_prompt, message_prompt = get_prompt_parts(
+            "edit_content", request, edit_type="flair"
+        )
+        self.assertIn("TextFX", static_prompt)
+        self.assertNotIn(static_prompt, message_prompt)
+        self.assertEqual(
+            get_prompt_parts("edit_content", request, edit_type="flair"),
+            (system_prompt, static_prompt, message_prompt),
+        )
+        _, structure_static, _ = get_prompt_parts(
+            "edit_content", self.edit_request("structure"), edit_type="structure"
+        )
+        self.assertNotIn("TextFX", structure_static)
+
+    @patch(
+        "raggaeton.backend.src.api.services.prompts.stable_textfx", return_value=False
+    )
+    def test_sampled_textfx_stays_out_of_prefix(self, _):
+        request = self.edit_request("flair")
+        _, static_prompt, message_prompt = get_prompt_parts(
+            "edit_content", request, edit_type="flair"
+        )
+        _, structure_static, _ = get_prompt_parts(
+            "edit_content", self.edit_request("structure"), edit_type="structure"
+        )
+        self.assertEqual(static_prompt, structure_static)
+        self.assertIn("TextFX examples", message_prompt)
+
+    def test_anthropic_request_marks_static_prefix(self):
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(
+                200,
+                headers={"content-type": "text/event-stream"},
+                text=anthropic_stream_body('{"edited_content": []}'),
+            )
+
+        client = anthropic.AsyncAnthropic(
+            api_key="test",
+            max_retries=0,
+            http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        )
+        llm_handler = LLMHandler(
+            provider="anthropic", model_name="claude-3-haiku-20240307"
+        )
+        reported = {}
+
+        async def collect():
+            return [
+                text
+                async for text in llm_handler._astream_text(
+                    "You are an editor.",
+                    "TextFX examples",
+                    "Edit this draft.",
+                    "claude-3-haiku-20240307",
+                    reported,
+                )
+            ]
+
+        with patch(
+            "raggaeton.backend.src.api.services.llm_handler.get_shared_client",
+            return_value=client,
+        ):
+            self.assertEqual(asyncio.run(collect()), ['{"edited_content": []}'])
+
+        body = json.loads(requests[0].content)
+        self.assertEqual(
+            body["system"],
+            [
+                {"type": "text", "text": "You are an editor."},
+                {
+                    "type": "text",
+                    "text": "TextFX examples",
+                    "cache_control": {"type": "ephemeral"},
+                },
+            ],
+        )
+        self.assertIn("prompt-caching", requests[0].headers["anthropic-beta"])
+        self.assertEqual(reported["cached_prompt_tokens"], 1500)
+        self.assertEqual(reported["prompt_tokens"], 1520)
+
+
+if __name__ == "__main__":
+    unittest.main()
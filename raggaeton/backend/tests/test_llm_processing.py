@@ -0,0 +1,63 @@
+import os
+import json
+import unittest
+from pydantic import ValidationError
+from raggaeton.backend.src.utils.llm_processing import parse_llm_response, repair_json
+
+FIXTURES_PATH = os.path.join(
+    os.path.dirname(__file__), "fixtures", "llm_responses.json"
+)
+
+
+class TestParseLLMResponse(unittest.TestCase):
+    def test_recorded_responses(self):
+        with open(FIXTURES_PATH, "r") as file:
+            records = json.load(file)
+        for record in records:
+            with self.subTest(request_type=record["request_type"]):
+                response = parse_llm_response(
+                    record["content"], record["request_type"], record["request_data"]
+                )
+                self.assertTrue(response.model_dump())
+
+    def test_bare_draft_outline_is_wrapped(self):
+        response = parse_llm_response(
+            '{"draft_outlines": [{"content_block": "Intro", "details": ["a", "b"]}]}',
+            "generate_draft_travel",
+            {
+                "headline": "Climbing Fu Gai",
+                "hook": "Why walk uphill?",
+                "thesis": "The climb is the point.",
+                "article_type": "travel",
+            },
+        )
+        draft = response.drafts[0]
+        self.assertEqual(draft.headline, "Climbing Fu Gai")
+        self.assertEqual(draft.draft_outlines[0].details, "a b")
+
+    def test_repairs_fences_and_trailing_commas(self):
+        content = '```json\n{"headlines": [{"headline": "Up, and up,]", "article_type": "travel", "hook": "h", "thesis": "t",},]}\n```'
+        self.assertEqual(
+            json.loads(repair_json(content))["headlines"][0]["headline"],
+            "Up, and up,]",
+        )
+        response = parse_llm_response(content, "generate_headlines", {})
+        self.assertEqual(response.headlines[0].headline, "Up, and up,]")
+
+    def test_schema_errors_are_not_repaired(self):
+        with self.assertRaises(ValidationError):
+            parse_llm_response(
+                '{"headlines": [{"headline": "x"}]}', "generate_headlines", {}
+            )
+
+    def test_unrepairable_json_raises(self):
+        with self.assertRaises(json.JSONDecodeError):
+            parse_llm_response('{"headlines": [', "generate_headlines", {})
+
+    def test_unsupported_request_type(self):
+        with self.assertRaises(ValueError):
+            parse_llm_response("{}", "generate_poem", {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from raggaeton.backend.src.api.services import obsidian
+
+
+class TestVaultIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.vault = os.path.join(self.tmp_dir.name, "vault")
+        self.cache_path = os.path.join(self.tmp_dir.name, "cache", "vault.json")
+        self.write_note("first.md", "# First\nhello")
+        self.write_note("notes/second.md", "# Second\nworld")
+        self.write_note(".obsidian/hidden.md", "# Hidden")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_note(self, relative_path, text):
+        path = os.path.join(self.vault, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as file:
+            file.write(text)
+        return path
+
+    def documents(self):
+        index = obsidian.VaultIndex(self.vault, self.cache_path, max_workers=2)
+        return {doc_id: text for doc_id, text, _ in index.documents()}
+
+    def test_ids_are_stable_across_scans(self):
+        first = self.documents()
+        self.assertEqual(len(first), 2)
+        self.assertEqual(self.documents(), first)
+
+    def test_only_changed_notes_are_parsed(self):
+        self.documents()
+        self.write_note("first.md", "# First\nhello again")
+        path = self.write_note("notes/second.md", "# Second\nworld")
+        os.utime(path, ns=(0, 0))
+
+        with patch.object(
+            obsidian, "parse_note", wraps=obsidian.parse_note
+        ) as parse_note:
+            documents = self.documents()
+
+        # second.md was touched but not changed, so only first.md is parsed again
+        parse_note.assert_called_once_with(os.path.join(self.vault, "first.md"))
+        self.assertTrue(any("hello again" in text for text in documents.values()))
+
+    def test_deleted_notes_are_dropped(self):
+        self.documents()
+        os.remove(os.path.join(self.vault, "notes", "second.md"))
+
+        with patch.object(obsidian, "parse_note") as parse_note:
+            documents = self.documents()
+
+        parse_note.assert_not_called()
+        self.assertEqual(len(documents), 1)
+        self.assertTrue(all("world" not in text for text in documents.values()))
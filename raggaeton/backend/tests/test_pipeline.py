@@ -0,0 +1,67 @@
+import time
+import threading
+import unittest
+from raggaeton.backend.src.api.services.pipeline import PipelineOrchestrator
+
+
+class TestPipelineOrchestrator(unittest.TestCase):
+    def test_branches_run_concurrently_in_stage_order(self):
+        lock = threading.Lock()
+        order = []
+
+        def stage(name):
+            def run(state):
+                time.sleep(0.05)
+                with lock:
+                    order.append((state["branch"], name))
+                return {**state, "stages": state["stages"] + [name]}
+
+            return (name, run)
+
+        orchestrator = PipelineOrchestrator(
+            [stage("draft"), stage("topic_sentences"), stage("edit")], max_workers=4
+        )
+        branches = {f"headline-{i}": {"branch": i, "stages": []} for i in range(4)}
+
+        start = time.perf_counter()
+        run = orchestrator.run(branches)
+        elapsed = time.perf_counter() - start
+
+        # Four branches of three 50ms stages finish in roughly one branch's time
+        self.assertLess(elapsed, 0.4)
+        for result in run["results"].values():
+            self.assertEqual(result["stages"], ["draft", "topic_sentences", "edit"])
+        for branch in range(4):
+            self.assertEqual(
+                [name for i, name in order if i == branch],
+                ["draft", "topic_sentences", "edit"],
+            )
+        self.assertEqual(run["timings"]["stages"]["draft"]["calls"], 4)
+
+    def test_failed_or_stopped_branch_does_not_affect_others(self):
+        def draft(state):
+            if state == "bad":
+                raise ValueError("generation failed")
+            if state == "empty":
+                return None
+            return state + "-draft"
+
+        edits = []
+
+        def edit(state):
+            edits.append(state)
+            return state + "-edit"
+
+        run = PipelineOrchestrator(
+            [("draft", draft), ("edit", edit)], max_workers=2
+        ).run({"a": "good", "b": "bad", "c": "empty"})
+
+        self.assertEqual(run["results"]["a"], "good-draft-edit")
+        self.assertIsNone(run["results"]["b"])
+        self.assertIsNone(run["results"]["c"])
+        self.assertEqual(run["errors"], {"b": "generation failed"})
+        self.assertEqual(edits, ["good-draft"])
+
+
+if __name__ == "__main__":
+    unittest.main()
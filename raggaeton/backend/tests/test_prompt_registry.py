@@ -0,0 +1,80 @@
+import os
+import json
+import tempfile
+import unittest
+from unittest.mock import patch
+from raggaeton.backend.src.utils import prompt_registry as registry_module
+from raggaeton.backend.src.utils.prompt_registry import PromptRegistry
+
+PROMPT = """generate_headlines:
+  system_prompt: "You write headlines."
+  message_prompt: "Write headlines about {topics}. Reply as {{\\"headlines\\": []}}"
+"""
+
+
+class TestPromptRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        root = self.tmp_dir.name
+        os.makedirs(os.path.join(root, "prompts"))
+        self.prompt_path = os.path.join(root, "prompts", "headlines.yaml")
+        self.write_prompt(PROMPT)
+        content_blocks_path = os.path.join(root, "content_blocks.json")
+        textfx_examples_path = os.path.join(root, "textfx_examples.json")
+        for path in (content_blocks_path, textfx_examples_path):
+            with open(path, "w") as file:
+                json.dump({}, file)
+
+        self.patches = [
+            patch.object(registry_module, "prompts_dir", os.path.join(root, "prompts")),
+            patch.object(registry_module, "content_blocks_path", content_blocks_path),
+            patch.object(registry_module, "textfx_examples_path", textfx_examples_path),
+            patch.object(
+                registry_module,
+                "load_config",
+                return_value={"prompts": {"reload_interval": 0}},
+            ),
+            patch.object(PromptRegistry, "_instance", None),
+        ]
+        for p in self.patches:
+            p.start()
+        self.registry = PromptRegistry()
+
+    def tearDown(self):
+        for p in reversed(self.patches):
+            p.stop()
+        self.tmp_dir.cleanup()
+
+    def write_prompt(self, content):
+        with open(self.prompt_path, "w") as file:
+            file.write(content)
+        # Make sure the change is visible even on coarse mtime filesystems
+        stat = os.stat(self.prompt_path)
+        os.utime(self.prompt_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    def test_singleton(self):
+        self.assertIs(PromptRegistry(), self.registry)
+
+    def test_reloads_on_change_and_bumps_version(self):
+        snapshot = self.registry.snapshot
+        version = self.registry.version("generate_headlines")
+
+        self.write_prompt(PROMPT.replace("You write headlines.", "You write titles."))
+
+        new_snapshot = self.registry.snapshot
+        self.assertEqual(new_snapshot.generation, snapshot.generation + 1)
+        self.assertEqual(
+            new_snapshot.prompts["generate_headlines"]["system_prompt"],
+            "You write titles.",
+        )
+        self.assertNotEqual(self.registry.version("generate_headlines"), version)
+
+    def test_invalid_template_keeps_previous_prompts(self):
+        snapshot = self.registry.snapshot
+        self.write_prompt(PROMPT.replace("{topics}", "{topics"))
+
+        self.assertIs(self.registry.snapshot, snapshot)
+
+
+if __name__ == "__main__":
+    unittest.main()
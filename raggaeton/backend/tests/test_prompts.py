@@ -0,0 +1,59 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+from raggaeton.backend.src.api.services import prompts
+from raggaeton.backend.src.utils.error_handler import DataError
+
+PROMPT_CONFIG = {
+    "system_prompt": "You write headlines.",
+    "message_prompt": (
+        "Write {limit} headlines about {topics} for {optional_params[personas]}. "
+        'Reply as {{"headlines": []}}'
+    ),
+}
+PARAMS = {
+    "limit": 3,
+    "topics": ["fintech"],
+    "optional_params": {"personas": "founders"},
+}
+
+
+def snapshot(generation, message_prompt):
+    return SimpleNamespace(
+        generation=generation,
+        prompts={"generate_headlines": {"message_prompt": message_prompt}},
+        content_blocks={},
+        versions={"generate_headlines": f"v{generation}"},
+    )
+
+
+class TestPromptTemplate(unittest.TestCase):
+    def test_render_matches_str_format(self):
+        template = prompts.PromptTemplate("generate_headlines", PROMPT_CONFIG, {})
+
+        self.assertEqual(
+            template.render(PARAMS), PROMPT_CONFIG["message_prompt"].format(**PARAMS)
+        )
+
+    def test_missing_params_are_reported_together(self):
+        template = prompts.PromptTemplate("generate_headlines", PROMPT_CONFIG, {})
+
+        with self.assertRaises(DataError) as raised:
+            template.render({"optional_params": {}})
+        self.assertIn("['limit', 'topics']", str(raised.exception))
+
+    def test_registry_reload_recompiles(self):
+        registry = SimpleNamespace(snapshot=snapshot(1, "About {topics}"))
+        with (
+            patch.object(prompts, "prompt_registry", registry),
+            patch.dict(prompts._compiled, {"generation": None, "templates": {}}),
+        ):
+            first = prompts.get_compiled_prompts()["generate_headlines"]
+            self.assertIs(prompts.get_compiled_prompts()["generate_headlines"], first)
+
+            registry.snapshot = snapshot(2, "Headlines on {topics}")
+            reloaded = prompts.get_compiled_prompts()["generate_headlines"]
+
+        self.assertIsNot(reloaded, first)
+        self.assertEqual(reloaded.version, "v2")
+        self.assertEqual(reloaded.render({"topics": "AI"}), "Headlines on AI")
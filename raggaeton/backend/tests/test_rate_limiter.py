@@ -0,0 +1,116 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+import httpx
+from raggaeton.backend.src.api.services.rate_limiter import ProviderLimiter
+from raggaeton.backend.src.utils.retry import parse_retry_after
+
+
+class FakeStatusError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        self.response = httpx.Response(status_code, headers=headers or {})
+
+
+def make_limiter(**kwargs):
+    params = {
+        "requests_per_minute": 600,
+        "tokens_per_minute": 60000,
+        "max_concurrency": 2,
+        "retries": 3,
+        "base_delay": 0.01,
+        "max_delay": 0.05,
+    }
+    params.update(kwargs)
+    return ProviderLimiter("openai", **params)
+
+
+class TestRetryAfter(unittest.TestCase):
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after({"retry-after": "2"}), 2.0)
+        self.assertEqual(parse_retry_after({"retry-after-ms": "1500"}), 1.5)
+        self.assertIsNone(parse_retry_after({}))
+        self.assertIsNone(parse_retry_after({"retry-after": "soon"}))
+
+
+class TestProviderLimiter(unittest.TestCase):
+    def test_retries_429_honoring_retry_after(self):
+        limiter = make_limiter()
+        calls = []
+
+        async def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise FakeStatusError(429, {"retry-after": "0.01"})
+            return "ok"
+
+        self.assertEqual(asyncio.run(limiter.call(flaky)), "ok")
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(limiter.stats["retries"], 2)
+        self.assertEqual(limiter.stats["rate_limited"], 2)
+
+    def test_client_errors_are_not_retried(self):
+        limiter = make_limiter()
+
+        async def bad_request():
+            raise FakeStatusError(400)
+
+        with self.assertRaises(FakeStatusError):
+            asyncio.run(limiter.call(bad_request))
+        self.assertEqual(limiter.stats["retries"], 0)
+
+    def test_gives_up_after_retries(self):
+        limiter = make_limiter(retries=2)
+
+        async def overloaded():
+            raise FakeStatusError(529)
+
+        with self.assertRaises(FakeStatusError):
+            asyncio.run(limiter.call(overloaded))
+        self.assertEqual(limiter.stats["retries"], 2)
+
+    def test_concurrency_is_bounded(self):
+        limiter = make_limiter(max_concurrency=2)
+        running = []
+        peak = []
+
+        async def call():
+            running.append(1)
+            peak.append(len(running))
+            await asyncio.sleep(0.01)
+            running.pop()
+
+        async def run_all():
+            await asyncio.gather(*(limiter.call(call) for _ in range(6)))
+
+        asyncio.run(run_all())
+        self.assertEqual(max(peak), 2)
+
+    def test_token_bucket_waits_for_refill(self):
+        limiter = make_limiter(tokens_per_minute=600)
+        sleeps = []
+
+        async def fake_sleep(delay):
+            sleeps.append(delay)
+            limiter.tokens.available = limiter.tokens.capacity
+
+        async def call():
+            return "ok"
+
+        async def run_twice():
+            await limiter.call(call, estimated_tokens=500)
+            with patch(
+                "raggaeton.backend.src.api.services.rate_limiter.asyncio.sleep",
+                fake_sleep,
+            ):
+                await limiter.call(call, estimated_tokens=500)
+
+        asyncio.run(run_twice())
+        # 400 missing tokens at 10 tokens/s
+        self.assertEqual(len(sleeps), 1)
+        self.assertAlmostEqual(sleeps[0], 40, delta=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import os
+import json
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+from llama_index.core import Document
+from raggaeton.backend.src.utils import recency
+from raggaeton.backend.src.utils.facets import FacetIndex
+
+NOW = datetime(2024, 6, 30)
+CONFIG = {
+    "half_life_days": 30,
+    "weight": 0.5,
+    "windows_days": [7, 30],
+    "approximate_stop": False,
+}
+# Document id -> publish day
+DAYS = {"today": "2024-06-30", "last-week": "2024-06-25", "last-year": "2023-06-30"}
+
+
+def fake_rag(similarity):
+    rag = MagicMock()
+
+    def search(query, index_name, k, doc_ids=None):
+        hits = [
+            {"content": doc_id, "score": similarity[doc_id], "document_id": doc_id}
+            for doc_id in doc_ids or similarity
+        ]
+        return sorted(hits, key=lambda hit: hit["score"], reverse=True)[:k]
+
+    rag.search.side_effect = search
+    return rag
+
+
+class TestRecencySearch(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.index_path = self.tmp_dir.name
+        FacetIndex.from_documents(
+            [
+                Document(text=doc_id, metadata={"date_gmt": day})
+                for doc_id, day in DAYS.items()
+            ]
+        ).save(self.index_path)
+        with open(os.path.join(self.index_path, "pid_docid_map.json"), "w") as file:
+            json.dump({str(pid): doc_id for pid, doc_id in enumerate(DAYS)}, file)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def search(self, rag, k, config=CONFIG, **overrides):
+        return recency.recency_search(
+            rag,
+            "my_index",
+            self.index_path,
+            "news",
+            k=k,
+            now=NOW,
+            config={**config, **overrides},
+        )
+
+    def test_recent_posts_outrank_slightly_closer_old_ones(self):
+        rag = fake_rag({"today": 20.0, "last-week": 19.0, "last-year": 22.0})
+        nodes = self.search(rag, k=3)
+
+        self.assertEqual(
+            [node.node.text for node in nodes], ["today", "last-week", "last-year"]
+        )
+        self.assertEqual(nodes[0].node.metadata["date"], "2024-06-30")
+        self.assertEqual(nodes[0].score, 20.0)
+
+    def test_older_windows_skipped_once_top_k_is_settled(self):
+        rag = fake_rag({"today": 20.0, "last-week": 19.0, "last-year": 5.0})
+        # The best match is from today, so nothing older than a week can beat it
+        with patch.object(recency.config_loader, "get_config", return_value={}):
+            nodes = self.search(rag, k=1, config=recency.get_recency_config())
+
+        self.assertEqual([node.node.text for node in nodes], ["today"])
+        self.assertEqual(rag.search.call_count, 2)
+        self.assertIsNone(rag.search.call_args_list[0].kwargs.get("doc_ids"))
+        self.assertEqual(rag.search.call_args.kwargs["doc_ids"], ["today", "last-week"])
+
+    def test_much_closer_older_post_still_ranks(self):
+        rag = fake_rag({"today": 20.0, "last-week": 19.0, "last-year": 31.0})
+        nodes = self.search(rag, k=1, weight=0.2)
+
+        self.assertEqual([node.node.text for node in nodes], ["last-year"])
+        self.assertEqual(rag.search.call_count, 3)
+
+        # The approximate stop trusts the recent scores and misses it
+        rag.reset_mock()
+        nodes = self.search(rag, k=1, weight=0.2, approximate_stop=True)
+        self.assertEqual([node.node.text for node in nodes], ["today"])
+        rag.search.assert_called_once()
+
+    def test_recency_factor(self):
+        self.assertEqual(recency.recency_factor(0, 30, 0.5), 1.0)
+        self.assertEqual(recency.recency_factor(30, 30, 0.5), 0.75)
+        self.assertEqual(recency.recency_factor(None, 30, 0.5), 0.5)
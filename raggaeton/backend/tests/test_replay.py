@@ -0,0 +1,115 @@
+import time
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import patch
+import httpx
+import anthropic
+import requests
+from raggaeton.backend.src.utils.replay import (
+    Cassette,
+    CassetteMiss,
+    ReplayAdapter,
+    ReplayTransport,
+)
+from raggaeton.backend.tests.test_llm_handler import anthropic_stream_body
+
+MESSAGES_URL = "https://api.anthropic.com/v1/messages"
+
+
+class TestReplay(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.calls = []
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def cassette(self, mode, **latency):
+        return Cassette(self.tmp_dir.name, mode=mode, **latency)
+
+    def upstream(self, request):
+        self.calls.append(request)
+        return httpx.Response(
+            200,
+            headers={"content-type": "text/event-stream"},
+            text=anthropic_stream_body('{"headlines": []}'),
+        )
+
+    def stream_text(self, transport):
+        client = anthropic.AsyncAnthropic(
+            api_key="test",
+            max_retries=0,
+            http_client=httpx.AsyncClient(transport=transport),
+        )
+
+        async def collect():
+            async with client.messages.stream(
+                model="claude-3-haiku-20240307",
+                max_tokens=100,
+                messages=[{"role": "user", "content": "Write headlines"}],
+            ) as stream:
+                return "".join([text async for text in stream.text_stream])
+
+        return asyncio.run(collect())
+
+    def test_records_then_replays_llm_stream(self):
+        recorder = ReplayTransport(
+            self.cassette("record"), httpx.MockTransport(self.upstream)
+        )
+        self.assertEqual(self.stream_text(recorder), '{"headlines": []}')
+        self.assertEqual(len(self.calls), 1)
+
+        replayer = ReplayTransport(self.cassette("replay"))
+        self.assertEqual(self.stream_text(replayer), '{"headlines": []}')
+        self.assertEqual(len(self.calls), 1)
+
+    def test_replay_simulates_latency(self):
+        cassette = self.cassette("record")
+        body = anthropic_stream_body('{"headlines": []}')
+        cassette.save("POST", MESSAGES_URL, b"{}", 200, {}, body)
+
+        replayer = ReplayTransport(
+            self.cassette("replay", first_byte_ms=50, events_per_second=100)
+        )
+        with httpx.Client(transport=replayer) as client:
+            start = time.monotonic()
+            response = client.post(MESSAGES_URL, content=b"{}")
+            elapsed = time.monotonic() - start
+        self.assertEqual(response.text, body)
+        # First byte plus 5 more events at 10ms each
+        self.assertGreaterEqual(elapsed, 0.05 + 0.04)
+
+    def test_replay_miss_raises(self):
+        replayer = ReplayTransport(self.cassette("replay"))
+        with httpx.Client(transport=replayer) as client:
+            with self.assertRaises(CassetteMiss):
+                client.post(MESSAGES_URL, json={"prompt": "unrecorded"})
+
+    def test_requests_adapter_round_trip(self):
+        recorded = requests.Response()
+        recorded.status_code = 200
+        recorded.headers["content-type"] = "application/json"
+        recorded._content = b'{"hits": [{"title": "Fu Gai"}]}'
+        session = requests.Session()
+        session.mount("https://", ReplayAdapter(self.cassette("record")))
+        with patch.object(
+            requests.adapters.HTTPAdapter, "send", return_value=recorded
+        ) as send:
+            session.get(
+                "https://api.ydc-index.io/search",
+                params={"query": "hiking", "count": 10},
+            )
+        send.assert_called_once()
+
+        session = requests.Session()
+        session.mount("https://", ReplayAdapter(self.cassette("replay")))
+        # Query parameter order does not matter for matching
+        response = session.get(
+            "https://api.ydc-index.io/search", params={"count": 10, "query": "hiking"}
+        )
+        self.assertEqual(response.json()["hits"][0]["title"], "Fu Gai")
+
+
+if __name__ == "__main__":
+    unittest.main()
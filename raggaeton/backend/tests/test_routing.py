@@ -0,0 +1,75 @@
+import os
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+from llama_index.core.tools import ToolMetadata
+from llama_index.core.base.base_selector import SelectorResult, SingleSelection
+from raggaeton.backend.src.api.services.routing import CachedSelector
+
+CHOICES = [
+    ToolMetadata(name="summary", description="Summarize the documents"),
+    ToolMetadata(name="vector", description="Specific context from the documents"),
+    ToolMetadata(name="search", description="Google search"),
+]
+
+
+def llm_choosing(index):
+    result = SelectorResult(selections=[SingleSelection(index=index, reason="llm")])
+    selector = MagicMock()
+    selector.select.return_value = result
+    selector.aselect = AsyncMock(return_value=result)
+    return selector
+
+
+class TestCachedSelector(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "routing", "decisions.jsonl")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def selector(self, llm):
+        return CachedSelector(llm, path=self.path, min_examples=2)
+
+    def test_repeated_query_skips_llm(self):
+        llm = llm_choosing(2)
+        selector = self.selector(llm)
+
+        selector.select(CHOICES, "Latest funding news in Singapore?")
+        result = selector.select(CHOICES, "latest funding news in singapore")
+
+        llm.select.assert_called_once()
+        self.assertEqual(result.ind, 2)
+        self.assertEqual(selector.report()["saved_round_trips"], 1)
+
+    def test_similar_queries_routed_by_logged_decisions(self):
+        llm = llm_choosing(0)
+        selector = self.selector(llm)
+        selector.select(CHOICES, "summarize the posts about grab")
+        selector.select(CHOICES, "summarize the posts about gojek")
+
+        # Decisions persist, so a restarted selector routes without the LLM
+        restarted = self.selector(llm_choosing(1))
+        self.assertEqual(
+            restarted.select(CHOICES, "summarize the posts about sea group").ind, 0
+        )
+        restarted.selector.select.assert_not_called()
+        self.assertEqual(restarted.report()["classifier_hits"], 1)
+
+    def test_unfamiliar_and_ambiguous_queries_ask_llm(self):
+        selector = self.selector(llm_choosing(0))
+        selector.select(CHOICES, "summarize the posts about grab")
+        selector.selector = llm_choosing(2)
+        selector.select(CHOICES, "search the posts about grab")
+
+        result = asyncio.run(
+            selector.aselect(CHOICES, "who won the football match yesterday")
+        )
+        selector.selector.aselect.assert_called_once()
+        self.assertIsNone(
+            selector.classify("summary|vector|search", "the posts about grab")
+        )
+        self.assertEqual(selector.report()["llm_calls"], 3)
+        self.assertIsNotNone(result)
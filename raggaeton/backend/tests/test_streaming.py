@@ -0,0 +1,122 @@
+import time
+import threading
+import unittest
+from raggaeton.backend.src.api.services.streaming import Stage, StreamingPipeline
+
+
+class TestStreamingPipeline(unittest.TestCase):
+    def test_stages_filter_expand_and_batch(self):
+        def drop_odd(number):
+            if number % 2 == 0:
+                yield number
+
+        def split(number):
+            yield from (number, number)
+
+        run = StreamingPipeline(
+            [
+                Stage("even", drop_odd),
+                Stage("split", split, workers=3),
+                Stage("sum", lambda batch: [sum(batch)], batch_size=4),
+            ],
+            queue_size=2,
+        ).run(range(10))
+
+        # 0, 2, 4, 6, 8 twice each, summed in batches of four
+        self.assertEqual(sum(run["outputs"]), 40)
+        self.assertEqual(len(run["outputs"]), 3)
+        stats = run["stats"]
+        self.assertEqual(stats["source"]["items_out"], 10)
+        self.assertEqual(
+            (stats["even"]["items_in"], stats["even"]["items_out"]), (10, 5)
+        )
+        self.assertEqual(stats["split"]["items_out"], 10)
+        self.assertEqual(stats["sum"]["items_in"], 10)
+
+    def test_backpressure_bounds_items_in_flight(self):
+        produced, consumed, in_flight = [0], [0], []
+        lock = threading.Lock()
+
+        def source():
+            for number in range(50):
+                with lock:
+                    produced[0] += 1
+                    in_flight.append(produced[0] - consumed[0])
+                yield number
+
+        def slow_sink(number):
+            time.sleep(0.002)
+            with lock:
+                consumed[0] += 1
+            yield number
+
+        run = StreamingPipeline(
+            [Stage("pass", lambda number: [number]), Stage("sink", slow_sink)],
+            queue_size=3,
+        ).run(source())
+
+        self.assertEqual(len(run["outputs"]), 50)
+        # Two queues of three plus one item held by each stage and the source
+        self.assertLessEqual(max(in_flight), 9)
+        self.assertGreater(run["stats"]["pass"]["blocked_seconds"], 0)
+
+    def test_first_outputs_arrive_before_source_ends(self):
+        events = []
+        sink_reached = threading.Event()
+
+        def source():
+            for number in range(3):
+                yield number
+                if number == 0:
+                    # Hold the source until the first item made it through
+                    sink_reached.wait(5)
+            events.append("source done")
+
+        def sink(number):
+            events.append(f"sink {number}")
+            sink_reached.set()
+            yield number
+
+        StreamingPipeline([Stage("sink", sink)]).run(source())
+
+        self.assertLess(events.index("sink 0"), events.index("source done"))
+
+    def test_expanding_stage_streams_its_outputs(self):
+        events = []
+        sink_reached = threading.Event()
+
+        def expand(number):
+            for copy in range(3):
+                if copy == 2:
+                    # Only returns early if copies 0 and 1 were already passed on
+                    sink_reached.wait(5)
+                events.append(f"expand {copy}")
+                yield copy
+
+        def sink(number):
+            events.append(f"sink {number}")
+            sink_reached.set()
+            yield number
+
+        run = StreamingPipeline([Stage("expand", expand), Stage("sink", sink)]).run([0])
+
+        self.assertEqual(sorted(run["outputs"]), [0, 1, 2])
+        # The first copy reaches the sink before the expansion finishes
+        self.assertLess(events.index("sink 0"), events.index("expand 2"))
+
+    def test_failed_items_are_counted_and_skipped(self):
+        def invert(number):
+            yield 1 / number
+
+        run = StreamingPipeline([Stage("invert", invert)]).run([0, 1, 2])
+
+        self.assertEqual(sorted(run["outputs"]), [0.5, 1.0])
+        self.assertEqual(run["stats"]["invert"]["errors"], 1)
+
+    def test_source_errors_are_raised(self):
+        def source():
+            yield 1
+            raise ConnectionError("fetch failed")
+
+        with self.assertRaises(ConnectionError):
+            StreamingPipeline([Stage("sink", lambda number: [number])]).run(source())